@@ -1,6 +1,5 @@
 from .base_agent import BaseAgent
 from typing import Dict, List
-import json
 
 
 class AudienceAnalystAgent(BaseAgent):
@@ -50,13 +49,16 @@ Return as JSON array:
         state = self.log_message(state, "Mapping trends to audience needs...")
 
         try:
-            response = await self.llm.generate(
+            response = await self.generate(
                 prompt=prompt,
                 temperature=0.6,
-                max_tokens=2500
+                max_tokens=2500,
+                on_item=lambda insight: self.emit("insight", {"insight": insight}),
+                use_cache=not state.get("refresh"),
             )
 
-            insights = self._parse_insights(response)
+            state, items = self.parse_items(state, response, "insights")
+            insights = self._parse_insights(items)
             state["audience_insights"] = insights
 
             all_personas = []
@@ -83,19 +85,151 @@ Return as JSON array:
 
         return state
 
-    def _parse_insights(self, response: str) -> List[Dict]:
-        """Extract and parse JSON insights from Azure OpenAI response"""
+    async def profile(self, state: Dict) -> Dict:
+        """
+        Trend-independent half of the analysis: personas and pain points for
+        the audience. Used by the parallel graph, where it runs alongside
+        trend research.
+        """
+        state = self.log_message(state, "Profiling target audience...")
+        state["current_agent"] = self.name
+
+        target_audience = state.get("target_audience", "")
+        industry = state.get("industry", "")
+
+        prompt = f"""You are an audience analysis expert.
+
+Your task:
+Profile the target audience: {target_audience} in {industry}
+
+Describe 3-4 specific personas. For each persona provide:
+1. A short persona name
+2. Their role and context (1 sentence)
+3. Their main pain points
+4. What kind of content they respond to
+
+Return as JSON array:
+[
+  {{
+    "persona": "Persona name",
+    "context": "Role and situation",
+    "pain_points": ["pain1", "pain2"],
+    "content_preferences": ["preference1", "preference2"]
+  }}
+]
+"""
+
         try:
-            start = response.find("[")
-            end = response.rfind("]") + 1
-            return json.loads(response[start:end])
-        except Exception:
-            return [
-                {
-                    "topic": "Industry Transformation",
-                    "angle": "What this means for your role",
-                    "hook": "The landscape is changing faster than you think",
-                    "pain_points": ["Staying current", "Rising competition"],
-                    "target_personas": ["Decision Maker", "Practitioner"]
-                }
-            ]
+            response = await self.generate(
+                prompt=prompt,
+                temperature=0.6,
+                max_tokens=1200,
+                on_item=lambda persona: self.emit("persona", {"persona": persona}),
+                use_cache=not state.get("refresh"),
+            )
+
+            state, items = self.parse_items(state, response, "personas")
+            profile = [p for p in items if p.get("persona")]
+            state["audience_profile"] = profile
+            state["personas"] = [p["persona"] for p in profile]
+
+            state = self.log_message(state, f"Profiled {len(profile)} audience personas")
+
+        except Exception as e:
+            state["error"] = f"Audience profiling failed: {str(e)}"
+            state = self.log_message(state, f"Error: {str(e)}", "error")
+
+        return state
+
+    async def map_trends(self, state: Dict) -> Dict:
+        """
+        Join step of the parallel graph: angle the researched trends for the
+        personas profiled earlier. Produces the same insights as `execute`.
+        """
+        state = self.log_message(state, "Mapping trends onto audience personas...")
+        state["current_agent"] = self.name
+
+        trends = state.get("trends", [])
+        profile = state.get("audience_profile", [])
+
+        trends_summary = "\n".join(
+            f"- {t['topic']}: {t['description']}"
+            for t in trends[:5]
+        )
+        personas_summary = "\n".join(
+            f"- {p['persona']}: pain points {', '.join(p.get('pain_points', []))}"
+            for p in profile
+        )
+
+        prompt = f"""You are an audience analysis expert.
+
+Trends:
+{trends_summary}
+
+Personas:
+{personas_summary}
+
+For each trend, pick the personas it matters most to and provide:
+1. How to angle it for them
+2. A compelling hook
+3. Which of their pain points it addresses
+
+Return as JSON array:
+[
+  {{
+    "topic": "Trend topic",
+    "angle": "How to present to audience",
+    "hook": "Compelling opening line",
+    "pain_points": ["pain1", "pain2"],
+    "target_personas": ["Persona 1", "Persona 2"]
+  }}
+]
+"""
+
+        try:
+            response = await self.generate(
+                prompt=prompt,
+                temperature=0.5,
+                max_tokens=1500,
+                on_item=lambda insight: self.emit("insight", {"insight": insight}),
+                use_cache=not state.get("refresh"),
+            )
+
+            state, items = self.parse_items(state, response, "insights")
+            insights = self._parse_insights(items)
+            state["audience_insights"] = insights
+
+            state = self.log_message(
+                state,
+                f"Generated {len(insights)} audience-adapted concepts"
+            )
+
+            state = self.add_a2a_message(
+                state,
+                message=f"Handoff: {len(insights)} audience insights ready for creative development.",
+                data={"insights_count": len(insights)},
+                to_agent="Creative Writer",
+                message_type="handoff",
+            )
+
+        except Exception as e:
+            state["error"] = f"Audience analysis failed: {str(e)}"
+            state = self.log_message(state, f"Error: {str(e)}", "error")
+
+        return state
+
+    def _parse_insights(self, items: List[Dict]) -> List[Dict]:
+        """Keep the insights parsed from the Azure OpenAI response"""
+        insights = [i for i in items if i.get("topic")]
+        if insights:
+            return insights
+
+        return [
+            {
+                "topic": "Industry Transformation",
+                "angle": "What this means for your role",
+                "hook": "The landscape is changing faster than you think",
+                "pain_points": ["Staying current", "Rising competition"],
+                "target_personas": ["Decision Maker", "Practitioner"]
+            }
+        ]
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from datetime import datetime, UTC
+from typing import Dict, Any, Callable, List, Optional
 import logging
+import time
+from langgraph.config import get_stream_writer
 from app.graph.a2a_protocol import create_a2a_message
+from app.services.json_stream import JSONArrayStream, parse_json_array
+from app.services.metrics import current_agent, record_parse
+from app.services.run_log import log_event
+from app.services.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -13,18 +18,8 @@ class BaseAgent(ABC):
         # self.claude = llm_service  # ✅ backward compatibility
 
     def log_message(self, state: Dict, message: str, message_type: str = "log") -> Dict:
-        log_entry = {
-            "agent": self.name,
-            "message": message,
-            "type": message_type,
-            "timestamp": datetime.now(UTC).isoformat()
-        }
-
-        if "execution_logs" not in state:
-            state["execution_logs"] = []
-        state["execution_logs"].append(log_entry)
-
-        logger.info(f"[{self.name}] {message}")
+        # Into the run's log buffer and sinks; the state itself doesn't grow
+        log_event(self.name, message, message_type)
         return state
 
     def add_a2a_message(
@@ -40,17 +35,97 @@ class BaseAgent(ABC):
         Push a Google-style A2A envelope into the shared `messages` list
         on the state, using the protocol definition.
         """
+        message_type = message_type if message_type in ["info", "handoff", "debug", "error"] else "info"
+        trace = None
+        if message_type == "handoff":
+            # The handoff is its own span; the receiving node links back to it
+            span = tracer.start("handoff", from_agent=self.name, to_agent=to_agent or "")
+            if span is not None:
+                tracer.end(span)
+                trace = span.context()
         envelope = create_a2a_message(
             from_agent=self.name,
             summary=message,
             to_agent=to_agent,
             payload=data or {},
-            message_type=message_type if message_type in ["info", "handoff", "debug", "error"] else "info",
+            message_type=message_type,
+            trace=trace,
         )
         state.setdefault("messages", []).append(envelope)
         return state
     
 
+    def _stream_writer(self) -> Optional[Callable[[Dict], None]]:
+        """LangGraph's custom-stream writer, or None when running outside a graph"""
+        try:
+            return get_stream_writer()
+        except RuntimeError:
+            return None
+
+    def emit(self, event_type: str, data: dict, writer: Optional[Callable[[Dict], None]] = None) -> None:
+        """Send a partial-output event to anyone streaming the graph in custom mode"""
+        writer = writer or self._stream_writer()
+        if writer is not None:
+            writer({"agent": self.name, "type": event_type, **data})
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        on_item: Optional[Callable[[Any], None]] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Run a completion, forwarding token deltas as they arrive.
+
+        When `on_item` is given, each element of the JSON array in the
+        response is handed to it as soon as the element closes. Pass
+        `use_cache=False` (a refresh request) to skip the response cache.
+        """
+        # Attribute the service's LLM spans to this agent
+        current_agent.set(self.name)
+        if not hasattr(self.llm, "generate_stream"):
+            return await self.llm.generate(prompt=prompt, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache)
+
+        writer = self._stream_writer()
+        parser = JSONArrayStream() if on_item else None
+        parts = []
+        async for delta in self.llm.generate_stream(
+            prompt=prompt, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache
+        ):
+            parts.append(delta)
+            self.emit("token", {"delta": delta}, writer)
+            if parser is not None:
+                try:
+                    for item in parser.feed(delta):
+                        on_item(item)
+                except Exception:
+                    # Malformed element: stop incremental parsing, the full
+                    # response is still parsed once the stream completes
+                    parser = None
+
+        return "".join(parts)
+
+    def parse_items(self, state: Dict, response: str, label: str) -> tuple[Dict, List[Dict]]:
+        """
+        Pull the JSON objects out of a response's array, keeping every element
+        that decodes and logging how much of a damaged response was recovered.
+        """
+        started = time.perf_counter()
+        parsed = parse_json_array(response)
+        items = [item for item in parsed.items if isinstance(item, dict)]
+        skipped = parsed.failed + len(parsed.items) - len(items)
+        record_parse(self.name, time.perf_counter() - started, skipped)
+
+        if skipped or parsed.truncated:
+            note = "truncated response" if parsed.truncated else "partial response"
+            state = self.log_message(
+                state,
+                f"Recovered {len(items)} {label} from a {note} ({skipped} malformed element(s) skipped)"
+            )
+        return state, items
+
     @abstractmethod
     async def execute(self, state: Dict) -> Dict:
         pass
\ No newline at end of file
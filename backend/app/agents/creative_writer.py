@@ -1,10 +1,18 @@
 from .base_agent import BaseAgent
-from typing import Dict, List
-import json
+from app.config import settings
+from app.models.schemas import ContentIdea
+from app.services.result_store import idea_id
+from pydantic import ValidationError
+from functools import partial
+from typing import Dict, List, Optional
+import asyncio
 
 class CreativeWriterAgent(BaseAgent):
-    def __init__(self, claude_service):
+    def __init__(self, claude_service, fan_out: Optional[bool] = None):
         super().__init__("Creative Writer", claude_service)
+        # Fan-out mode: one concurrent completion per content format
+        self.fan_out = settings.writer_fan_out if fan_out is None else fan_out
+        self.tokens_per_format = settings.writer_tokens_per_format
     
     async def execute(self, state: Dict) -> Dict:
         state = self.log_message(state, "Crafting content ideas...")
@@ -19,7 +27,94 @@ class CreativeWriterAgent(BaseAgent):
             for i in insights[:5]
         ])
         
-        prompt = f"""You are a creative content strategist.
+        state = self.log_message(state, "Generating polished content ideas...")
+        
+        try:
+            if self.fan_out and len(content_types) > 1:
+                state, ideas = await self._generate_per_format(
+                    state, insights_summary, target_audience, content_types
+                )
+            else:
+                response = await self.generate(
+                    prompt=self._build_prompt(insights_summary, target_audience, content_types),
+                    temperature=0.7,
+                    max_tokens=3000,
+                    on_item=self._emit_idea,
+                    use_cache=not state.get("refresh"),
+                )
+
+                state, items = self.parse_items(state, response, "ideas")
+                state, ideas = self._parse_ideas(state, items)
+            state["content_ideas"] = ideas
+            
+            state = self.log_message(
+                state,
+                f"✓ Created {len(ideas)} ready-to-use content ideas"
+            )
+            
+            state = self.add_a2a_message(
+                state,
+                message=f"Ideation complete. Generated {len(ideas)} content ideas.",
+                data={"total_ideas": len(ideas), "formats": content_types},
+                to_agent=None,  # Broadcast to the system/end-user
+                message_type="info",
+            )
+            
+        except Exception as e:
+            state["error"] = f"Content generation failed: {str(e)}"
+            state = self.log_message(state, f"Error: {str(e)}", "error")
+        
+        return state
+
+    async def _generate_per_format(
+        self,
+        state: Dict,
+        insights_summary: str,
+        target_audience: str,
+        content_types: List[str],
+    ) -> tuple[Dict, List[Dict]]:
+        """
+        One concurrent completion per format, each with its own token budget.
+        A failed format is logged and skipped; only all formats failing is an error.
+        """
+        state = self.log_message(state, f"Fanning out {len(content_types)} format-specific requests...")
+
+        responses = await asyncio.gather(
+            *(
+                self.generate(
+                    prompt=self._build_prompt(insights_summary, target_audience, [content_type]),
+                    temperature=0.7,
+                    max_tokens=self.tokens_per_format,
+                    on_item=partial(self._emit_idea, content_type=content_type),
+                    use_cache=not state.get("refresh"),
+                )
+                for content_type in content_types
+            ),
+            return_exceptions=True,
+        )
+
+        ideas = []
+        failures = []
+        for content_type, response in zip(content_types, responses):
+            if isinstance(response, BaseException):
+                failures.append(f"{content_type}: {response}")
+                state = self.log_message(state, f"Error generating {content_type} ideas: {response}", "error")
+                continue
+
+            state, items = self.parse_items(state, response, f"{content_type} ideas")
+            for item in items:
+                item.setdefault("format", content_type)
+            state, parsed = self._parse_ideas(state, items)
+            ideas.extend(parsed)
+
+        if len(failures) == len(content_types):
+            raise RuntimeError("; ".join(failures))
+
+        return state, ideas
+
+    def _build_prompt(self, insights_summary: str, target_audience: str, content_types: List[str]) -> str:
+        format_hint = content_types[0] if len(content_types) == 1 else "blog|video|social"
+        return f"""You are a creative content strategist.
 
 Audience-adapted concepts:
 {insights_summary}
@@ -37,7 +132,7 @@ Create detailed content ideas for each format. For each idea provide:
 Return as JSON:
 [
   {{
-    "format": "blog|video|social",
+    "format": "{format_hint}",
     "title": "Compelling title",
     "description": "Detailed description",
     "structure": "Format-specific structure details",
@@ -50,51 +145,47 @@ Return as JSON:
 
 Generate 2-3 ideas per format type.
 """
-        
-        state = self.log_message(state, "Generating polished content ideas...")
-        
-        try:
-            response = await self.llm.generate(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=3000
-            )
-            
-            ideas = self._parse_ideas(response, content_types)
-            state["content_ideas"] = ideas
-            
-            state = self.log_message(
-                state,
-                f"✓ Created {len(ideas)} ready-to-use content ideas"
-            )
-            
-            state = self.add_a2a_message(
-                state,
-                message=f"Ideation complete. Generated {len(ideas)} content ideas.",
-                data={"total_ideas": len(ideas), "formats": content_types},
-                to_agent=None,  # Broadcast to the system/end-user
-                message_type="info",
-            )
-            
-        except Exception as e:
-            state["error"] = f"Content generation failed: {str(e)}"
-            state = self.log_message(state, f"Error: {str(e)}", "error")
-        
-        return state
     
-    def _parse_ideas(self, response: str, content_types: List[str]) -> List[Dict]:
+    def _parse_ideas(self, state: Dict, items: List[Dict]) -> tuple[Dict, List[Dict]]:
+        """
+        The one place ideas are validated: the rest of the pipeline and the
+        API pass the resulting dicts through without rebuilding models.
+        """
+        # Ideas without a format or title can't be identified; skip just those
+        ideas = [i for i in items if i.get("format") and i.get("title")]
+
+        valid = []
+        for idea in ideas:
+            try:
+                # Add icon and id, then fill defaults and coerce types
+                valid.append(ContentIdea.model_validate(self._decorate_idea(idea)).model_dump())
+            except ValidationError as e:
+                state = self.log_message(state, f"Skipped invalid idea '{idea['title']}': {e.error_count()} field error(s)")
+        return state, valid
+
+    def _emit_idea(self, idea, content_type: Optional[str] = None) -> None:
+        """
+        Forward an idea to stream listeners as soon as its JSON object closes.
+        It is validated the same way as in `_parse_ideas`, but dedup may still
+        drop it, so it is sent as provisional; the final result is authoritative.
+        """
+        if not isinstance(idea, dict):
+            return
+        idea = dict(idea)
+        if content_type:
+            idea.setdefault("format", content_type)
+        if not (idea.get("format") and idea.get("title")):
+            return
         try:
-            start = response.find("[")
-            end = response.rfind("]") + 1
-            json_str = response[start:end]
-            ideas = json.loads(json_str)
-            
-            # Add icons and ensure format
-            icon_map = {"blog": "📝", "video": "🎥", "social": "📱"}
-            for idea in ideas:
-                idea["icon"] = icon_map.get(idea.get("format", "blog"), "📝")
-                idea["id"] = f"{idea['format']}-{hash(idea['title']) % 10000}"
-            
-            return ideas
-        except:
-            return []
\ No newline at end of file
+            valid = ContentIdea.model_validate(self._decorate_idea(idea)).model_dump()
+        except ValidationError:
+            # Logged once the full response is parsed
+            return
+        self.emit("idea", {"idea": valid, "provisional": True})
+
+    def _decorate_idea(self, idea: Dict) -> Dict:
+        icon_map = {"blog": "📝", "video": "🎥", "social": "📱"}
+        idea["icon"] = icon_map.get(idea.get("format", "blog"), "📝")
+        # Content hash, so the same idea keeps its id across runs and processes
+        idea["id"] = idea_id(idea["format"], idea["title"])
+        return idea
\ No newline at end of file
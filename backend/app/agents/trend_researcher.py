@@ -1,6 +1,5 @@
 from .base_agent import BaseAgent
 from typing import Dict, List
-import json
 import re
 # from graph.a2a_protocol import create_agent_card
 
@@ -49,13 +48,16 @@ Return your analysis as a JSON array with this structure:
         state = self.log_message(state, "Analyzing industry trends...")
 
         try:
-            response = await self.llm.generate(
+            response = await self.generate(
                 prompt=prompt,
                 temperature=0.5,
-                max_tokens=2000
+                max_tokens=2000,
+                on_item=lambda trend: self.emit("trend", {"trend": trend}),
+                use_cache=not state.get("refresh"),
             )
 
-            trends = self._parse_trends(response)
+            state, items = self.parse_items(state, response, "trends")
+            trends = self._parse_trends(items)
             state["trends"] = trends
             state["trend_sources"] = list(
                 set(t.get("source", "Unknown") for t in trends)
@@ -83,20 +85,18 @@ Return your analysis as a JSON array with this structure:
 
         return state
 
-    def _parse_trends(self, response: str) -> List[Dict]:
-        """Extract and parse JSON trends from Azure OpenAI response"""
-        try:
-            start = response.find("[")
-            end = response.rfind("]") + 1
-            json_str = response[start:end]
-            return json.loads(json_str)
-        except Exception:
-            # Safe fallback to prevent pipeline failure
-            return [
-                {
-                    "topic": "AI Integration",
-                    "relevance_score": 0.9,
-                    "description": "Increasing adoption of AI tools across business workflows",
-                    "source": "Industry reports"
-                }
-            ]
+    def _parse_trends(self, items: List[Dict]) -> List[Dict]:
+        """Keep the trends parsed from the Azure OpenAI response"""
+        trends = [t for t in items if t.get("topic")]
+        if trends:
+            return trends
+
+        # Safe fallback to prevent pipeline failure
+        return [
+            {
+                "topic": "AI Integration",
+                "relevance_score": 0.9,
+                "description": "Increasing adoption of AI tools across business workflows",
+                "source": "Industry reports"
+            }
+        ]
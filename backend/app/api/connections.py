@@ -0,0 +1,166 @@
+"""
+WebSocket connection management.
+
+Every connection gets a bounded outbound queue drained by its own writer
+task, so a slow client only slows its own runs. When a client falls
+behind, progress messages are coalesced (token deltas merged, status
+updates replaced by the newest) and, if the queue is still full, dropped.
+Results and errors are never dropped; their senders wait for room.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import orjson
+from fastapi import WebSocket
+
+from app.services.metrics import CANCELLED, Counter, register
+
+logger = logging.getLogger(__name__)
+
+# Progress that is superseded by later messages and safe to lose
+STATUS_TYPES = {"status", "agent_update"}
+DROPPABLE_TYPES = STATUS_TYPES | {"agent_token"}
+
+WS_DROPPED = register(Counter("ws_messages_dropped_total", "Progress messages dropped for slow WebSocket clients", ("type",)))
+WS_COALESCED = register(Counter("ws_messages_coalesced_total", "Queued WebSocket messages merged into a newer one", ("type",)))
+
+
+class Connection:
+    def __init__(self, websocket: WebSocket, max_queue: int = 256, send_timeout: float = 10.0):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.runs: Dict[str, asyncio.Task] = {}
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write())
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Queue a message; returns immediately unless a result must wait for room"""
+        if self.closed or self._coalesce(message):
+            return
+
+        while len(self.pending) >= self.max_queue:
+            if message["type"] in DROPPABLE_TYPES:
+                WS_DROPPED.inc(type=message["type"])
+                return
+            self._space.clear()
+            await self._space.wait()
+            if self.closed:
+                return
+
+        self.pending.append(message)
+        self._ready.set()
+
+    def _coalesce(self, message: Dict[str, Any]) -> bool:
+        """Fold `message` into one already queued for the same run, if possible"""
+        if not self.pending or message["type"] not in DROPPABLE_TYPES:
+            return False
+        request_id = message.get("request_id")
+
+        if message["type"] == "agent_token":
+            last = self.pending[-1]
+            if (
+                last["type"] == "agent_token"
+                and last.get("request_id") == request_id
+                and last["payload"]["agent_name"] == message["payload"]["agent_name"]
+            ):
+                last["payload"] = {**last["payload"], "delta": last["payload"]["delta"] + message["payload"]["delta"]}
+                WS_COALESCED.inc(type="agent_token")
+                return True
+            return False
+
+        for index, queued in enumerate(self.pending):
+            if queued["type"] in STATUS_TYPES and queued.get("request_id") == request_id:
+                self.pending[index] = message
+                WS_COALESCED.inc(type=message["type"])
+                return True
+        return False
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                while not self.pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                message = self.pending.popleft()
+                self._space.set()
+                async with asyncio.timeout(self.send_timeout):
+                    # orjson: payloads may hold dataclasses (A2A messages) as they are
+                    await self.websocket.send_text(orjson.dumps(message).decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Send failed or the client stopped reading: nobody will see these runs' output
+            logger.info(f"WebSocket writer stopped: {e}")
+            self.cancel_runs(reason="slow_client")
+        finally:
+            self.closed = True
+            self._space.set()
+
+    def cancel_runs(self, request_id: Optional[str] = None, reason: str = "client") -> List[str]:
+        """Cancel one run, or all of them when `request_id` is None; returns the ids cancelled"""
+        cancelled = []
+        for run_id, run in list(self.runs.items()):
+            if request_id is not None and run_id != request_id:
+                continue
+            if not run.done():
+                run.cancel()
+                CANCELLED.inc(reason=reason)
+                cancelled.append(run_id)
+        return cancelled
+
+    async def close(self) -> None:
+        """Cancel this connection's runs and stop its writer"""
+        self.closed = True
+        if self.cancel_runs(reason="disconnect"):
+            logger.info("Cancelled in-flight ideation for closed WebSocket.")
+        self._space.set()
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+
+
+class ConnectionManager:
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.connections: Dict[WebSocket, Connection] = {}
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket) -> Connection:
+        await websocket.accept()
+        connection = Connection(websocket, self.max_queue, self.send_timeout)
+        connection.start()
+        self.connections[websocket] = connection
+        return connection
+
+    async def disconnect(self, websocket: WebSocket) -> None:
+        connection = self.connections.pop(websocket, None)
+        if connection is not None:
+            await connection.close()
+
+    async def send_message(self, message: dict, websocket: WebSocket):
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            await connection.send(message)
+
+    async def broadcast(self, message: dict):
+        """Queue `message` on every connection at once, evicting ones whose writer has died"""
+        for websocket, connection in list(self.connections.items()):
+            if connection.closed:
+                await self.disconnect(websocket)
+        await asyncio.gather(
+            *(connection.send(dict(message)) for connection in self.connections.values()),
+            return_exceptions=True,
+        )
@@ -0,0 +1,65 @@
+from fastapi.responses import Response
+from app.models.schemas import IdeationRequest
+from app.services.run_log import LogRecord
+import orjson
+import time
+
+
+def input_data_from_request(request: IdeationRequest) -> dict:
+    return {
+        "industry": request.industry,
+        "target_audience": request.target_audience,
+        "content_types": request.content_types,
+        "additional_context": request.additional_context or "",
+        "graph_mode": request.graph_mode,
+        "deadline_seconds": request.deadline_seconds,
+        "refresh": request.refresh,
+    }
+
+
+def agent_message(log: LogRecord) -> dict:
+    """An `AgentMessage` body for a log record; monotonic timestamps become ISO strings here, at the API edge"""
+    return {
+        "agent_name": log.agent,
+        "message_type": log.type.label,
+        "content": log.message,
+        "data": None,
+        "timestamp": log.timestamp.isoformat(),
+    }
+
+
+def format_response(request_id: str, request: IdeationRequest, result: dict, start_time: float) -> dict:
+    """
+    An `IdeationResponse` body as plain data. Ideas were validated once, where
+    the writer parsed them, so nothing is rebuilt into models here.
+    """
+    execution_time = time.time() - start_time
+
+    return {
+        "request_id": request_id,
+        "ideas": result.get("content_ideas", []),
+        "execution_time": execution_time,
+        "agent_logs": [agent_message(log) for log in result.get("execution_logs", [])],
+        "metadata": {
+            "trends_count": len(result.get("trends", [])),
+            "personas": result.get("personas", []),
+            "a2a_messages": len(result.get("messages", [])),
+            "graph_mode": request.graph_mode,
+            "stage_timings": result.get("stage_timings", {}),
+            "breakdown": result.get("request_metrics", {}),
+            "trace_id": (result.get("trace_context") or {}).get("trace_id"),
+            "run_id": result.get("run_id"),
+            "deadline_exceeded": result.get("deadline_exceeded", False)
+        }
+    }
+
+
+class FastJSONResponse(Response):
+    """
+    orjson-rendered JSON for bodies that are already valid: returning one
+    skips FastAPI's response-model validation and `jsonable_encoder` pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
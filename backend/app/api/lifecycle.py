@@ -0,0 +1,94 @@
+"""
+Lazy construction and warm-up of the process-wide `IdeationWorkflow`.
+
+Importing the API no longer builds the workflow (Azure client, compiled
+graphs, caches, stores), so uvicorn binds its port right after the
+imports. The lifespan then warms up in the background while `/api/ready`
+answers 503. With warm-up off, the first request that needs the workflow
+builds it.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.graph.workflow import IdeationWorkflow
+
+logger = logging.getLogger(__name__)
+
+_workflow: Optional["IdeationWorkflow"] = None
+_lock = threading.Lock()
+
+
+class Startup:
+    """Startup phases and their durations, for the readiness probe"""
+
+    def __init__(self):
+        self.ready = False
+        self.failed = False
+        self.phases: Dict[str, Any] = {}
+
+    def record(self, phase: str, seconds: float, **extra: Any) -> None:
+        self.phases[phase] = {"seconds": round(seconds, 4), **extra}
+
+    def snapshot(self) -> Dict[str, Any]:
+        status = "ready" if self.ready else "failed" if self.failed else "warming_up"
+        return {"status": status, "phases": self.phases}
+
+
+startup = Startup()
+
+
+def get_workflow() -> "IdeationWorkflow":
+    """The process's workflow, built on first use (blocking; see `load_workflow`)"""
+    global _workflow
+    if _workflow is None:
+        with _lock:
+            if _workflow is None:
+                started = time.perf_counter()
+                from app.graph.workflow import IdeationWorkflow
+                _workflow = IdeationWorkflow()
+                startup.record("workflow", time.perf_counter() - started)
+                logger.info(f"Workflow built in {time.perf_counter() - started:.2f}s")
+    return _workflow
+
+
+async def load_workflow() -> "IdeationWorkflow":
+    """The workflow, built in a worker thread if needed so the event loop keeps serving"""
+    if _workflow is None:
+        await asyncio.to_thread(get_workflow)
+    return _workflow
+
+
+def peek_workflow() -> Optional["IdeationWorkflow"]:
+    """The workflow if it has been built, without building it (for gauges)"""
+    return _workflow
+
+
+async def warm_up() -> None:
+    """Build the workflow (graphs compile in its constructor), then run its warm-up steps"""
+    started = time.perf_counter()
+    try:
+        workflow = await load_workflow()
+        for step, report in (await workflow.warm_up()).items():
+            startup.phases[step] = report
+    except Exception as e:
+        # Not ready: the process can't serve without a workflow
+        logger.error(f"Warm-up failed: {e}")
+        startup.record("warm_up", time.perf_counter() - started, error=str(e))
+        startup.failed = True
+        return
+    startup.record("warm_up", time.perf_counter() - started)
+    startup.ready = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+async def shutdown() -> None:
+    if _workflow is None:
+        return
+    # Write out run history still waiting for its batch
+    if _workflow.result_store is not None:
+        await _workflow.result_store.close()
+    await _workflow.llm_service.close()
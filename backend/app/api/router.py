@@ -1,38 +1,31 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
-from app.models.schemas import IdeationRequest, IdeationResponse, ContentIdea, AgentMessage
-from app.graph.workflow import IdeationWorkflow
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.models.schemas import IdeationRequest, IdeationResponse, JobRequest
+from app.api.connections import Connection, ConnectionManager
+from app.api.formatting import FastJSONResponse, format_response, input_data_from_request
+from app.api.lifecycle import load_workflow, peek_workflow, startup
+from app.batch import parse_stream, run_batch
+from app.services.job_queue import Job, JobQueue, JobQueueFull
+from app.services.metrics import register_gauge, render_prometheus
+from app.services.tracing import tracer
+from app.config import settings
+from typing import Literal, Optional
+import asyncio
 import uuid
 import time
-import json
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Global workflow instance
-workflow = IdeationWorkflow()
+# The workflow is built lazily (see app/api/lifecycle.py); handlers get it from `load_workflow()`
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-    
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-    
-    async def send_message(self, message: dict, websocket: WebSocket):
-        await websocket.send_json(message)
-    
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
-
-manager = ConnectionManager()
+# WebSocket connections, each with its own outbound queue and writer
+manager = ConnectionManager(
+    max_queue=settings.ws_outbound_queue_size,
+    send_timeout=settings.ws_send_timeout_seconds,
+)
 
 @router.post("/api/ideate", response_model=IdeationResponse)
 async def generate_ideas(request: IdeationRequest):
@@ -41,109 +34,392 @@ async def generate_ideas(request: IdeationRequest):
     start_time = time.time()
     
     try:
+        workflow = await load_workflow()
         # Run workflow
-        result = await workflow.run({
-            "industry": request.industry,
-            "target_audience": request.target_audience,
-            "content_types": request.content_types,
-            "additional_context": request.additional_context or ""
-        })
+        with tracer.span("POST /api/ideate", root=True, request_id=request_id):
+            result = await workflow.run(input_data_from_request(request))
         
         # Check for errors
         if result.get("error"):
             raise HTTPException(status_code=500, detail=result["error"])
         
-        # Format response
-        ideas = [
-            ContentIdea(**idea) for idea in result.get("content_ideas", [])
-        ]
-        
-        agent_logs = [
-            AgentMessage(
-                agent_name=log["agent"],
-                message_type=log["type"],
-                content=log["message"],
-                timestamp=log["timestamp"]
-            )
-            for log in result.get("execution_logs", [])
-        ]
-        
-        execution_time = time.time() - start_time
-        
-        return IdeationResponse(
-            request_id=request_id,
-            ideas=ideas,
-            execution_time=execution_time,
-            agent_logs=agent_logs,
-            metadata={
-                "trends_count": len(result.get("trends", [])),
-                "personas": result.get("personas", []),
-                "a2a_messages": len(result.get("messages", []))
-            }
-        )
+        # Format response: already-validated data, rendered once by orjson
+        return FastJSONResponse(format_response(request_id, request, result, start_time))
         
     except Exception as e:
         logger.error(f"Ideation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/api/ideate/batch")
+async def generate_ideas_batch(http_request: Request):
+    """
+    Run a JSONL (default) or CSV (Content-Type: text/csv) body of
+    IdeationRequests, streaming one NDJSON result line per finished row.
+    """
+    fmt = "csv" if "csv" in http_request.headers.get("content-type", "") else "jsonl"
+    # The body is parsed as it arrives; only a bad first row can still be a 400
+    rows = parse_stream(http_request.stream(), fmt)
+    try:
+        first = await anext(rows, None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch input: {e}")
+    workflow = await load_workflow()
+
+    async def upload():
+        if first is not None:
+            yield first
+            async for row in rows:
+                yield row
+
+    async def results():
+        async for record in run_batch(workflow, upload(), settings.batch_concurrency):
+            yield orjson.dumps(record) + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+async def _run_job(job: Job) -> dict:
+    """Job-queue runner: execute the workflow and publish progress to followers"""
+    request = IdeationRequest(**job.payload)
+    start_time = time.time()
+    workflow = await load_workflow()
+
+    result = {}
+    metrics = {}
+    with tracer.span("job", root=True, job_id=job.id, priority=job.priority):
+        async for mode, event in workflow.stream(input_data_from_request(request)):
+            if mode == "custom":
+                # Token deltas are too chatty to retain; keep completed items
+                if event["type"] == "log":
+                    job.publish({"type": "log", "agent_name": event["agent"], "item": event["log"].to_dict()})
+                elif event["type"] != "token":
+                    job.publish({"type": event["type"], "agent_name": event["agent"], "item": event[event["type"]]})
+                continue
+            if mode == "metrics":
+                metrics = event
+                continue
+            if mode == "updates":
+                if event.get("current_agent"):
+                    job.publish({"type": "agent_update", "agent_name": event["current_agent"]})
+                continue
+
+            result = event
+
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+
+    result = {**result, "request_metrics": metrics}
+    return format_response(job.id, request, result, start_time)
+
+job_queue = JobQueue(
+    _run_job,
+    workers=settings.job_workers,
+    max_queue_size=settings.job_queue_max_size,
+    retention=settings.job_retention,
+)
+
+register_gauge("llm_concurrency_limit", "Adaptive Azure OpenAI concurrency limit", lambda: peek_workflow().llm_service.limiter.limit)
+register_gauge("llm_in_flight", "Azure OpenAI calls in flight", lambda: peek_workflow().llm_service.limiter.in_flight)
+register_gauge("llm_waiting", "Calls queued for the rate limiter", lambda: peek_workflow().llm_service.limiter.waiting)
+register_gauge("llm_throttled_calls", "429 responses from Azure OpenAI so far", lambda: peek_workflow().llm_service.limiter.throttle_count)
+register_gauge("ws_connections", "Open WebSocket connections", lambda: len(manager.connections))
+register_gauge("job_queue_depth", "Jobs waiting for a worker", lambda: job_queue.metrics()["queue_depth"])
+
+@router.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Queue an ideation run and return its job id immediately"""
+    try:
+        job = job_queue.submit(request.model_dump(exclude={"priority"}), priority=request.priority)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return job.summary()
+
+@router.get("/api/jobs/metrics")
+async def job_metrics():
+    return job_queue.metrics()
+
+@router.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse({**job.summary(), "result": job.result})
+
+@router.get("/api/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Follow a job as newline-delimited JSON, ending with its result or error"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for event in job.follow():
+            yield orjson.dumps(event) + b"\n"
+        if job.status == "succeeded":
+            yield orjson.dumps({"type": "final_result", "payload": job.result}) + b"\n"
+        else:
+            yield orjson.dumps({"type": "error", "payload": job.error}) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+async def _stream_ideation(connection: Connection, request_id: str, request: IdeationRequest):
+    """Run one ideation request, forwarding partial output tagged with its request id"""
+    async def send(message: dict):
+        await connection.send({**message, "request_id": request_id})
+
+    await send({"type": "status", "payload": "Starting ideation pipeline..."})
+
+    input_data = input_data_from_request(request)
+
+    with tracer.span("WS /ws/ideate", root=True, industry=request.industry, request_id=request_id):
+        try:
+            workflow = await load_workflow()
+            # Identical concurrent requests share one run of the graph
+            final_state = {}
+            metrics = {}
+            async for mode, event in workflow.stream(input_data):
+                if mode == "custom":
+                    # Partial agent output: token deltas, log lines and completed items
+                    if event["type"] == "idea":
+                        # Validated, but dedup may still drop it: final_result is authoritative
+                        await send({
+                            "type": "idea",
+                            "payload": event["idea"],
+                            "provisional": event.get("provisional", True)
+                        })
+                    elif event["type"] == "log":
+                        await send({"type": "agent_log", "payload": event["log"].to_dict()})
+                    elif event["type"] == "token":
+                        await send({
+                            "type": "agent_token",
+                            "payload": {"agent_name": event["agent"], "delta": event["delta"]}
+                        })
+                    else:
+                        # Completed trend or insight
+                        await send({
+                            "type": event["type"],
+                            "payload": {"agent_name": event["agent"], "item": event[event["type"]]}
+                        })
+                    continue
+
+                if mode == "metrics":
+                    metrics = event
+                    continue
+
+                if mode == "values":
+                    # Final (or deadline-partial) state, once per run
+                    final_state = event
+                    continue
+
+                # Per-node diff: only what this node added to the state
+                await send({"type": "node_update", "payload": event})
+                current_agent = event.get("current_agent")
+                if current_agent:
+                    await send({
+                        "type": "agent_update",
+                        "payload": {"agent_name": current_agent, "message": f"Agent {current_agent} is running."}
+                    })
+
+            await send({
+                "type": "final_result",
+                "payload": {
+                    "ideas": final_state.get("content_ideas", []),
+                    "metrics": metrics,
+                    "deadline_exceeded": final_state.get("deadline_exceeded", False)
+                }
+            })
+
+        except Exception as e:
+            logger.error(f"Workflow execution failed: {e}")
+            await send({"type": "error", "payload": str(e)})
+
 @router.websocket("/ws/ideate")
 async def websocket_ideate(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
-    await manager.connect(websocket)
-    
+    """
+    WebSocket endpoint for real-time updates.
+
+    Several runs can share one connection: each request may carry a
+    `request_id` (one is assigned otherwise) and every message sent back
+    is tagged with it. Runs happen in tasks while this loop keeps reading,
+    so `{"type": "cancel", "request_id": ...}` (or no id, for all runs)
+    and disconnects stop the graph and its in-flight LLM calls.
+    """
+    connection = await manager.connect(websocket)
+
     try:
         while True:
             data = await websocket.receive_json()
-            
+            client_id = data.pop("request_id", None)
+
+            if data.get("type") == "cancel":
+                for cancelled_id in connection.cancel_runs(str(client_id) if client_id else None):
+                    await connection.send({"type": "cancelled", "request_id": cancelled_id, "payload": "Ideation cancelled."})
+                continue
+
+            request_id = str(client_id or uuid.uuid4())
+
+            if request_id in connection.runs:
+                await connection.send({"type": "error", "request_id": request_id, "payload": "Duplicate request_id."})
+                continue
+
+            if len(connection.runs) >= settings.ws_max_runs:
+                await connection.send({
+                    "type": "error",
+                    "request_id": request_id,
+                    "payload": f"Too many concurrent requests on this connection (max {settings.ws_max_runs})."
+                })
+                continue
+
             # Use the IdeationRequest model for validation and structure
             try:
                 request = IdeationRequest(**data)
             except Exception as e:
-                await manager.send_message({"type": "error", "payload": f"Invalid request format: {e}"}, websocket)
+                await connection.send({"type": "error", "request_id": request_id, "payload": f"Invalid request format: {e}"})
                 continue
 
-            await manager.send_message({"type": "status", "payload": "Starting ideation pipeline..."}, websocket)
-            
-            initial_state = {
-                "industry": request.industry,
-                "target_audience": request.target_audience,
-                "content_types": request.content_types,
-                "additional_context": request.additional_context or "",
-                "messages": [], "execution_logs": [], "trends": [],
-                "audience_insights": [], "content_ideas": [], "current_agent": "", "error": ""
-            }
-
-            try:
-                # Use astream_events to get detailed events
-                async for event in workflow.graph.astream(initial_state, stream_mode="values"):
-                    # The event contains the full state of the graph after each step
-                    current_agent = event.get("current_agent")
-                    if current_agent:
-                        await manager.send_message({
-                            "type": "agent_update",
-                            "payload": {"agent_name": current_agent, "message": f"Agent {current_agent} is running."}
-                        }, websocket)
-
-                # After the stream is finished, the final state is in 'event'
-                final_state = event
-                await manager.send_message({
-                    "type": "final_result",
-                    "payload": {
-                        "ideas": final_state.get("content_ideas", [])
-                    }
-                }, websocket)
-
-            except Exception as e:
-                logger.error(f"Workflow execution failed: {e}")
-                await manager.send_message({"type": "error", "payload": str(e)}, websocket)
+            run = asyncio.create_task(_stream_ideation(connection, request_id, request))
+            connection.runs[request_id] = run
+            run.add_done_callback(lambda _, request_id=request_id: connection.runs.pop(request_id, None))
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected.")
-        manager.disconnect(websocket)
     except Exception as e:
         logger.error(f"An unexpected error occurred in WebSocket: {e}")
-        manager.disconnect(websocket)
+    finally:
+        await manager.disconnect(websocket)
 
 @router.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "content-ideation-engine"}
\ No newline at end of file
+    """Liveness: the process is up and serving, warmed up or not"""
+    return {"status": "healthy", "service": "content-ideation-engine"}
+
+@router.get("/api/ready")
+async def readiness_check():
+    """Readiness: 503 until warm-up has built the workflow, with the startup phases and their durations"""
+    return FastJSONResponse(startup.snapshot(), status_code=200 if startup.ready else 503)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-node, LLM and parse histograms in Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/api/llm/metrics")
+async def llm_metrics():
+    """Rate limiter state: adaptive concurrency, throttles and queue wait"""
+    workflow = await load_workflow()
+    return workflow.llm_service.limiter.metrics()
+
+
+@router.get("/api/cache/stats")
+async def cache_stats():
+    workflow = await load_workflow()
+    return {
+        "llm": workflow.llm_service.cache_stats(),
+        "stages": [workflow.trend_cache.snapshot()],
+        "single_flight": [
+            workflow.request_flight.snapshot(),
+            workflow.research_flight.snapshot(),
+        ],
+        "semantic": workflow.semantic_cache.snapshot(),
+        "dedup": workflow.deduplicator.snapshot(),
+        "vector_index": workflow.vector_index.snapshot() if workflow.vector_index is not None else None,
+    }
+
+
+@router.get("/api/cache/semantic")
+async def semantic_cache_audit():
+    """Recent semantic cache hits: the normalized input and the cached key that served it"""
+    workflow = await load_workflow()
+    return {**workflow.semantic_cache.snapshot(), "hits": list(workflow.semantic_cache.audit)}
+
+
+@router.delete("/api/admin/cache/trends")
+async def invalidate_trend_cache(industry: Optional[str] = None):
+    """Drop cached trend research for one industry, or all industries"""
+    workflow = await load_workflow()
+    removed = await workflow.trend_cache.invalidate(industry)
+    removed += workflow.semantic_cache.invalidate("researcher", {"industry": industry} if industry else None)
+    return {"invalidated": removed, "industry": industry}
+
+
+async def _history_store():
+    workflow = await load_workflow()
+    if workflow.result_store is None:
+        raise HTTPException(status_code=404, detail="Run history is disabled (RESULT_STORE_PATH is empty)")
+    return workflow.result_store
+
+
+async def _query_history(query, **filters):
+    try:
+        return await asyncio.to_thread(query, **filters)
+    except ValueError as e:
+        # Malformed `since`/`until`
+        raise HTTPException(status_code=400, detail=f"Invalid date filter: {e}")
+
+
+@router.get("/api/history")
+async def list_history(
+    industry: Optional[str] = None,
+    audience: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date or datetime, exclusive"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Past runs, newest first"""
+    store = await _history_store()
+    runs = await _query_history(
+        store.list_runs, industry=industry, audience=audience, since=since, until=until, limit=limit, offset=offset
+    )
+    return FastJSONResponse({"runs": runs, "limit": limit, "offset": offset})
+
+
+@router.get("/api/history/ideas")
+async def list_history_ideas(
+    industry: Optional[str] = None,
+    audience: Optional[str] = None,
+    format: Optional[Literal["blog", "video", "social"]] = None,
+    since: Optional[str] = Query(None, description="ISO date or datetime, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date or datetime, exclusive"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Distinct ideas across all runs, most recently generated first"""
+    store = await _history_store()
+    ideas = await _query_history(
+        store.list_items, kind="idea", industry=industry, audience=audience, format=format,
+        since=since, until=until, limit=limit, offset=offset,
+    )
+    return FastJSONResponse({"ideas": ideas, "limit": limit, "offset": offset})
+
+
+@router.get("/api/history/{run_id}")
+async def get_history_run(run_id: str):
+    store = await _history_store()
+    run = await asyncio.to_thread(store.get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return FastJSONResponse(run)
+
+
+@router.get("/api/search")
+async def search(
+    q: str = Query(..., min_length=1),
+    kind: Optional[Literal["idea", "trend"]] = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Semantic search over stored ideas and trends; no LLM call"""
+    workflow = await load_workflow()
+    if workflow.novelty is None:
+        raise HTTPException(status_code=404, detail="Search is disabled (VECTOR_INDEX_PATH is empty)")
+    await workflow.novelty.ready()
+    matches = await asyncio.to_thread(workflow.vector_index.search, q, kind, limit)
+    items = {}
+    if workflow.result_store is not None:
+        items = await asyncio.to_thread(workflow.result_store.get_items, [item_id for _, item_id, _ in matches])
+    return FastJSONResponse({
+        "query": q,
+        "results": [
+            {**items.get(item_id, {"id": item_id}), "kind": match_kind, "score": score}
+            for match_kind, item_id, score in matches
+        ],
+    })
@@ -0,0 +1,200 @@
+"""
+Bulk ideation over a matrix of (industry, audience) requests.
+
+Usage:
+    python -m app.batch requests.jsonl -o results.ndjson
+    python -m app.batch requests.csv --format csv --concurrency 16
+
+Input rows are `IdeationRequest`s, one JSON object per line or one CSV row
+with a header (`content_types` separated by ";"). Rows are read as slots
+free up, and each result is written as one NDJSON line as soon as its row
+finishes, in completion order.
+"""
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import sys
+import time
+import uuid
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Optional, Union
+
+import orjson
+
+from app.api.formatting import format_response, input_data_from_request
+from app.config import settings
+from app.models.schemas import IdeationRequest
+
+logger = logging.getLogger(__name__)
+
+
+def _csv_row(row: Dict) -> Dict:
+    row = {k: v for k, v in row.items() if k and v not in (None, "")}
+    if "content_types" in row:
+        row["content_types"] = [t.strip() for t in row["content_types"].split(";") if t.strip()]
+    return row
+
+
+def parse_rows(lines: Iterable[str], fmt: str = "jsonl") -> Iterator[Dict]:
+    """Yield raw request dicts from JSONL or CSV lines, skipping blanks"""
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            yield _csv_row(row)
+        return
+
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+async def parse_stream(chunks: AsyncIterable[bytes], fmt: str = "jsonl") -> AsyncIterator[Dict]:
+    """
+    Yield raw request dicts from an uploaded body as its bytes arrive, so a
+    large upload is never held in memory. CSV rows must fit on one line.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    header = None
+    pending = ""
+
+    def parse(line: str) -> Optional[Dict]:
+        nonlocal header
+        if not line.strip():
+            return None
+        if fmt != "csv":
+            return json.loads(line)
+        values = next(csv.reader([line]))
+        if header is None:
+            header = values
+            return None
+        return _csv_row(dict(zip(header, values)))
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            row = parse(line)
+            if row is not None:
+                yield row
+    row = parse(pending + decoder.decode(b"", final=True))
+    if row is not None:
+        yield row
+
+
+async def _iterate(rows: Union[Iterable[Dict], AsyncIterable[Dict]]) -> AsyncIterator[Dict]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def run_batch(
+    workflow, rows: Union[Iterable[Dict], AsyncIterable[Dict]], concurrency: int
+) -> AsyncIterator[Dict]:
+    """
+    Run every row through the workflow with at most `concurrency` in flight,
+    yielding one result record per row as it completes.
+
+    Rows are read only as slots free up, and a finished row holds its slot
+    until its record is taken, so a slow reader of the results pauses the
+    batch instead of piling results up in memory. Rows sharing an industry
+    share one researcher call through the trend cache and single-flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    tasks = set()
+    done = object()
+
+    async def run_row(index: int, request: IdeationRequest) -> None:
+        try:
+            start_time = time.time()
+            try:
+                result = await workflow.run(input_data_from_request(request))
+                if result.get("error"):
+                    raise RuntimeError(result["error"])
+                response = format_response(str(uuid.uuid4()), request, result, start_time)
+                record = {"row": index, "status": "ok", "result": response}
+            except Exception as e:
+                logger.error(f"Batch row {index} failed: {e}")
+                record = {"row": index, "status": "error", "error": str(e)}
+            await results.put(record)
+        finally:
+            semaphore.release()
+
+    async def feed() -> None:
+        index = 0
+        try:
+            async for raw in _iterate(rows):
+                try:
+                    request = IdeationRequest(**raw)
+                except Exception as e:
+                    await results.put({"row": index, "status": "error", "error": f"Invalid request: {e}"})
+                else:
+                    await semaphore.acquire()
+                    task = asyncio.create_task(run_row(index, request))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                index += 1
+        except Exception as e:
+            # Unreadable input: report it and stop reading
+            await results.put({"row": index, "status": "error", "error": f"Invalid batch input: {e}"})
+        # Wait for the rows in flight before signalling the end
+        for _ in range(concurrency):
+            await semaphore.acquire()
+        await results.put(done)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (record := await results.get()) is not done:
+            yield record
+    finally:
+        feeder.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from app.graph.workflow import IdeationWorkflow
+
+    workflow = IdeationWorkflow()
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    failures = 0
+    try:
+        async for record in run_batch(workflow, parse_rows(source, fmt), args.concurrency):
+            failures += record["status"] != "ok"
+            sink.write(orjson.dumps(record).decode() + "\n")
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        # Runs are only queued by save_run; write them out before the loop ends
+        if workflow.result_store is not None:
+            await workflow.result_store.close()
+        await workflow.llm_service.close()
+
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate content ideas for many requests at once")
+    parser.add_argument("input", help="JSONL or CSV file of IdeationRequests ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from extension)")
+    parser.add_argument("--concurrency", type=int, default=settings.batch_concurrency, help="Rows in flight at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    sys.exit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
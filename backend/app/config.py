@@ -3,6 +3,7 @@ from typing import List
 import os
 from dotenv import load_dotenv
 
+# The only load_dotenv() in the app; other modules read settings or os.environ
 load_dotenv()
 
 class Settings(BaseSettings):
@@ -10,14 +11,31 @@ class Settings(BaseSettings):
     azure_openai_api_key: str = os.getenv("AZURE_OPENAI_API_KEY", "")
     azure_openai_endpoint: str = os.getenv("AZURE_OPENAI_ENDPOINT", "")
     azure_openai_deployment: str = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
+    # 2024-09-01-preview or later, for token usage on streamed completions
+    azure_openai_api_version: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
     
     azure_subscription_id: str = os.getenv("AZURE_SUBSCRIPTION_ID", "")
     
-    # Server
+    # LLM backend: "azure", or "mock" for offline tests and benchmarks
+    llm_backend: str = os.getenv("LLM_BACKEND", "azure")
+    mock_latency_ms: float = float(os.getenv("MOCK_LATENCY_MS", "800"))
+    mock_latency_distribution: str = os.getenv("MOCK_LATENCY_DISTRIBUTION", "lognormal")  # fixed|uniform|lognormal
+    mock_tokens_per_second: float = float(os.getenv("MOCK_TOKENS_PER_SECOND", "60"))
+    mock_error_rate: float = float(os.getenv("MOCK_ERROR_RATE", "0"))
+    mock_throttle_rate: float = float(os.getenv("MOCK_THROTTLE_RATE", "0"))
+    mock_seed: int = int(os.getenv("MOCK_SEED", "0"))
+
+    # Server: production defaults (set DEBUG/RELOAD for development; reload
+    # runs a single worker). WEB_CONCURRENCY worker processes, 0 = one per
+    # CPU core; with several, the LLM and stage caches default to SQLite
+    # files under SHARED_CACHE_DIR so workers share them
     host: str = "0.0.0.0"
     port: int = 8000
-    debug: bool = True
-    reload: bool = True
+    debug: bool = False
+    reload: bool = False
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    shared_cache_dir: str = os.getenv("SHARED_CACHE_DIR", "data/cache")
+    server_keepalive_seconds: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))
     
     # CORS
     cors_origins: List[str] = os.getenv("CORS_ORIGINS", "").split(",")
@@ -27,4 +45,99 @@ class Settings(BaseSettings):
     temperature: float = 0.7
     max_tokens: int = 4000
 
+    # Azure OpenAI rate limiting: concurrency ceiling per process (adapted
+    # down on throttling), per-minute budgets (0 = unlimited), 429 retries
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    azure_rpm_limit: int = int(os.getenv("AZURE_RPM_LIMIT", "0"))
+    azure_tpm_limit: int = int(os.getenv("AZURE_TPM_LIMIT", "0"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+
+    # Azure OpenAI HTTP pool: connections (0 = LLM_MAX_CONCURRENCY), idle
+    # connections kept and for how long, HTTP/2 (needs h2), timeouts
+    llm_http_max_connections: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "0"))
+    llm_http_max_keepalive: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "0"))  # 0 = all of them
+    llm_http_keepalive_seconds: float = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
+    llm_http2: bool = os.getenv("LLM_HTTP2", "true").lower() == "true"
+    llm_http_timeout_seconds: float = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "120"))
+    llm_http_connect_timeout_seconds: float = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+    # Price per 1K tokens, for the cost figures in /metrics and response metadata
+    llm_prompt_cost_per_1k: float = float(os.getenv("LLM_PROMPT_COST_PER_1K", "0"))
+    llm_completion_cost_per_1k: float = float(os.getenv("LLM_COMPLETION_COST_PER_1K", "0"))
+
+    # LLM response cache
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    llm_cache_max_bytes: int = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "")  # empty = memory only
+    llm_cache_disk_ttl_seconds: float = float(os.getenv("LLM_CACHE_DISK_TTL_SECONDS", "86400"))
+
+    # Creative Writer: one concurrent completion per content format
+    writer_fan_out: bool = os.getenv("WRITER_FAN_OUT", "false").lower() == "true"
+    writer_tokens_per_format: int = int(os.getenv("WRITER_TOKENS_PER_FORMAT", "1200"))
+
+    # Job queue (/api/jobs)
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_queue_max_size: int = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+    job_retention: int = int(os.getenv("JOB_RETENTION", "1000"))
+
+    # Batch ideation: rows in flight at once
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+    # WebSocket sessions: concurrent runs per connection, outbound queue
+    # length before progress messages are coalesced/dropped, send timeout
+    ws_max_runs: int = int(os.getenv("WS_MAX_RUNS", "4"))
+    ws_outbound_queue_size: int = int(os.getenv("WS_OUTBOUND_QUEUE_SIZE", "256"))
+    ws_send_timeout_seconds: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+    # Wall-clock budget per ideation request; partial results are returned
+    # when it runs out (0 = no deadline, overridable per request)
+    request_deadline_seconds: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "0"))
+
+    # Stage caches (0 disables), optionally in a SQLite file shared by workers
+    trend_cache_ttl_seconds: float = float(os.getenv("TREND_CACHE_TTL_SECONDS", "1800"))
+    stage_cache_path: str = os.getenv("STAGE_CACHE_PATH", "")  # empty = per process
+
+    # Semantic stage cache: reuse a stage's output when every input field is
+    # at least this similar to a cached one (0 = stage not cached). With the
+    # char n-gram embedder "healthcare" vs "healthcare IT" is already 0.96
+    semantic_cache_ttl_seconds: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "1800"))
+    semantic_cache_researcher_threshold: float = float(os.getenv("SEMANTIC_CACHE_RESEARCHER_THRESHOLD", "0.97"))
+    semantic_cache_analyst_threshold: float = float(os.getenv("SEMANTIC_CACHE_ANALYST_THRESHOLD", "0"))
+    semantic_cache_writer_threshold: float = float(os.getenv("SEMANTIC_CACHE_WRITER_THRESHOLD", "0"))
+
+    # Tracing: fraction of requests traced (0 disables), rotating span file
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    trace_path: str = os.getenv("TRACE_PATH", "traces/spans.jsonl")
+    trace_max_bytes: int = int(os.getenv("TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+    trace_backups: int = int(os.getenv("TRACE_BACKUPS", "5"))
+
+    # Run history (SQLite, empty path disables): writes are batched and
+    # flushed off the event loop every N runs or flush interval
+    result_store_path: str = os.getenv("RESULT_STORE_PATH", "data/results.sqlite3")
+    result_store_batch_size: int = int(os.getenv("RESULT_STORE_BATCH_SIZE", "50"))
+    result_store_flush_seconds: float = float(os.getenv("RESULT_STORE_FLUSH_SECONDS", "0.5"))
+
+    # Near-duplicate ideas (MinHash/LSH over title + description), within a
+    # run and against history: "flag", "drop" or "off"; Jaccard threshold
+    dedup_mode: str = os.getenv("DEDUP_MODE", "flag")
+    dedup_threshold: float = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+    dedup_num_perm: int = int(os.getenv("DEDUP_NUM_PERM", "64"))
+
+    # Semantic search / novelty: memory-mapped vector index (empty path
+    # disables); a sentence-transformers model name, else hashed TF-IDF
+    vector_index_path: str = os.getenv("VECTOR_INDEX_PATH", "data/vectors")
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "")
+    embedding_dim: int = int(os.getenv("EMBEDDING_DIM", "256"))
+
+    # Agent log lines kept per request (oldest dropped first); they live
+    # outside the graph state and stream to the log sinks as written
+    run_log_max_records: int = int(os.getenv("RUN_LOG_MAX_RECORDS", "500"))
+
+    # Startup: build the workflow and warm up (LLM connection, history
+    # indexes) in the background after the port is bound; /api/ready is 503
+    # until done. Off: the first request builds the workflow
+    startup_warmup: bool = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
 settings = Settings()
\ No newline at end of file
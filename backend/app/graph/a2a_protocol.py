@@ -1,6 +1,39 @@
-import json
-from typing import Dict, Any, Literal
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, UTC
+from typing import Dict, Any, Iterable, List, Literal, Optional
+
+import orjson
+
+MessageType = Literal["info", "handoff", "debug", "error"]
+
+
+@dataclass(slots=True)
+class A2AMessage:
+    """
+    A Google-style agent-to-agent (A2A) envelope.
+
+    The graph carries these objects as they are; nothing is encoded until a
+    message leaves the process (see `encode`/`decode`).
+    """
+    from_agent: str
+    summary: str
+    to_agent: Optional[str] = None
+    type: MessageType = "info"
+    payload: Dict[str, Any] = field(default_factory=dict)
+    trace: Optional[Dict[str, str]] = None
+    created: float = field(default_factory=time.time)
+    # Stable id, so the messages reducer can drop envelopes it already has
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.created, UTC).isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "timestamp": self.timestamp}
+
 
 def create_a2a_message(
     from_agent: str,
@@ -8,15 +41,11 @@ def create_a2a_message(
     *,
     to_agent: str | None = None,
     payload: Dict[str, Any] | None = None,
-    message_type: Literal["info", "handoff", "debug", "error"] = "info",
-) -> Dict[str, Any]:
+    message_type: MessageType = "info",
+    trace: Optional[Dict[str, str]] = None,
+) -> A2AMessage:
     """
-    Creates a structured agent-to-agent (A2A) message envelope
-    that is compatible with LangChain message standards.
-
-    This adheres to a Google-style communication protocol while ensuring
-    it can be processed by LangGraph. The original message is serialized
-    as a JSON string and placed in the 'content' field.
+    Creates a structured agent-to-agent (A2A) message envelope.
 
     Args:
         from_agent: The name of the agent sending the message.
@@ -26,21 +55,57 @@ def create_a2a_message(
         payload: A dictionary containing the message's data.
         message_type: The type of message, which can be one of "info",
                       "handoff", "debug", or "error".
+        trace: Trace context (`trace_id`, `span_id`) of the span that sent
+               the message, so the receiver can link its work to it.
 
     Returns:
-        A dictionary representing the LangChain-compatible A2A message.
+        The A2A message.
     """
-    message_content = {
-        "from_agent": from_agent,
-        "to_agent": to_agent,
-        "type": message_type,
-        "summary": summary,
-        "payload": payload or {},
-        "timestamp": datetime.now(UTC).isoformat(),
-    }
-
-    return {
-        "role": "function",
-        "name": from_agent,
-        "content": json.dumps(message_content)
-    }
+    return A2AMessage(
+        from_agent=from_agent,
+        summary=summary,
+        to_agent=to_agent,
+        type=message_type,
+        payload=payload or {},
+        trace=trace,
+    )
+
+
+def add_a2a_messages(left: List[A2AMessage], right: List[A2AMessage]) -> List[A2AMessage]:
+    """State reducer: append new envelopes, skipping ones already present (by id)"""
+    left = left or []
+    if not right:
+        return left
+    seen = {message.id for message in left}
+    return left + [message for message in right if message.id not in seen]
+
+
+def latest_handoff_trace(messages: Iterable[A2AMessage]) -> Optional[Dict[str, str]]:
+    """Trace context of the most recent handoff envelope, if it carried one"""
+    for message in reversed(list(messages or [])):
+        if message.type == "handoff":
+            return message.trace
+    return None
+
+
+# Codec for the process edge (the result store, WebSocket frames): one orjson
+# pass, dataclass fields serialized natively without an intermediate dict
+
+_FIELDS = frozenset(f.name for f in fields(A2AMessage))
+
+
+def encode(messages: A2AMessage | List[A2AMessage]) -> bytes:
+    return orjson.dumps(messages)
+
+
+def _from_dict(item: Dict[str, Any]) -> A2AMessage:
+    # Derived keys (e.g. `timestamp` from `to_dict`) are not fields
+    return A2AMessage(**{key: value for key, value in item.items() if key in _FIELDS})
+
+
+def decode(data: bytes | str | Dict[str, Any] | List[Dict[str, Any]]) -> A2AMessage | List[A2AMessage]:
+    """Messages from `encode` bytes, or from already-parsed dicts (e.g. `to_dict` output)"""
+    value = orjson.loads(data) if isinstance(data, (bytes, str)) else data
+    if isinstance(value, list):
+        return [_from_dict(item) for item in value]
+    return _from_dict(value)
@@ -0,0 +1,143 @@
+"""
+Near-duplicate detection for the writer's ideas.
+
+Runs as a graph node after the Creative Writer. Each idea's title and
+description are MinHashed and compared against the ideas kept earlier in
+the same run and against an LSH index of every idea in the run history.
+Near-duplicates are flagged (`duplicate_of`, `similarity`) or dropped.
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.metrics import Counter, register
+from app.services.minhash import LSHIndex, MinHasher
+from app.services.result_store import ResultStore
+from app.services.run_log import log_event
+
+logger = logging.getLogger(__name__)
+
+MODES = ("flag", "drop", "off")
+
+DUPLICATES = register(Counter("ideation_near_duplicates_total", "Near-duplicate ideas flagged or dropped", ("source",)))
+
+
+def idea_text(idea: Dict) -> str:
+    return f"{idea.get('title', '')} {idea.get('description', '')}"
+
+
+class IdeaDeduplicator:
+    name = "Deduplicator"
+
+    def __init__(
+        self,
+        store: Optional[ResultStore] = None,
+        threshold: float = 0.7,
+        mode: str = "flag",
+        num_perm: int = 64,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown dedup mode {mode!r}; expected one of {MODES}")
+        self.store = store
+        self.threshold = threshold
+        self.mode = mode
+        self.num_perm = num_perm
+        self.hasher = MinHasher(num_perm)
+        self.index = LSHIndex(threshold, num_perm)
+        self.flagged = 0
+        self._lock = threading.Lock()
+        self._loaded = store is None
+
+    async def ready(self) -> None:
+        """Load the history index on first use"""
+        if not self._loaded:
+            await asyncio.to_thread(self._load_history)
+
+    async def execute(self, state: Dict) -> Dict:
+        ideas = state.get("content_ideas") or []
+        if self.mode == "off" or not ideas:
+            return state
+        await self.ready()
+
+        signatures = self.hasher.signatures(idea_text(idea) for idea in ideas)
+        # Higher-confidence ideas win; a later near-copy points at them
+        order = sorted(range(len(ideas)), key=lambda i: -float(ideas[i].get("confidence") or 0))
+        kept: List[int] = []
+        matches: Dict[int, tuple] = {}
+        for i in order:
+            match = None
+            if kept:
+                similarity = (signatures[kept] == signatures[i]).mean(axis=1)
+                best = int(np.argmax(similarity))
+                if similarity[best] >= self.threshold:
+                    match = (ideas[kept[best]].get("id"), round(float(similarity[best]), 3), "run")
+            if match is None:
+                # A repeated run regenerates ideas already remembered under the same id
+                found = self.index.best_match(signatures[i], exclude=ideas[i].get("id"))
+                if found is not None:
+                    match = (*found, "history")
+            if match is None:
+                kept.append(i)
+            else:
+                matches[i] = match
+
+        within_run = sum(1 for match in matches.values() if match[2] == "run")
+        for _, _, source in matches.values():
+            DUPLICATES.inc(source=source)
+        if self.mode == "drop":
+            state["content_ideas"] = [idea for i, idea in enumerate(ideas) if i not in matches]
+        else:
+            # New dicts, so state diffs see the change
+            state["content_ideas"] = [
+                {**idea, "duplicate_of": matches[i][0], "similarity": matches[i][1]} if i in matches else idea
+                for i, idea in enumerate(ideas)
+            ]
+        self.flagged += len(matches)
+
+        if matches:
+            verb = "Dropped" if self.mode == "drop" else "Flagged"
+            state = self.log_message(
+                state,
+                f"{verb} {len(matches)} near-duplicate idea(s): "
+                f"{within_run} within this run, {len(matches) - within_run} seen in earlier runs",
+            )
+        return state
+
+    def log_message(self, state: Dict, message: str) -> Dict:
+        log_event(self.name, message)
+        return state
+
+    def remember(self, ideas: List[Dict]) -> None:
+        """Index a saved run's ideas so later runs are checked against them (runs in a worker thread)"""
+        ideas = [idea for idea in ideas if idea.get("id") and idea["id"] not in self.index]
+        if self.mode == "off" or not ideas:
+            return
+        signatures = self.hasher.signatures(idea_text(idea) for idea in ideas)
+        with self._lock:
+            self.index.add_many([idea["id"] for idea in ideas], signatures)
+
+    def _load_history(self) -> None:
+        """Build the history index from the result store, once (runs in a worker thread)"""
+        with self._lock:
+            if self._loaded:
+                return
+            rows = self.store.item_fields("idea", "title", "description")
+            index = LSHIndex(self.threshold, self.num_perm)
+            signatures = self.hasher.signatures(f"{title or ''} {description or ''}" for _, title, description in rows)
+            index.add_many([row[0] for row in rows], signatures)
+            self.index = index
+            self._loaded = True
+        logger.info(f"Loaded {len(rows)} stored ideas into the near-duplicate index")
+
+    def snapshot(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "bands": self.index.bands,
+            "rows": self.index.rows,
+            "indexed_ideas": len(self.index),
+            "flagged": self.flagged,
+        }
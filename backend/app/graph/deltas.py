@@ -0,0 +1,81 @@
+from typing import Any, Callable, Dict, Optional, get_type_hints
+
+# Keys worth showing a client as they change; everything else stays server-side
+DELTA_KEYS = (
+    "trends",
+    "audience_profile",
+    "personas",
+    "audience_insights",
+    "content_ideas",
+    "current_agent",
+    "error",
+    "stage_timings",
+)
+
+
+def _reducers(schema: type) -> Dict[str, Callable[[Any, Any], Any]]:
+    """The reducer LangGraph applies per key, read from the state's Annotated hints"""
+    reducers = {}
+    for key, hint in get_type_hints(schema, include_extras=True).items():
+        metadata = getattr(hint, "__metadata__", ())
+        if metadata and callable(metadata[0]):
+            reducers[key] = metadata[0]
+    return reducers
+
+
+class StateTracker:
+    """
+    Mirrors a graph's state from its per-node `updates` stream and reports
+    what each update added, so clients get small diffs instead of the whole
+    (growing) state after every node.
+    """
+
+    def __init__(self, schema: type, initial: Dict[str, Any]):
+        self.reducers = _reducers(schema)
+        self.state = {key: self._snapshot(value) for key, value in initial.items()}
+
+    def apply(self, update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        delta: Dict[str, Any] = {}
+        for key, value in (update or {}).items():
+            old = self.state.get(key)
+            reducer = self.reducers.get(key)
+            new = self._snapshot(reducer(old, value) if reducer else value)
+            self.state[key] = new
+
+            if key == "messages":
+                added = len(new or []) - len(old or [])
+                if added:
+                    delta["messages_added"] = added
+                    # The envelopes themselves; orjson encodes them at the socket
+                    delta["messages"] = new[-added:]
+            elif key in DELTA_KEYS:
+                change = self._diff(key, old, new, value)
+                if change is not None:
+                    delta[key] = change
+                    if isinstance(new, list) and change is new:
+                        # The whole list, not an addition (e.g. ideas re-ranked or de-duplicated)
+                        delta.setdefault("replaced", []).append(key)
+        return delta
+
+    @staticmethod
+    def _snapshot(value: Any) -> Any:
+        # Agents append to the lists they were handed, which are the same
+        # objects LangGraph stores; keep our own copy so diffs stay correct
+        if isinstance(value, list):
+            return list(value)
+        if isinstance(value, dict):
+            return dict(value)
+        return value
+
+    @staticmethod
+    def _diff(key: str, old: Any, new: Any, value: Any) -> Any:
+        if isinstance(new, list):
+            old = old or []
+            # Lists usually only grow; anything else is sent as a replacement
+            if len(new) >= len(old) and new[:len(old)] == old:
+                return new[len(old):] or None
+            return new
+        if isinstance(new, dict):
+            # Just the node's own entries (e.g. its stage timing)
+            return value or None
+        return new if new != old else None
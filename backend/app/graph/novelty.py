@@ -0,0 +1,54 @@
+"""
+Novelty scoring for the writer's ideas.
+
+Runs as a graph node after de-duplication: each idea gets `novelty`, one
+minus its cosine similarity to the closest idea already in the vector
+index (1.0 = nothing like it has been generated before).
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.services.result_store import ResultStore, item_id, normalize_text
+from app.services.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+class NoveltyScorer:
+    def __init__(self, index: VectorIndex, store: Optional[ResultStore] = None):
+        self.index = index
+        self.store = store
+        self._ready = store is None
+
+    async def ready(self) -> None:
+        """Backfill the index from run history on first use"""
+        if not self._ready:
+            await asyncio.to_thread(self.index.backfill, self.store)
+            self._ready = True
+
+    async def execute(self, state: Dict) -> Dict:
+        ideas = state.get("content_ideas") or []
+        if not ideas:
+            return state
+        try:
+            await self.ready()
+            similarity = await asyncio.to_thread(self.index.nearest, "idea", ideas)
+        except Exception as e:
+            # Novelty is an annotation; the run's ideas are returned without it
+            logger.warning(f"Novelty scoring skipped: {e}")
+            return state
+        state["content_ideas"] = [
+            {**idea, "novelty": round(1.0 - float(score), 3)} for idea, score in zip(ideas, similarity)
+        ]
+        return state
+
+    def remember(self, input_data: Dict, state: Dict) -> None:
+        """Index a saved run's ideas and trends (blocking; call through asyncio.to_thread)"""
+        industry_key = normalize_text(input_data["industry"])
+        trends = [{**trend, "id": item_id("trend", trend, industry_key)} for trend in state.get("trends") or []]
+        try:
+            self.index.add("idea", state.get("content_ideas") or [])
+            self.index.add("trend", trends)
+        except Exception as e:
+            logger.warning(f"Could not index the run's ideas and trends: {e}")
@@ -0,0 +1,167 @@
+"""
+Similarity-keyed memo of agent stage outputs.
+
+Exact keys miss on "Fintech" vs "FinTech startups" vs "fintech industry".
+Here each stage's input fields are normalized (filler words like
+"industry" dropped) and embedded, and a lookup returns the closest fresh
+entry whose every field is at least the stage's threshold similar.
+Stages with a threshold of 0 are not cached. Every hit is recorded with
+the key that served it, so reuse can be audited.
+"""
+import logging
+import re
+import time
+from collections import deque
+from datetime import datetime, UTC
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+# Words that qualify an industry or audience without changing what to research
+FILLER = frozenset(
+    "industry industries sector sectors space market markets vertical verticals "
+    "companies company startups startup firms the a an of in".split()
+)
+
+SEMANTIC_LOOKUPS = register(Counter("semantic_cache_lookups_total", "Semantic stage cache lookups", ("stage", "result")))
+
+
+def normalize_input(value: Any) -> str:
+    words = re.findall(r"\w+", str(value or "").lower())
+    kept = [word for word in words if word not in FILLER]
+    # Never normalize a value away entirely ("The Market" is kept as is)
+    return " ".join(kept or words)
+
+
+class _Stage:
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.keys: List[Dict[str, str]] = []
+        self.exact: List[str] = []
+        self.created: List[float] = []
+        self.values: List[Dict[str, Any]] = []
+        self.vectors: Optional[np.ndarray] = None  # (entries, fields, dim)
+        self.hits = 0
+        self.misses = 0
+
+    def drop(self, rows: List[int]) -> None:
+        rows = set(rows)
+        keep = [i for i in range(len(self.keys)) if i not in rows]
+        self.keys = [self.keys[i] for i in keep]
+        self.exact = [self.exact[i] for i in keep]
+        self.created = [self.created[i] for i in keep]
+        self.values = [self.values[i] for i in keep]
+        self.vectors = self.vectors[keep] if keep else None
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedder,
+        thresholds: Dict[str, float],
+        ttl_seconds: float = 1800,
+        max_entries: int = 512,
+        audit_size: int = 200,
+    ):
+        self.embedder = embedder
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._stages = {name: _Stage(threshold) for name, threshold in thresholds.items() if threshold > 0}
+        self.audit: Deque[Dict[str, Any]] = deque(maxlen=audit_size)
+
+    def enabled(self, stage: str) -> bool:
+        return stage in self._stages and self.ttl_seconds > 0
+
+    def _embed(self, fields: Dict[str, str]) -> Tuple[Dict[str, str], np.ndarray]:
+        key = {name: normalize_input(value) for name, value in sorted(fields.items())}
+        return key, self.embedder.embed(key.values())
+
+    def _similarities(self, entry: _Stage, vectors: np.ndarray) -> np.ndarray:
+        """Per entry, the lowest field similarity (every field has to match)"""
+        scores = np.einsum("nfd,fd->nf", entry.vectors, vectors)
+        # Two empty fields (e.g. no additional context) are a match
+        empty = ~vectors.any(axis=1)
+        scores = np.where(empty & ~entry.vectors.any(axis=2), 1.0, scores)
+        return scores.min(axis=1)
+
+    def lookup(self, stage: str, fields: Dict[str, str], exact: str = "") -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(cached output, hit record) for the closest fresh entry over the threshold, else None"""
+        if not self.enabled(stage):
+            return None
+        entry = self._stages[stage]
+        key, vectors = self._embed(fields)
+        now = time.monotonic()
+        expired = [i for i, created in enumerate(entry.created) if now - created > self.ttl_seconds]
+        if expired:
+            entry.drop(expired)
+
+        match = None
+        if entry.keys:
+            scores = self._similarities(entry, vectors)
+            scores[[i for i, value in enumerate(entry.exact) if value != exact]] = -1
+            best = int(np.argmax(scores))
+            if scores[best] >= entry.threshold:
+                match = best
+        if match is None:
+            entry.misses += 1
+            SEMANTIC_LOOKUPS.inc(stage=stage, result="miss")
+            return None
+
+        entry.hits += 1
+        SEMANTIC_LOOKUPS.inc(stage=stage, result="hit")
+        hit = {
+            "stage": stage,
+            "query": key,
+            "cached_key": entry.keys[match],
+            "similarity": round(float(scores[match]), 4),
+            "age_seconds": round(now - entry.created[match], 1),
+            "at": datetime.now(UTC).isoformat(),
+        }
+        self.audit.append(hit)
+        logger.info(f"Semantic cache hit for {stage}: {key} served by {entry.keys[match]} ({hit['similarity']})")
+        return entry.values[match], hit
+
+    def store(self, stage: str, fields: Dict[str, str], value: Dict[str, Any], exact: str = "") -> None:
+        if not self.enabled(stage):
+            return
+        entry = self._stages[stage]
+        key, vectors = self._embed(fields)
+        # Replace an entry for the same normalized key, else evict the oldest when full
+        stale = [i for i, (k, e) in enumerate(zip(entry.keys, entry.exact)) if k == key and e == exact]
+        if len(entry.keys) - len(stale) >= self.max_entries:
+            stale.append(0)
+        if stale:
+            entry.drop(stale)
+        entry.keys.append(key)
+        entry.exact.append(exact)
+        entry.created.append(time.monotonic())
+        entry.values.append(value)
+        entry.vectors = vectors[None] if entry.vectors is None else np.concatenate([entry.vectors, vectors[None]])
+
+    def invalidate(self, stage: Optional[str] = None, fields: Optional[Dict[str, str]] = None) -> int:
+        """Drop a stage's entries matching `fields` (all of them when None), or every stage's"""
+        removed = 0
+        for name, entry in self._stages.items():
+            if stage is not None and name != stage or not entry.keys:
+                continue
+            if fields is None:
+                rows = list(range(len(entry.keys)))
+            else:
+                scores = self._similarities(entry, self._embed(fields)[1])
+                rows = [int(i) for i in np.flatnonzero(scores >= entry.threshold)]
+            entry.drop(rows)
+            removed += len(rows)
+        return removed
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "stages": {
+                name: {"threshold": entry.threshold, "entries": len(entry.keys), "hits": entry.hits, "misses": entry.misses}
+                for name, entry in self._stages.items()
+            },
+        }
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List
+
+
+class _Broadcast:
+    """Pumps one async iterator and replays its items to any number of subscribers."""
+
+    def __init__(self, source: AsyncIterator[Any]):
+        self.items: List[Any] = []
+        self.subscribers = 0
+        self.done = False
+        self.error: BaseException | None = None
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Any]) -> None:
+        try:
+            async for item in source:
+                self.items.append(item)
+                self._notify()
+        except BaseException as e:
+            self.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto a single execution.
+
+    Only in-flight work is shared; once it finishes the key is released and
+    the next call starts fresh (caching is a separate concern). The shared
+    work is cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        # A finished call is released by a done-callback on the next loop
+        # iteration; until then it must not be joined as if in flight
+        if task is None or task.done():
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._release(self._calls, key, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shield so one caller going away doesn't cancel the shared work
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Nobody is left to use the result
+                    task.cancel()
+                    self.cancelled += 1
+
+    async def stream(
+        self,
+        key: Hashable,
+        factory: Callable[[], AsyncIterator[Any]],
+    ) -> AsyncIterator[Any]:
+        broadcast = self._streams.get(key)
+        if broadcast is None or broadcast.done:
+            broadcast = _Broadcast(factory())
+            self._streams[key] = broadcast
+            broadcast.task.add_done_callback(lambda t: self._release(self._streams, key, broadcast))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        broadcast.subscribers += 1
+        try:
+            async for item in broadcast.subscribe():
+                yield item
+        finally:
+            broadcast.subscribers -= 1
+            if not broadcast.subscribers and not broadcast.done:
+                broadcast.task.cancel()
+                self.cancelled += 1
+
+    @staticmethod
+    def _release(table: Dict, key: Hashable, owner: Any) -> None:
+        if table.get(key) is owner:
+            del table[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "in_flight": len(self._calls) + len(self._streams),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
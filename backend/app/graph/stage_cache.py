@@ -0,0 +1,111 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+from app.services.llm_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_key(value: str) -> str:
+    """Lowercase and collapse whitespace so 'FinTech ' and 'fintech' share an entry."""
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+class StageCache:
+    """Freshness-windowed memo of a single agent stage's output.
+
+    With `shared_path`, entries live in a SQLite file shared by every worker
+    process, so adding workers doesn't multiply stage misses. The file is then
+    the only copy: a local one could outlive an invalidation made by another
+    worker. Its calls are blocking and run in a worker thread.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, shared_path: str = ""):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, tuple[float, Dict[str, Any]]] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.shared: Optional[SQLiteCache] = None
+        if shared_path and self.enabled:
+            try:
+                self.shared = SQLiteCache(shared_path, ttl_seconds=ttl_seconds, table=f"stage_{name}")
+            except Exception as e:
+                logger.warning(f"Shared {name} cache disabled ({shared_path}): {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        key = normalize_key(key)
+        if self.shared is not None:
+            value = await self._shared_get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            return value
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    async def _shared_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await asyncio.to_thread(self.shared.get, key)
+        except Exception as e:
+            logger.warning(f"Shared {self.name} cache read failed: {e}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        key = normalize_key(key)
+        if self.shared is None:
+            self._entries[key] = (time.monotonic(), value)
+            return
+        try:
+            await asyncio.to_thread(self.shared.set, key, json.dumps(value))
+        except Exception as e:
+            logger.warning(f"Shared {self.name} cache write failed: {e}")
+
+    async def invalidate(self, key: Optional[str] = None) -> int:
+        """Drop one key (or everything when `key` is None); returns entries removed."""
+        if key is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            key = normalize_key(key)
+            removed = 1 if self._entries.pop(key, None) is not None else 0
+        if self.shared is not None:
+            try:
+                if key is None:
+                    removed += await asyncio.to_thread(self.shared.clear)
+                else:
+                    removed += await asyncio.to_thread(self.shared.delete, key)
+            except Exception as e:
+                logger.warning(f"Shared {self.name} cache invalidation failed: {e}")
+        return removed
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stage": self.name,
+            "ttl_seconds": self.ttl_seconds,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "shared": self.shared.path if self.shared is not None else None,
+        }
@@ -1,65 +1,481 @@
-from langgraph.graph import StateGraph, END
-from app.models.state import AgentState
+from langgraph.graph import StateGraph, START, END
+from app.models.state import AgentState, ParallelAgentState
 from app.agents.trend_researcher import TrendResearcherAgent
 from app.agents.audience_analyst import AudienceAnalystAgent
 from app.agents.creative_writer import CreativeWriterAgent
 from app.services.azure_openai_service import AzureOpenAIService
-from typing import Dict
+from app.graph.stage_cache import StageCache, normalize_key
+from app.graph.semantic_cache import SemanticCache
+from app.graph.single_flight import SingleFlight
+from app.graph.deltas import StateTracker
+from app.graph.dedup import IdeaDeduplicator
+from app.graph.novelty import NoveltyScorer
+from app.services.metrics import CANCELLED, REQUEST_SECONDS, RequestMetrics, current_request, record_node
+from app.services.tracing import Span, current_span, tracer
+from app.services.run_log import LogRecord, RunLog, current_run_log
+from app.services.result_store import build_result_store
+from app.services.embeddings import HashedCharEmbedder, build_embedder
+from app.services.vector_index import VectorIndex
+from app.graph.a2a_protocol import latest_handoff_trace
+from app.config import settings
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+import asyncio
 import logging
+import time
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+
 class IdeationWorkflow:
     def __init__(self):
         self.llm_service = AzureOpenAIService()
-        self.graph = self._build_graph()
+        self.trend_cache = StageCache("researcher", settings.trend_cache_ttl_seconds, settings.stage_cache_path)
+        self.semantic_cache = SemanticCache(
+            build_embedder(settings.embedding_model, settings.embedding_dim, fallback=HashedCharEmbedder),
+            {
+                "researcher": settings.semantic_cache_researcher_threshold,
+                "analyst": settings.semantic_cache_analyst_threshold,
+                "profiler": settings.semantic_cache_analyst_threshold,
+                "mapper": settings.semantic_cache_analyst_threshold,
+                "writer": settings.semantic_cache_writer_threshold,
+            },
+            ttl_seconds=settings.semantic_cache_ttl_seconds,
+        )
+        self.request_flight = SingleFlight("ideation")
+        self.result_store = build_result_store(settings)
+        self.research_flight = SingleFlight("researcher")
+        self.researcher = TrendResearcherAgent(self.llm_service)
+        self.analyst = AudienceAnalystAgent(self.llm_service)
+        self.writer = CreativeWriterAgent(self.llm_service)
+        self.deduplicator = IdeaDeduplicator(
+            self.result_store,
+            threshold=settings.dedup_threshold,
+            mode=settings.dedup_mode,
+            num_perm=settings.dedup_num_perm,
+        )
+        self.vector_index = None
+        self.novelty = None
+        if settings.vector_index_path:
+            embedder = build_embedder(settings.embedding_model, settings.embedding_dim)
+            self.vector_index = VectorIndex(settings.vector_index_path, embedder)
+            self.novelty = NoveltyScorer(self.vector_index, self.result_store)
+        self.graphs = {
+            "sequential": self._build_graph(),
+            "parallel": self._build_parallel_graph(),
+        }
+        self.graph = self.graphs["sequential"]
+        self.schemas = {"sequential": AgentState, "parallel": ParallelAgentState}
     
+    async def warm_up(self) -> Dict[str, Dict]:
+        """
+        Do ahead of the first request what it would otherwise pay for:
+        connect to the LLM endpoint and load the history indexes. A failed
+        step is logged and reported, and left to happen lazily.
+        """
+        steps = {"llm_connection": self.llm_service.warm_up, "dedup_history": self.deduplicator.ready}
+        if self.novelty is not None:
+            steps["vector_index"] = self.novelty.ready
+        report = {}
+        for name, step in steps.items():
+            started = time.perf_counter()
+            try:
+                await step()
+                report[name] = {"seconds": round(time.perf_counter() - started, 4)}
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed: {e}")
+                report[name] = {"seconds": round(time.perf_counter() - started, 4), "error": str(e)}
+        return report
+
     def _build_graph(self) -> StateGraph:
         """Build LangGraph workflow"""
         
-        # Initialize agents
-        researcher = TrendResearcherAgent(self.llm_service)
-        analyst = AudienceAnalystAgent(self.llm_service)
-        writer = CreativeWriterAgent(self.llm_service)
-        
         # Create graph
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("researcher", researcher.execute)
-        workflow.add_node("analyst", analyst.execute)
-        workflow.add_node("writer", writer.execute)
+        workflow.add_node("researcher", self._timed("researcher", self._research_node))
+        workflow.add_node("analyst", self._timed("analyst", self._cached("analyst", self.analyst, self.analyst.execute, ["audience_insights", "personas"])))
+        workflow.add_node("writer", self._timed("writer", self._cached("writer", self.writer, self.writer.execute, ["content_ideas"])))
+        workflow.add_node("dedup", self._timed("dedup", self.deduplicator.execute))
+        if self.novelty is not None:
+            workflow.add_node("novelty", self._timed("novelty", self.novelty.execute))
         
         # Define edges (sequential flow)
         workflow.set_entry_point("researcher")
         workflow.add_edge("researcher", "analyst")
         workflow.add_edge("analyst", "writer")
-        workflow.add_edge("writer", END)
+        workflow.add_edge("writer", "dedup")
+        self._add_tail(workflow)
         
         return workflow.compile()
-    
-    async def run(self, input_data: Dict) -> Dict:
-        """Execute the ideation workflow"""
-        logger.info(f"Starting workflow for industry: {input_data.get('industry')}")
-        
-        # Initialize state
-        initial_state = {
+
+    def _build_parallel_graph(self) -> StateGraph:
+        """
+        Researcher and audience profiler run concurrently from the start;
+        a light mapping step joins trends onto personas before the writer.
+        """
+        workflow = StateGraph(ParallelAgentState)
+
+        workflow.add_node("researcher", self._branch("researcher", self._research_node, ["trends", "trend_sources"]))
+        profile = self._cached("profiler", self.analyst, self.analyst.profile, ["audience_profile", "personas"])
+        map_trends = self._cached("mapper", self.analyst, self.analyst.map_trends, ["audience_insights"])
+        write = self._cached("writer", self.writer, self.writer.execute, ["content_ideas"])
+        workflow.add_node("profiler", self._branch("profiler", profile, ["audience_profile", "personas"]))
+        workflow.add_node("mapper", self._branch("mapper", map_trends, ["audience_insights"]))
+        workflow.add_node("writer", self._branch("writer", write, ["content_ideas"]))
+        workflow.add_node("dedup", self._branch("dedup", self.deduplicator.execute, ["content_ideas"]))
+        if self.novelty is not None:
+            workflow.add_node("novelty", self._branch("novelty", self.novelty.execute, ["content_ideas"]))
+
+        workflow.add_edge(START, "researcher")
+        workflow.add_edge(START, "profiler")
+        # Join: the mapper waits for both branches
+        workflow.add_edge(["researcher", "profiler"], "mapper")
+        workflow.add_edge("mapper", "writer")
+        workflow.add_edge("writer", "dedup")
+        self._add_tail(workflow)
+
+        return workflow.compile()
+
+    def _add_tail(self, workflow: StateGraph) -> None:
+        """dedup -> novelty (when the vector index is enabled) -> END"""
+        if self.novelty is None:
+            workflow.add_edge("dedup", END)
+        else:
+            workflow.add_edge("dedup", "novelty")
+            workflow.add_edge("novelty", END)
+
+    @staticmethod
+    def _stage_fields(stage: str, state: Dict) -> tuple[Dict[str, str], str]:
+        """The inputs a stage's output depends on: similarity-matched fields, and an exact-match part"""
+        fields = {"industry": state.get("industry", "")}
+        if stage == "researcher":
+            return fields, ""
+        fields["target_audience"] = state.get("target_audience", "")
+        if stage != "writer":
+            return fields, ""
+        fields["additional_context"] = state.get("additional_context", "")
+        return fields, ",".join(sorted(state.get("content_types", [])))
+
+    def _cached(self, stage: str, agent, fn: Callable[[Dict], Awaitable[Dict]], outputs: List[str]) -> Callable[[Dict], Awaitable[Dict]]:
+        """Put the semantic cache in front of an agent stage; a no-op for stages without a threshold"""
+        if not self.semantic_cache.enabled(stage):
+            return fn
+
+        async def cached(state: Dict) -> Dict:
+            fields, exact = self._stage_fields(stage, state)
+            found = None if state.get("refresh") else self.semantic_cache.lookup(stage, fields, exact)
+            if found is None:
+                state = await fn(state)
+                if not state.get("error"):
+                    self.semantic_cache.store(stage, fields, {key: state[key] for key in outputs if key in state}, exact)
+                return state
+
+            value, hit = found
+            state.update({key: list(items) for key, items in value.items()})
+            state["current_agent"] = agent.name
+            self._mark_hit(hit)
+            served_by = " / ".join(value for value in hit["cached_key"].values() if value)
+            return agent.log_message(state, f"Reusing cached {stage} output for '{served_by}' (similarity {hit['similarity']})")
+        return cached
+
+    @staticmethod
+    def _mark_hit(hit: Dict) -> None:
+        """Tag the current node span with the cache entry that served it, for auditing"""
+        span = current_span.get()
+        if span is not None:
+            span.set(cache_key=str(hit["cached_key"]), cache_similarity=hit["similarity"])
+
+    @staticmethod
+    def _timed(name: str, fn: Callable[[Dict], Awaitable[Dict]]) -> Callable[[Dict], Awaitable[Dict]]:
+        """Wrap a full-state node so its wall time lands in `stage_timings`"""
+        async def node(state: Dict) -> Dict:
+            started = time.perf_counter()
+            # Agents append to this list; give them a copy so the graph's
+            # own channel value isn't mutated before the reducer runs
+            state = {
+                **state,
+                "messages": list(state.get("messages", [])),
+            }
+            with IdeationWorkflow._node_span(name, state):
+                result = await fn(state)
+            elapsed = time.perf_counter() - started
+            record_node(name, elapsed)
+            result["stage_timings"] = {name: round(elapsed, 4)}
+            return result
+        return node
+
+    @staticmethod
+    def _branch(name: str, fn: Callable[[Dict], Awaitable[Dict]], outputs: List[str]) -> Callable[[Dict], Awaitable[Dict]]:
+        """
+        Adapt a full-state agent method to a node that returns only what it
+        changed, so concurrent branches can be merged by the state reducers.
+        """
+        async def node(state: Dict) -> Dict:
+            started = time.perf_counter()
+            scratch = {**state, "messages": [], "error": ""}
+            with IdeationWorkflow._node_span(name, state):
+                result = await fn(scratch)
+
+            update = {key: result[key] for key in outputs if key in result}
+            update["messages"] = result.get("messages", [])
+            update["current_agent"] = result.get("current_agent", "")
+            elapsed = time.perf_counter() - started
+            record_node(name, elapsed)
+            update["stage_timings"] = {name: round(elapsed, 4)}
+            if result.get("error"):
+                update["error"] = result["error"]
+            return update
+        return node
+
+    @staticmethod
+    @contextmanager
+    def _node_span(name: str, state: Dict) -> Iterator[Optional[Span]]:
+        """Span for one node, parented via the state's trace context and linked to the handoff that led here"""
+        with tracer.span(f"node:{name}", state.get("trace_context")) as span:
+            if span is not None:
+                handoff = latest_handoff_trace(state.get("messages"))
+                if handoff:
+                    span.links.append(handoff)
+            yield span
+
+    async def _research_node(self, state: Dict) -> Dict:
+        """Trend research only depends on the industry, so reuse fresh or in-flight results"""
+        industry = state.get("industry", "")
+        refresh = state.get("refresh", False)
+        state["current_agent"] = self.researcher.name
+
+        cached = None if refresh else await self.trend_cache.get(industry)
+        served_by = f"'{industry}'"
+        if cached is None and not refresh:
+            found = self.semantic_cache.lookup("researcher", {"industry": industry})
+            if found is not None:
+                cached, hit = found
+                self._mark_hit(hit)
+                served_by = f"'{hit['cached_key']['industry']}' (similarity {hit['similarity']})"
+        if cached is not None:
+            state["trends"] = list(cached["trends"])
+            state["trend_sources"] = list(cached["trend_sources"])
+            state = self.researcher.log_message(state, f"Reusing {len(state['trends'])} cached trends for {served_by}")
+            state = self.researcher.add_a2a_message(
+                state,
+                message=f"Handoff: {len(state['trends'])} trends identified for audience analysis.",
+                data={
+                    "trend_count": len(state["trends"]),
+                    "top_trend": state["trends"][0]["topic"] if state["trends"] else "N/A",
+                    "cached": True,
+                },
+                to_agent="Audience Analyst",
+                message_type="handoff",
+            )
+            return state
+
+        # Concurrent requests for the same industry share one researcher call
+        # (a refresh only shares with other refreshes)
+        started = False
+
+        def start() -> Awaitable[Dict]:
+            nonlocal started
+            started = True
+            return self._fresh_research(industry, refresh)
+
+        research = await self.research_flight.do((normalize_key(industry), refresh), start)
+        recorder = current_request.get()
+        if recorder is not None:
+            # Every caller's breakdown carries the shared call; joiners' copies are marked coalesced
+            recorder.llm_calls.extend({**call, "coalesced": not started} for call in research.get("llm_calls", []))
+            recorder.parses.extend(research.get("parses", []))
+        state["trends"] = list(research.get("trends", []))
+        state["trend_sources"] = list(research.get("trend_sources", []))
+        run_log = current_run_log.get()
+        if run_log is not None:
+            run_log.extend(research.get("log_records", []))
+        state.setdefault("messages", []).extend(research.get("messages", []))
+        if research.get("error"):
+            state["error"] = research["error"]
+        return state
+
+    async def _fresh_research(self, industry: str, refresh: bool = False) -> Dict:
+        # Runs in its own task: collect the researcher's log lines and LLM
+        # calls for every caller sharing it
+        run_log = RunLog(settings.run_log_max_records)
+        current_run_log.set(run_log)
+        recorder = RequestMetrics()
+        current_request.set(recorder)
+        research = await self.researcher.execute({
+            "industry": industry,
+            "refresh": refresh,
+            "messages": [],
+        })
+        research["log_records"] = run_log.records()
+        research["llm_calls"] = recorder.llm_calls
+        research["parses"] = recorder.parses
+        if not research.get("error") and research.get("trends"):
+            output = {
+                "trends": list(research["trends"]),
+                "trend_sources": list(research.get("trend_sources", [])),
+            }
+            await self.trend_cache.set(industry, output)
+            self.semantic_cache.store("researcher", {"industry": industry}, output)
+        return research
+
+    @staticmethod
+    def initial_state(input_data: Dict, trace_context: Dict | None = None) -> Dict:
+        return {
             "industry": input_data["industry"],
             "target_audience": input_data["target_audience"],
             "content_types": input_data["content_types"],
             "additional_context": input_data.get("additional_context", ""),
+            "graph_mode": input_data.get("graph_mode", "sequential"),
+            "refresh": input_data.get("refresh", False),
             "messages": [],
-            "execution_logs": [],
             "trends": [],
             "audience_insights": [],
             "content_ideas": [],
             "current_agent": "",
-            "error": ""
+            "error": "",
+            "stage_timings": {},
+            "trace_context": trace_context or {}
         }
-        
-        # Run graph
-        result = await self.graph.ainvoke(initial_state)
-        
+
+    @staticmethod
+    def request_key(input_data: Dict) -> tuple:
+        """Identity of a request for coalescing: normalized text fields, ordered formats"""
+        return (
+            normalize_key(input_data["industry"]),
+            normalize_key(input_data["target_audience"]),
+            tuple(input_data["content_types"]),
+            normalize_key(input_data.get("additional_context") or ""),
+            input_data.get("graph_mode", "sequential"),
+            input_data.get("refresh", False),
+        )
+
+    async def _instrumented(self, input_data: Dict) -> AsyncIterator[tuple[str, Dict]]:
+        """Run the graph with a fresh metrics recorder, ending with its breakdown"""
+        graph_mode = input_data.get("graph_mode", "sequential")
+        recorder = RequestMetrics()
+        # Node tasks inherit this context, so their spans land in `recorder`
+        # and their log lines in `run_log`
+        current_request.set(recorder)
+        run_log = RunLog(settings.run_log_max_records)
+        current_run_log.set(run_log)
+        # Child of the caller's request span, or a new (sampled) trace for callers without one
+        span = tracer.start("graph.astream", root=True, graph_mode=graph_mode, industry=input_data["industry"])
+        current_span.set(span)
+        started = time.perf_counter()
+        error = ""
+        graph = self.graphs[graph_mode]
+        initial = self.initial_state(input_data, span.context() if span else None)
+        tracker = StateTracker(self.schemas[graph_mode], initial)
+        try:
+            # Per-node updates rather than full snapshots: each step costs the
+            # size of what changed, not of the accumulated state
+            async for mode, chunk in graph.astream(initial, stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    yield mode, chunk
+                    continue
+                for node, update in chunk.items():
+                    yield "updates", {"node": node, **tracker.apply(update)}
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            tracer.end(span, error)
+        elapsed = time.perf_counter() - started
+        REQUEST_SECONDS.observe(elapsed, graph_mode=graph_mode)
+        # Log records join the state only once, for the final result
+        tracker.state["execution_logs"] = run_log.records()
+        if self.result_store is not None and not tracker.state.get("error"):
+            # Once per graph run, however many callers share it
+            tracker.state["run_id"] = self.result_store.save_run(input_data, tracker.state, round(elapsed, 4))
+            await asyncio.to_thread(self.deduplicator.remember, tracker.state.get("content_ideas", []))
+            if self.novelty is not None:
+                await asyncio.to_thread(self.novelty.remember, input_data, tracker.state)
+        yield "values", tracker.state
+        yield "metrics", {"total": round(elapsed, 4), **recorder.breakdown()}
+
+    async def stream(self, input_data: Dict) -> AsyncIterator[tuple[str, Dict]]:
+        """Stream `(mode, chunk)` pairs while the graph runs.
+
+        `updates` chunks are per-node diffs (`node` plus only the trends,
+        insights, ideas, etc. that node added); `custom` chunks are partial
+        agent output (token deltas, log records and completed trends,
+        insights and ideas). The final state follows as one `values` chunk, then a
+        `metrics` chunk with the run's latency, token and parse breakdown. Identical concurrent requests attach
+        to the same running graph and all receive its events; the graph is
+        cancelled once every one of them stops listening.
+
+        Past the request's deadline the stream ends with a `values` chunk of
+        the partial state, marked `deadline_exceeded`, with any ideas that
+        had already streamed.
+        """
+        key = self.request_key(input_data)
+        events = self.request_flight.stream(key, lambda: self._instrumented(input_data))
+        deadline = input_data.get("deadline_seconds") or settings.request_deadline_seconds
+        if not deadline:
+            async for event in events:
+                yield event
+            return
+
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + deadline
+        state: Dict = {}
+        streamed_ideas: List[Dict] = []
+        streamed_logs: List[LogRecord] = []
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout_at(expires):
+                        mode, chunk = await anext(events)
+                except StopAsyncIteration:
+                    return
+                except TimeoutError:
+                    # The timeout cancelled our subscription; the graph stops if no one else is listening
+                    CANCELLED.inc(reason="deadline")
+                    logger.warning(f"Deadline of {deadline}s exceeded for industry: {input_data.get('industry')}")
+                    yield "values", {
+                        **state,
+                        "content_ideas": state.get("content_ideas") or streamed_ideas,
+                        "execution_logs": streamed_logs,
+                        "deadline_exceeded": True,
+                    }
+                    return
+
+                if mode == "updates":
+                    replaced = chunk.get("replaced", ())
+                    for key, value in chunk.items():
+                        if key == "replaced":
+                            continue
+                        if isinstance(value, list) and key not in replaced:
+                            state.setdefault(key, []).extend(value)
+                        elif isinstance(value, dict):
+                            state.setdefault(key, {}).update(value)
+                        elif key != "node":
+                            state[key] = value
+                elif mode == "values":
+                    state = chunk
+                elif mode == "custom" and chunk.get("type") == "idea":
+                    streamed_ideas.append(chunk["idea"])
+                elif mode == "custom" and chunk.get("type") == "log":
+                    streamed_logs.append(chunk["log"])
+                yield mode, chunk
+        finally:
+            await events.aclose()
+
+    async def run(self, input_data: Dict) -> Dict:
+        """Execute the ideation workflow"""
+        logger.info(f"Starting workflow for industry: {input_data.get('industry')}")
+
+        result = {}
+        metrics = {}
+        async for mode, chunk in self.stream(input_data):
+            if mode == "values":
+                result = chunk
+            elif mode == "metrics":
+                metrics = chunk
+        result = {**result, "request_metrics": metrics}
+
         logger.info(f"Workflow completed. Generated {len(result.get('content_ideas', []))} ideas")
-        
-        return result
\ No newline at end of file
+
+        return result
@@ -7,6 +7,16 @@ class IdeationRequest(BaseModel):
     target_audience: str = Field(..., min_length=1, max_length=200)
     content_types: List[Literal["blog", "video", "social"]] = ["blog", "video", "social"]
     additional_context: Optional[str] = None
+    # "parallel" profiles the audience concurrently with trend research
+    graph_mode: Literal["sequential", "parallel"] = "sequential"
+    # Stop after this many seconds and return whatever is ready
+    deadline_seconds: Optional[float] = Field(None, gt=0)
+    # Skip the LLM response and stage caches and generate everything afresh;
+    # the new results still update the caches
+    refresh: bool = False
+
+class JobRequest(IdeationRequest):
+    priority: Literal["high", "normal", "low"] = "normal"
 
 class Trend(BaseModel):
     topic: str
@@ -32,6 +42,11 @@ class ContentIdea(BaseModel):
     trending: bool = False
     keywords: List[str] = []
     estimated_engagement: Optional[str] = None
+    # Set when the idea is a near-copy of another in this run or in history
+    duplicate_of: Optional[str] = None
+    similarity: Optional[float] = None
+    # 1 - cosine similarity to the closest previously generated idea
+    novelty: Optional[float] = None
 
 class AgentMessage(BaseModel):
     agent_name: str
@@ -1,5 +1,15 @@
 from typing import TypedDict, List, Dict, Annotated
-from langgraph.graph import add_messages
+from app.graph.a2a_protocol import A2AMessage, add_a2a_messages
+
+
+def merge_dicts(left: Dict, right: Dict) -> Dict:
+    return {**(left or {}), **(right or {})}
+
+
+def last_value(left, right):
+    """Reducer for keys that parallel branches may both write in one step"""
+    return right
+
 
 class AgentState(TypedDict):
     # Input
@@ -7,24 +17,65 @@ class AgentState(TypedDict):
     target_audience: str
     content_types: List[str]
     additional_context: str
-    
+    graph_mode: str
+    refresh: bool  # bypass the caches for this run
+
     # Agent Communication (a2a protocol)
-    messages: Annotated[List[Dict], add_messages]
+    messages: Annotated[List[A2AMessage], add_a2a_messages]
     # agent_cards: List[AgentCard]
 
-    
+
     # Agent 1: Trend Researcher Output
     trends: List[Dict]
     trend_sources: List[str]
-    
+
     # Agent 2: Audience Analyst Output
     audience_insights: List[Dict]
     personas: List[Dict]
-    
+
     # Agent 3: Creative Writer Output
     content_ideas: List[Dict]
-    
-    # Metadata
+
+    # Metadata (agent log lines are kept outside the state, see app.services.run_log)
     current_agent: str
-    execution_logs: List[Dict]
-    error: str
\ No newline at end of file
+    error: str
+    stage_timings: Annotated[Dict[str, float], merge_dicts]
+    trace_context: Dict[str, str]
+
+
+class ParallelAgentState(TypedDict):
+    """
+    State for the parallel topology, where the audience profiler runs
+    alongside the researcher. Nodes return only the keys they changed,
+    so shared keys need reducers instead of last-write semantics.
+    """
+    # Input
+    industry: str
+    target_audience: str
+    content_types: List[str]
+    additional_context: str
+    graph_mode: str
+    refresh: bool  # bypass the caches for this run
+
+    # Agent Communication (a2a protocol)
+    messages: Annotated[List[A2AMessage], add_a2a_messages]
+
+    # Agent 1: Trend Researcher Output
+    trends: List[Dict]
+    trend_sources: List[str]
+
+    # Agent 2a: Audience Profiler Output (trend-independent)
+    audience_profile: List[Dict]
+    personas: List[Dict]
+
+    # Agent 2b: Trend/Persona Mapping Output
+    audience_insights: List[Dict]
+
+    # Agent 3: Creative Writer Output
+    content_ideas: List[Dict]
+
+    # Metadata (agent log lines are kept outside the state, see app.services.run_log)
+    current_agent: Annotated[str, last_value]
+    error: Annotated[str, last_value]
+    stage_timings: Annotated[Dict[str, float], merge_dicts]
+    trace_context: Dict[str, str]
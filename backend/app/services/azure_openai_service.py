@@ -1,31 +1,265 @@
-from openai import AsyncAzureOpenAI
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient, RateLimitError
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import importlib.util
+import logging
 import os
-from dotenv import load_dotenv
+import time
+import httpx
+from app.config import settings
+from app.services.mock_llm import build_mock_client
+from app.services.llm_cache import LLMResponseCache, build_llm_cache, make_cache_key
+from app.services.rate_limiter import AzureRateLimiter, estimate_tokens, retry_after_seconds
+from app.services.metrics import current_agent, record_llm_call
+from app.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful expert assistant."
+
+
+def build_http_client(settings) -> DefaultAsyncHttpxClient:
+    """
+    The pooled HTTP client for Azure OpenAI: sized to the limiter's
+    concurrency ceiling (more connections could never be used), idle
+    connections kept alive between requests, HTTP/2 when h2 is installed.
+    """
+    max_connections = settings.llm_http_max_connections or settings.llm_max_concurrency
+    http2 = settings.llm_http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("LLM_HTTP2 is on but the h2 package is missing; using HTTP/1.1")
+        http2 = False
+    return DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive or max_connections,
+            keepalive_expiry=settings.llm_http_keepalive_seconds,
+        ),
+        timeout=httpx.Timeout(settings.llm_http_timeout_seconds, connect=settings.llm_http_connect_timeout_seconds),
+    )
 
-load_dotenv()
 
 class AzureOpenAIService:
-    def __init__(self):
-        self.client = AsyncAzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version="2024-02-15-preview",
-        )
-        self.deployment = os.getenv("AZURE_DEPLOYMENT")
-
-    async def generate(self, prompt: str, temperature: float, max_tokens: int) -> str:
-        response = await self.client.chat.completions.create(
-            model=self.deployment,
-            messages=[
-                {"role": "system", "content": "You are a helpful expert assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
+    def __init__(self, cache: LLMResponseCache | None = None, limiter: AzureRateLimiter | None = None):
+        if settings.llm_backend == "mock":
+            # Offline backend for tests and benchmarks; see app/services/mock_llm.py
+            self.client = build_mock_client(settings)
+            self.deployment = "mock"
+        else:
+            self.client = AsyncAzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                api_version=settings.azure_openai_api_version,
+                # 429s are handled by the shared limiter below, not per-call retries
+                max_retries=0,
+                http_client=build_http_client(settings),
+            )
+            self.deployment = os.getenv("AZURE_DEPLOYMENT")
+        self.cache = cache if cache is not None else build_llm_cache(settings)
+        # Shared by every request and batch row in this process
+        self.limiter = limiter or AzureRateLimiter(
+            rpm=settings.azure_rpm_limit,
+            tpm=settings.azure_tpm_limit,
+            max_concurrency=settings.llm_max_concurrency,
         )
 
-        content = response.choices[0].message.content
+    async def warm_up(self) -> None:
+        """Open a pooled connection to the endpoint (TCP + TLS) ahead of the first request"""
+        if settings.llm_backend == "mock":
+            return
+        await self.client.models.list()
+
+    async def close(self) -> None:
+        """Close pooled connections (the mock client has none)"""
+        if settings.llm_backend != "mock":
+            await self.client.close()
+
+    @asynccontextmanager
+    async def _completion(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool = False,
+        span: Optional[Dict] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Create a chat completion under the rate limiter, retrying throttled
+        calls after Azure's retry-after. The limiter slot is held until the
+        caller is done with the response, so streams count against concurrency.
+
+        `span`, when given, accumulates `queue_wait` across attempts and gets
+        `started` set when the successful request is sent.
+        """
+        tokens = estimate_tokens(SYSTEM_PROMPT + prompt, max_tokens)
+        attempt = 0
+        while True:
+            async with self.limiter.slot(tokens) as slot:
+                if span is not None:
+                    span["queue_wait"] = span.get("queue_wait", 0.0) + slot.wait
+                    span["started"] = time.perf_counter()
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=self.deployment,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=stream,
+                        # Streams only report usage (on a final chunk) when asked
+                        **({"stream_options": {"include_usage": True}} if stream else {}),
+                    )
+                except RateLimitError as e:
+                    delay = slot.throttled(retry_after_seconds(e), attempt)
+                    attempt += 1
+                    if attempt > settings.llm_max_retries:
+                        raise
+                    logger.warning(f"Azure OpenAI throttled; retry {attempt} in {delay:.1f}s")
+                    continue
+
+                try:
+                    yield response
+                finally:
+                    if stream:
+                        # Release the HTTP connection even when the consumer
+                        # is cancelled mid-stream
+                        close = getattr(response, "close", None) or getattr(response, "aclose", None)
+                        if close is not None:
+                            await close()
+                return
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        *,
+        use_cache: bool = True,
+    ) -> str:
+        """Return the completion text, served from the response cache when possible.
+
+        Pass `use_cache=False` to force a fresh completion; the fresh result
+        still refreshes the cache entry for later callers.
+        """
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(self.deployment, SYSTEM_PROMPT, prompt, temperature, max_tokens)
+            if use_cache:
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    record_llm_call(cached=True)
+                    return cached
+            else:
+                self.cache.record_bypass()
+
+        span = {}
+        async with self._completion(prompt, temperature, max_tokens, span=span) as response:
+            content = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+
         if not content:
             raise ValueError("Azure OpenAI returned empty content")
 
-        return content
\ No newline at end of file
+        self._record(span, prompt, content, usage)
+
+        if key is not None:
+            await self.cache.set(key, content)
+
+        return content
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        *,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """Yield completion text deltas as Azure produces them.
+
+        A cache hit is yielded as a single chunk. The assembled text is
+        stored in the cache once the stream completes.
+        """
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(self.deployment, SYSTEM_PROMPT, prompt, temperature, max_tokens)
+            if use_cache:
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    record_llm_call(cached=True)
+                    yield cached
+                    return
+            else:
+                self.cache.record_bypass()
+
+        parts = []
+        span = {}
+        usage = None
+        ttft = None
+        async with self._completion(prompt, temperature, max_tokens, stream=True, span=span) as stream:
+            async for chunk in stream:
+                # Usage arrives on a final choice-less chunk when the API provides it
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - span["started"]
+                    parts.append(delta)
+                    yield delta
+
+        if not parts:
+            raise ValueError("Azure OpenAI returned empty content")
+
+        self._record(span, prompt, "".join(parts), usage, ttft)
+
+        if key is not None:
+            await self.cache.set(key, "".join(parts))
+
+    @staticmethod
+    def _record(span: Dict, prompt: str, content: str, usage: Any, ttft: Optional[float] = None) -> None:
+        """Report a completed call; token counts are estimated when `usage` is absent"""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = len(SYSTEM_PROMPT + prompt) // 4
+        if completion_tokens is None:
+            completion_tokens = len(content) // 4
+        latency = time.perf_counter() - span["started"]
+        record_llm_call(
+            cached=False,
+            queue_wait=span.get("queue_wait", 0.0),
+            latency=latency,
+            ttft=ttft,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            estimated=estimated,
+            prompt_cost_per_1k=settings.llm_prompt_cost_per_1k,
+            completion_cost_per_1k=settings.llm_completion_cost_per_1k,
+        )
+
+        # Trace spans are reconstructed from the measurements, so untraced calls pay nothing extra
+        end_ns = time.time_ns()
+        start_ns = end_ns - int(latency * 1e9)
+        queue_ns = int(span.get("queue_wait", 0.0) * 1e9)
+        if queue_ns >= 1_000_000:
+            tracer.record("llm.queue_wait", start_ns - queue_ns, start_ns)
+        tracer.record(
+            "llm.completion",
+            start_ns,
+            end_ns,
+            agent=current_agent.get(),
+            ttft=round(ttft, 4) if ttft is not None else -1.0,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.snapshot()}
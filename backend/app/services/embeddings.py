@@ -0,0 +1,143 @@
+"""
+Text embeddings computed locally on the CPU.
+
+`HashedTfidfEmbedder` needs nothing beyond NumPy: words and word pairs are
+hashed into a fixed number of signed buckets and weighted by sublinear term
+frequency times inverse document frequency. Set EMBEDDING_MODEL to a
+sentence-transformers model name to use a real model instead, if that
+package is installed.
+"""
+import logging
+import math
+import re
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+# Question and filler words that would otherwise dominate short queries
+STOPWORDS = frozenset(
+    "a an and are about as at be by do for from has have how i in is it its of on or our so that the their "
+    "this to was we what when which who why will with you your already generated ideas any".split()
+)
+
+
+def tokens(text: str) -> List[str]:
+    words = [word for word in _TOKEN.findall((text or "").lower()) if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashedTfidfEmbedder:
+    name = "hashed-tfidf"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        # Document frequency per bucket, grown by `observe`
+        self.df = np.zeros(dim, dtype=np.float64)
+        self.docs = 0
+
+    def _buckets(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for token in tokens(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            bucket = h % self.dim
+            # A sign bit per token keeps colliding tokens from only adding up
+            counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return counts
+
+    def observe(self, texts: Iterable[str]) -> None:
+        """Count `texts` towards document frequencies (call before embedding them for storage)"""
+        for text in texts:
+            buckets = list(self._buckets(text))
+            self.df[buckets] += 1
+            self.docs += 1
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        idf = np.log((1 + self.docs) / (1 + self.df)) + 1
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, count in self._buckets(text).items():
+                if count:
+                    out[row, bucket] = math.copysign(1 + math.log(abs(count)), count)
+        out *= idf.astype(np.float32)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"df": self.df, "docs": np.array([self.docs])}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        if state["df"].shape == self.df.shape:
+            self.df = state["df"].astype(np.float64)
+            self.docs = int(state["docs"][0])
+
+
+class HashedCharEmbedder:
+    """Character n-grams hashed into signed buckets; suited to short keys like industry names"""
+    name = "hashed-char"
+
+    def __init__(self, dim: int = 256, n: int = 3):
+        self.dim = dim
+        self.n = n
+
+    def observe(self, texts: Iterable[str]) -> None:
+        pass
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f" {' '.join(_TOKEN.findall((text or '').lower()))} "
+            if len(padded) <= 2:
+                continue
+            for start in range(len(padded) - self.n + 1):
+                h = zlib.crc32(padded[start:start + self.n].encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def observe(self, texts: Iterable[str]) -> None:
+        pass
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        return self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        pass
+
+
+_models: Dict[str, SentenceTransformerEmbedder] = {}
+
+
+def build_embedder(model_name: Optional[str] = None, dim: int = 256, fallback: Callable = HashedTfidfEmbedder):
+    """The named model (loaded once per process and shared), else `fallback(dim)`"""
+    if model_name:
+        try:
+            if model_name not in _models:
+                _models[model_name] = SentenceTransformerEmbedder(model_name)
+            return _models[model_name]
+        except ImportError:
+            logger.warning(f"sentence-transformers is not installed; using {fallback.name} instead of {model_name}")
+    return fallback(dim)
@@ -0,0 +1,184 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+@dataclass
+class Job:
+    id: str
+    payload: Dict[str, Any]
+    priority: str = "normal"
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record a progress event and wake anyone following the job"""
+        self.events.append(event)
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Replay past events, then yield new ones until the job finishes"""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait": (self.started_at - self.created_at) if self.started_at else None,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Bounded priority queue drained by a fixed pool of asyncio workers.
+
+    Submissions beyond `max_queue_size` waiting jobs are rejected with
+    `JobQueueFull` so the API can shed load instead of piling up work.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[Dict[str, Any]]],
+        workers: int = 4,
+        max_queue_size: int = 100,
+        retention: int = 1000,
+    ):
+        self.runner = runner
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.retention = retention
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel running jobs and fail queued ones, so nobody following a job waits forever"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            job.status = "failed"
+            job.error = "cancelled"
+            job.finished_at = time.time()
+            job._notify()
+
+    def submit(self, payload: Dict[str, Any], priority: str = "normal") -> Job:
+        self.start()
+        job = Job(id=str(uuid.uuid4()), payload=payload, priority=priority)
+        try:
+            # The sequence number keeps FIFO order within a priority level
+            self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(f"Job queue is full ({self.max_queue_size} waiting)")
+
+        self.jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            self.running += 1
+            try:
+                job.result = await self.runner(job)
+                job.status = "succeeded"
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.status = "failed"
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                self.running -= 1
+                job._notify()
+                self._queue.task_done()
+
+    def _evict(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit"""
+        excess = len(self.jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self.jobs.values() if j.done][:excess]:
+            del self.jobs[job_id]
+
+    def metrics(self) -> Dict[str, Any]:
+        depth_by_priority = {name: 0 for name in PRIORITIES}
+        for job in self.jobs.values():
+            if job.status == "queued":
+                depth_by_priority[job.priority] += 1
+        return {
+            "workers": self.workers,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_depth_by_priority": depth_by_priority,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
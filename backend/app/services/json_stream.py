@@ -0,0 +1,133 @@
+import json
+from typing import Any, Dict, List
+
+# Agents return arrays of objects, so only "[{" (or an empty "[]") opens the
+# result; "[Note]", "[2024]" or "see [1]" is prose, not the array we want
+_ARRAY_START = set("{]")
+
+
+class JSONArrayStream:
+    """Incrementally extract the elements of the first top-level JSON array of objects.
+
+    Feed it text chunks as they arrive from the LLM; `feed` returns the
+    elements that closed within that chunk, already decoded. Leading prose
+    and code fences are skipped, anything after the closing bracket is
+    ignored, and a malformed element is counted in `failed` rather than
+    discarding the elements around it.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._started = False
+        self._candidate = False
+        self._finished = False
+        self._closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.items: List[Any] = []
+        self.failed = 0
+
+    @property
+    def finished(self) -> bool:
+        """True once the outer array's closing bracket has been seen"""
+        return self._finished
+
+    @property
+    def truncated(self) -> bool:
+        """True when the stream ended inside the array (e.g. max_tokens hit)"""
+        return self._closed and self._started and not self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        completed = []
+        for ch in chunk:
+            if self._finished:
+                break
+
+            if not self._started:
+                if self._candidate:
+                    if ch.isspace():
+                        continue
+                    self._candidate = False
+                    if ch in _ARRAY_START:
+                        self._started = True
+                        self._depth = 1
+                        # Fall through so this character is consumed below
+                    else:
+                        continue
+                elif ch == "[":
+                    self._candidate = True
+                    continue
+                else:
+                    continue
+
+            if self._in_string:
+                self._buffer.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+
+            if self._depth == 0:
+                # Closing bracket of the outer array
+                self._flush(completed)
+                if not self.items and self.failed:
+                    # Nothing decoded: it was a bracketed aside, keep looking
+                    self._started = False
+                    self.failed = 0
+                else:
+                    self._finished = True
+            elif self._depth == 1 and ch == ",":
+                self._flush(completed)
+            else:
+                self._buffer.append(ch)
+
+        return completed
+
+    def close(self) -> None:
+        """Mark the end of input; a dangling partial element counts as failed"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._started and not self._finished and "".join(self._buffer).strip():
+            self.failed += 1
+        self._buffer = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "parsed": len(self.items),
+            "failed": self.failed,
+            "complete": self._finished,
+        }
+
+    def _flush(self, completed: List[Any]) -> None:
+        text = "".join(self._buffer).strip()
+        self._buffer = []
+        if not text:
+            # Empty slot, e.g. a trailing comma before "]"
+            return
+        try:
+            item = json.loads(text)
+        except ValueError:
+            self.failed += 1
+            return
+        self.items.append(item)
+        completed.append(item)
+
+
+def parse_json_array(text: str) -> JSONArrayStream:
+    """Parse a complete response in one go, keeping whatever elements decode"""
+    parser = JSONArrayStream()
+    parser.feed(text)
+    parser.close()
+    return parser
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    deployment: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Content-address a completion request (sha256 over its inputs)."""
+    raw = json.dumps(
+        [deployment or "", system_prompt, prompt, round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hits": self.memory_hits + self.disk_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryLRUCache:
+    """In-process LRU with per-entry TTL and a total byte budget."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._pop(key)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._pop(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _pop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SQLiteCache:
+    """Persistent cache tier backed by a single SQLite file.
+
+    Calls are blocking; `LLMResponseCache` runs them in a worker thread.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 24 * 3600, table: str = "llm_cache"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # One file can hold several caches (one table each), and be shared by worker processes
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[tuple[str, float]]:
+        """(value, expires_at wall-clock time) for a fresh entry, else None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < time.time():
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value, expires_at
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+            return removed
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM {self.table}").rowcount
+            self._conn.commit()
+            return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """Two-tier (memory, optional disk) cache for raw completion text."""
+
+    def __init__(
+        self,
+        memory: Optional[MemoryLRUCache] = None,
+        disk: Optional[SQLiteCache] = None,
+    ):
+        self.memory = memory or MemoryLRUCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.warning(f"LLM disk cache read failed: {e}")
+                value = None
+            if value is not None:
+                self.stats.disk_hits += 1
+                # Promote to the memory tier
+                self.memory.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.stats.stores += 1
+        self.stats.evictions = self.memory.evictions
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value)
+            except Exception as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
+
+    def record_bypass(self) -> None:
+        self.stats.bypasses += 1
+
+    async def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.clear)
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.stats.as_dict(),
+            "entries": len(self.memory),
+            "bytes": self.memory.size_bytes,
+            "disk_enabled": self.disk is not None,
+        }
+
+
+def build_llm_cache(settings) -> Optional[LLMResponseCache]:
+    """Create the response cache described by `Settings`, or None if disabled."""
+    if not settings.llm_cache_enabled:
+        return None
+
+    memory = MemoryLRUCache(
+        max_entries=settings.llm_cache_max_entries,
+        max_bytes=settings.llm_cache_max_bytes,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+    )
+    disk = None
+    if settings.llm_cache_path:
+        try:
+            disk = SQLiteCache(settings.llm_cache_path, ttl_seconds=settings.llm_cache_disk_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM disk cache disabled ({settings.llm_cache_path}): {e}")
+    return LLMResponseCache(memory=memory, disk=disk)
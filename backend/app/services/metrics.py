@@ -0,0 +1,219 @@
+"""
+In-process metrics with Prometheus text exposition, plus a per-request
+breakdown collected through a context variable.
+
+Process-wide histograms and counters live in module-level objects and are
+rendered by `render_prometheus()` for the /metrics endpoint. Each workflow
+run also gets a `RequestMetrics` recorder (see `IdeationWorkflow`) so the
+same spans can be reported back in that request's response metadata.
+"""
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+NODE_SECONDS = Histogram("ideation_node_seconds", "Wall time per graph node", ("node",))
+REQUEST_SECONDS = Histogram("ideation_request_seconds", "End-to-end workflow time", ("graph_mode",))
+LLM_QUEUE_WAIT_SECONDS = Histogram("llm_queue_wait_seconds", "Time waiting for the rate limiter", ("agent",))
+LLM_LATENCY_SECONDS = Histogram("llm_latency_seconds", "Completion latency, request to last token", ("agent",))
+LLM_TTFT_SECONDS = Histogram("llm_time_to_first_token_seconds", "Streaming time to first token", ("agent",))
+LLM_CALLS = Counter("llm_calls_total", "LLM generate calls", ("agent", "cached"))
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used (from the usage field, else estimated)", ("agent", "kind"))
+LLM_ESTIMATED_USAGE = Counter(
+    "llm_estimated_usage_total", "Calls whose tokens and cost were estimated (no usage field)", ("agent",)
+)
+LLM_COST = Counter("llm_cost_total", "Estimated spend in the configured currency", ("agent",))
+PARSE_SECONDS = Histogram("agent_parse_seconds", "Time parsing LLM responses", ("agent",), FAST_BUCKETS)
+CANCELLED = Counter("ideation_cancelled_total", "Runs stopped early: client cancel, disconnect or deadline", ("reason",))
+PARSE_FAILURES = Counter("agent_parse_failures_total", "Malformed elements skipped while parsing", ("agent",))
+
+_METRICS = [
+    NODE_SECONDS, REQUEST_SECONDS, LLM_QUEUE_WAIT_SECONDS, LLM_LATENCY_SECONDS, LLM_TTFT_SECONDS,
+    LLM_CALLS, LLM_TOKENS, LLM_ESTIMATED_USAGE, LLM_COST, PARSE_SECONDS, PARSE_FAILURES, CANCELLED,
+]
+_GAUGES: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+
+def register(metric):
+    """Add a Counter or Histogram defined elsewhere to the /metrics output"""
+    _METRICS.append(metric)
+    return metric
+
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]) -> None:
+    """Expose a value computed at scrape time (queue depth, in-flight calls, ...)"""
+    _GAUGES[name] = (help_text, read)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for name, (help_text, read) in sorted(_GAUGES.items()):
+        try:
+            value = float(read())
+        except Exception:
+            continue
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"])
+    return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """Spans recorded during one workflow run, summarized for response metadata"""
+
+    def __init__(self):
+        self.nodes: Dict[str, float] = {}
+        self.llm_calls: List[Dict] = []
+        self.parses: List[Dict] = []
+
+    def breakdown(self) -> Dict:
+        fresh = [c for c in self.llm_calls if not c["cached"]]
+        return {
+            "nodes": dict(self.nodes),
+            "llm": {
+                "calls": len(self.llm_calls),
+                "cached_calls": len(self.llm_calls) - len(fresh),
+                # Shared with a concurrent identical request that started them
+                "coalesced_calls": sum(1 for c in self.llm_calls if c.get("coalesced")),
+                "queue_wait": round(sum(c["queue_wait"] for c in fresh), 4),
+                "latency": round(sum(c["latency"] for c in fresh), 4),
+                "prompt_tokens": sum(c["prompt_tokens"] for c in fresh),
+                "completion_tokens": sum(c["completion_tokens"] for c in fresh),
+                "cost": round(sum(c["cost"] for c in fresh), 6),
+                "per_call": self.llm_calls,
+            },
+            "parse": {
+                "seconds": round(sum(p["seconds"] for p in self.parses), 6),
+                "failures": sum(p["failed"] for p in self.parses),
+            },
+        }
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request_metrics", default=None)
+# Which agent is calling the LLM, so service-level spans can be attributed
+current_agent: ContextVar[str] = ContextVar("current_agent", default="")
+
+
+def record_node(node: str, seconds: float) -> None:
+    NODE_SECONDS.observe(seconds, node=node)
+    recorder = current_request.get()
+    if recorder is not None:
+        recorder.nodes[node] = round(seconds, 4)
+
+
+def record_llm_call(
+    *,
+    cached: bool,
+    queue_wait: float = 0.0,
+    latency: float = 0.0,
+    ttft: Optional[float] = None,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    estimated: bool = False,
+    prompt_cost_per_1k: float = 0.0,
+    completion_cost_per_1k: float = 0.0,
+) -> None:
+    agent = current_agent.get() or "unknown"
+    LLM_CALLS.inc(agent=agent, cached=str(cached).lower())
+    cost = 0.0
+    if not cached:
+        cost = prompt_tokens / 1000 * prompt_cost_per_1k + completion_tokens / 1000 * completion_cost_per_1k
+        LLM_QUEUE_WAIT_SECONDS.observe(queue_wait, agent=agent)
+        LLM_LATENCY_SECONDS.observe(latency, agent=agent)
+        if ttft is not None:
+            LLM_TTFT_SECONDS.observe(ttft, agent=agent)
+        LLM_TOKENS.inc(prompt_tokens, agent=agent, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, agent=agent, kind="completion")
+        LLM_COST.inc(cost, agent=agent)
+        if estimated:
+            LLM_ESTIMATED_USAGE.inc(agent=agent)
+
+    recorder = current_request.get()
+    if recorder is not None:
+        recorder.llm_calls.append({
+            "agent": agent,
+            "cached": cached,
+            "queue_wait": round(queue_wait, 4),
+            "latency": round(latency, 4),
+            "ttft": round(ttft, 4) if ttft is not None else None,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated": estimated,
+            "coalesced": False,
+            "cost": round(cost, 6),
+        })
+
+
+def record_parse(agent: str, seconds: float, failed: int) -> None:
+    PARSE_SECONDS.observe(seconds, agent=agent)
+    if failed:
+        PARSE_FAILURES.inc(failed, agent=agent)
+    recorder = current_request.get()
+    if recorder is not None:
+        recorder.parses.append({"agent": agent, "seconds": seconds, "failed": failed})
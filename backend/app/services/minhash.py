@@ -0,0 +1,167 @@
+"""
+MinHash signatures and an LSH index for near-duplicate text.
+
+Texts are reduced to character shingles, hashed with NumPy, and summarised
+as `num_perm` minimum hash values; the fraction of equal values estimates
+the Jaccard similarity of two shingle sets. The index splits signatures
+into bands and only compares against ideas sharing a band, so a lookup
+touches a handful of candidates however large the corpus is.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_SHIFT = np.uint32(16)
+_BASE = np.uint32(16777619)
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^\w]+", " ", (text or "").lower()).strip()
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """Distinct 32-bit hashes of the text's k-byte shingles"""
+    data = np.frombuffer(normalize(text).encode("utf-8"), dtype=np.uint8)
+    if len(data) < k:
+        data = np.pad(data, (0, k - len(data)))
+    windows = np.lib.stride_tricks.sliding_window_view(data, k).astype(np.uint32)
+    powers = _BASE ** np.arange(k - 1, -1, -1, dtype=np.uint32)
+    return np.unique((windows * powers).sum(axis=1, dtype=np.uint32))
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) whose LSH S-curve best separates pairs around `threshold`"""
+    xs = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        hit = 1 - (1 - xs ** rows) ** bands
+        false_positive = np.where(xs < threshold, hit, 0).mean()
+        false_negative = np.where(xs >= threshold, 1 - hit, 0).mean()
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64).astype(np.uint32) | np.uint32(1)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64).astype(np.uint32)
+
+    def _permute(self, hashes: np.ndarray) -> np.ndarray:
+        # One multiply-add-xorshift hash per permutation, wrapping in uint32:
+        # several times cheaper than modular arithmetic on uint64
+        x = np.multiply.outer(hashes, self.a)
+        x += self.b
+        x ^= x >> _SHIFT
+        return x
+
+    def signature(self, text: str) -> np.ndarray:
+        return self._permute(shingle_hashes(text)).min(axis=0)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for row, text in enumerate(texts):
+            out[row] = self.signature(text)
+        return out
+
+
+class LSHIndex:
+    """Banded MinHash index; `query` returns keys whose estimated Jaccard is >= threshold"""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, merge_every: int = 4096):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self.merge_every = merge_every
+        self._mix = np.random.default_rng(7).integers(1, 1 << 63, self.rows, dtype=np.uint64) | np.uint64(1)
+
+        self.keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        # Per band: band hashes sorted for searchsorted, and the row each came from
+        self._sorted = [np.empty(0, dtype=np.uint64) for _ in range(self.bands)]
+        self._sorted_rows = [np.empty(0, dtype=np.int64) for _ in range(self.bands)]
+        # Rows added since the last merge, looked up by dict
+        self._recent: Dict[Tuple[int, int], List[int]] = {}
+        self._recent_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        shaped = signatures[..., : self.bands * self.rows].reshape(*signatures.shape[:-1], self.bands, self.rows)
+        return (shaped.astype(np.uint64) * self._mix).sum(axis=-1, dtype=np.uint64)
+
+    def add(self, key: str, signature: np.ndarray) -> None:
+        self.add_many([key], signature[None, :])
+
+    def add_many(self, keys: List[str], signatures: np.ndarray) -> None:
+        fresh = [i for i, key in enumerate(keys) if key not in self._positions]
+        if not fresh:
+            return
+        start = len(self.keys)
+        needed = start + len(fresh)
+        if needed > len(self._signatures):
+            grown = np.empty((max(needed, 2 * len(self._signatures)), self.num_perm), dtype=np.uint32)
+            grown[:start] = self._signatures[:start]
+            self._signatures = grown
+        self._signatures[start:needed] = signatures[fresh]
+        for offset, i in enumerate(fresh):
+            self._positions[keys[i]] = start + offset
+            self.keys.append(keys[i])
+
+        if len(fresh) >= self.merge_every:
+            self._recent_rows.extend(range(start, needed))
+            self._merge()
+            return
+        bands = self._band_hashes(signatures[fresh])
+        for offset, row_hashes in enumerate(bands):
+            row = start + offset
+            self._recent_rows.append(row)
+            for band, value in enumerate(row_hashes.tolist()):
+                self._recent.setdefault((band, value), []).append(row)
+        if len(self._recent_rows) >= self.merge_every:
+            self._merge()
+
+    def _merge(self) -> None:
+        rows = np.asarray(self._recent_rows, dtype=np.int64)
+        bands = self._band_hashes(self._signatures[rows])
+        for band in range(self.bands):
+            values = np.concatenate([self._sorted[band], bands[:, band]])
+            owners = np.concatenate([self._sorted_rows[band], rows])
+            order = np.argsort(values, kind="stable")
+            self._sorted[band], self._sorted_rows[band] = values[order], owners[order]
+        self._recent.clear()
+        self._recent_rows.clear()
+
+    def query(self, signature: np.ndarray, limit: int = 1) -> List[Tuple[str, float]]:
+        """Up to `limit` (key, similarity) pairs at or above the threshold, most similar first"""
+        candidates = set()
+        for band, value in enumerate(self._band_hashes(signature).tolist()):
+            candidates.update(self._recent.get((band, value), ()))
+            column = self._sorted[band]
+            if len(column):
+                lo = np.searchsorted(column, np.uint64(value), side="left")
+                hi = np.searchsorted(column, np.uint64(value), side="right")
+                candidates.update(self._sorted_rows[band][lo:hi].tolist())
+        if not candidates:
+            return []
+
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        keep = np.flatnonzero(similarity >= self.threshold)
+        best = keep[np.argsort(-similarity[keep], kind="stable")][:limit]
+        return [(self.keys[rows[i]], round(float(similarity[i]), 3)) for i in best]
+
+    def best_match(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """The most similar key other than `exclude` (the probe's own key, if it is indexed)"""
+        matches = [match for match in self.query(signature, limit=2) if match[0] != exclude]
+        return matches[0] if matches else None
@@ -0,0 +1,170 @@
+"""
+Deterministic stand-in for the Azure OpenAI client.
+
+`MockAsyncOpenAI` mimics the slice of `AsyncAzureOpenAI` the service uses
+(`chat.completions.create`, streaming or not), so the cache, rate limiter
+and agents all run unchanged with LLM_BACKEND=mock. Responses are canned
+JSON shaped for whichever agent prompt was sent, seeded from the prompt so
+the same request always produces the same output.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+from openai import InternalServerError, RateLimitError
+
+ADJECTIVES = ["Embedded", "Autonomous", "Invisible", "Composable", "Real-Time", "Regulated", "Open", "Predictive"]
+NOUNS = ["Finance", "Workflows", "Compliance", "Onboarding", "Analytics", "Payments", "Identity", "Pricing"]
+PERSONAS = ["Technical Founder", "Growth Lead", "Operations Manager", "First-Time CFO", "Product Owner"]
+PAIN_POINTS = ["Limited headcount", "Slow onboarding", "Rising costs", "Regulatory pressure", "Churn"]
+
+
+class MockAsyncOpenAI:
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_distribution: str = "lognormal",
+        tokens_per_second: float = 60.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        # Failure injection draws from its own stream so canned content stays stable
+        self._faults = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, *, messages: List[Dict], max_tokens: int, stream: bool = False, **kwargs) -> Any:
+        prompt = messages[-1]["content"]
+        await asyncio.sleep(self._first_token_delay())
+        self._maybe_fail()
+
+        content = self._canned_response(prompt)
+        usage = SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+            completion_tokens=len(content) // 4,
+        )
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        if stream:
+            # Like the API, a stream only ends with usage when it was requested
+            include_usage = (kwargs.get("stream_options") or {}).get("include_usage")
+            return self._stream(content, usage if include_usage else None)
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=usage,
+        )
+
+    async def _stream(self, content: str, usage: SimpleNamespace) -> AsyncIterator[Any]:
+        # ~4 characters per token, paced at the configured token rate
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i in range(0, len(content), 4):
+            await asyncio.sleep(delay)
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + 4]), finish_reason=None)],
+                usage=None,
+            )
+        if usage is not None:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+    def _first_token_delay(self) -> float:
+        mean = self.latency_ms / 1000.0
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "fixed":
+            return mean
+        if self.latency_distribution == "uniform":
+            return self._faults.uniform(0.5 * mean, 1.5 * mean)
+        # lognormal with the requested mean and a long right tail
+        sigma = 0.5
+        return self._faults.lognormvariate(0.0, sigma) * mean / math.exp(sigma ** 2 / 2)
+
+    def _maybe_fail(self) -> None:
+        request = httpx.Request("POST", "https://mock.openai.azure.com/chat/completions")
+        roll = self._faults.random()
+        if roll < self.throttle_rate:
+            response = httpx.Response(429, headers={"retry-after-ms": "200"}, request=request)
+            raise RateLimitError("Mock throttle", response=response, body=None)
+        if roll < self.throttle_rate + self.error_rate:
+            response = httpx.Response(500, request=request)
+            raise InternalServerError("Mock server error", response=response, body=None)
+
+    def _canned_response(self, prompt: str) -> str:
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+        if "trend research expert" in prompt:
+            body = [
+                {
+                    "topic": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+                    "relevance_score": round(rng.uniform(0.6, 0.95), 2),
+                    "description": "A fast-moving shift that teams are budgeting for this year.",
+                    "source": rng.choice(["Industry reports", "News", "Social media"]),
+                }
+                for _ in range(rng.randint(5, 7))
+            ]
+        elif "Profile the target audience" in prompt:
+            body = [
+                {
+                    "persona": persona,
+                    "context": "Owns the decision and feels the pain daily.",
+                    "pain_points": rng.sample(PAIN_POINTS, 2),
+                    "content_preferences": ["Practical guides", "Short videos"],
+                }
+                for persona in rng.sample(PERSONAS, 3)
+            ]
+        elif "audience analysis expert" in prompt:
+            trends_section = prompt.split("Personas:")[0]
+            topics = re.findall(r"^- ([^:\n]+):", trends_section, re.MULTILINE) or ["Industry Transformation"]
+            body = [
+                {
+                    "topic": topic,
+                    "angle": "What this changes for your next quarter",
+                    "hook": f"{topic} is already reshaping your market.",
+                    "pain_points": rng.sample(PAIN_POINTS, 2),
+                    "target_personas": rng.sample(PERSONAS, 2),
+                }
+                for topic in topics[:5]
+            ]
+        elif "creative content strategist" in prompt:
+            match = re.search(r"Content formats needed: ([^\n]+)", prompt)
+            formats = [f.strip() for f in match.group(1).split(",")] if match else ["blog"]
+            body = [
+                {
+                    "format": fmt,
+                    "title": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}: {n + 1} Moves for {fmt.title()} Readers",
+                    "description": "A practical walkthrough of the shift and what to do about it.",
+                    "structure": "Hook, three examples, checklist, call to action",
+                    "keywords": rng.sample([a.lower() for a in ADJECTIVES + NOUNS], 5),
+                    "confidence": rng.randint(70, 95),
+                    "trending": rng.random() > 0.3,
+                    "estimated_engagement": rng.choice(["High", "Medium"]),
+                }
+                for fmt in formats
+                for n in range(2)
+            ]
+        else:
+            body = []
+
+        return "```json\n" + json.dumps(body, indent=2) + "\n```"
+
+
+def build_mock_client(settings) -> MockAsyncOpenAI:
+    return MockAsyncOpenAI(
+        latency_ms=settings.mock_latency_ms,
+        latency_distribution=settings.mock_latency_distribution,
+        tokens_per_second=settings.mock_tokens_per_second,
+        error_rate=settings.mock_error_rate,
+        throttle_rate=settings.mock_throttle_rate,
+        seed=settings.mock_seed,
+    )
@@ -0,0 +1,183 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Worst-case token cost of a call: ~4 characters per prompt token plus the completion budget"""
+    return len(prompt) // 4 + max_tokens
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; a capacity of 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)"""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity > 0:
+            self.tokens -= min(amount, self.capacity)
+
+
+class _Slot:
+    def __init__(self, limiter: "AzureRateLimiter", wait: float = 0.0):
+        self.limiter = limiter
+        self.wait = wait  # seconds spent queued for admission
+        self.was_throttled = False
+
+    def throttled(self, retry_after: Optional[float], attempt: int) -> float:
+        self.was_throttled = True
+        return self.limiter.on_throttle(retry_after, attempt)
+
+
+class AzureRateLimiter:
+    """
+    Shared admission control for Azure OpenAI calls.
+
+    Callers are admitted in FIFO order once a concurrency slot is free and
+    both the requests-per-minute and tokens-per-minute buckets can cover the
+    call. The concurrency limit adapts AIMD-style: +1 after a window of
+    successes, halved when Azure throttles, and a throttle pauses admission
+    for everyone until its retry-after (with jitter) has passed.
+    """
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.in_flight = 0
+        self.waiting = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._admission = asyncio.Lock()  # FIFO: only the head of the line is admitted
+        self._released = asyncio.Event()
+
+        self.throttle_count = 0
+        self.calls = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[_Slot]:
+        wait = await self._acquire(tokens)
+        self.calls += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+        slot = _Slot(self, wait)
+        # Only a body that finishes (not one that raises or is cancelled) counts towards an increase
+        succeeded = False
+        try:
+            yield slot
+            succeeded = not slot.was_throttled
+        finally:
+            self.in_flight -= 1
+            if succeeded:
+                self._on_success()
+            self._released.set()
+
+    async def _acquire(self, tokens: int) -> float:
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._admission:
+                while True:
+                    now = time.monotonic()
+                    if now < self._paused_until:
+                        await asyncio.sleep(self._paused_until - now)
+                        continue
+
+                    if self.in_flight >= self.limit:
+                        self._released.clear()
+                        await self._released.wait()
+                        continue
+
+                    delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                        continue
+
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    self.in_flight += 1
+                    return time.monotonic() - started
+        finally:
+            self.waiting -= 1
+
+    def _on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit:
+            self._successes = 0
+            self.limit = min(self.max_concurrency, self.limit + 1)
+
+    def on_throttle(self, retry_after: Optional[float], attempt: int) -> float:
+        """Back off after a 429; returns the pause applied to all callers"""
+        self.throttle_count += 1
+        self._successes = 0
+        # Calls that were already in flight often get throttled together;
+        # count that burst as one congestion signal
+        if time.monotonic() >= self._paused_until:
+            self.limit = max(self.min_concurrency, self.limit // 2)
+
+        delay = retry_after if retry_after is not None else min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        delay += random.uniform(0, delay * 0.25)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def metrics(self) -> Dict:
+        return {
+            "concurrency_limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttled": self.throttle_count,
+            "calls": self.calls,
+            "queue_wait_avg": self.wait_total / self.calls if self.calls else 0.0,
+            "queue_wait_max": self.wait_max,
+        }
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Azure's retry-after-ms / retry-after headers off an OpenAI error"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
@@ -0,0 +1,344 @@
+"""
+Persistent store of past ideation runs and their trends, insights and ideas.
+
+Everything lives in one SQLite file in WAL mode. Items are keyed by a
+content hash, so the same idea produced by two runs is stored once and
+linked to both. Writes are queued and flushed in batches from a worker
+thread, so saving a run never blocks the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.graph import a2a_protocol
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    industry TEXT NOT NULL,
+    industry_key TEXT NOT NULL,
+    target_audience TEXT NOT NULL,
+    audience_key TEXT NOT NULL,
+    content_types TEXT NOT NULL,
+    graph_mode TEXT NOT NULL,
+    additional_context TEXT NOT NULL,
+    execution_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_industry ON runs (industry_key, created_at);
+CREATE INDEX IF NOT EXISTS runs_audience ON runs (audience_key, created_at);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    format TEXT,
+    industry_key TEXT NOT NULL,
+    audience_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    times_generated INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS items_kind_industry ON items (kind, industry_key, last_seen);
+CREATE INDEX IF NOT EXISTS items_kind_audience ON items (kind, audience_key, last_seen);
+CREATE INDEX IF NOT EXISTS items_kind_format ON items (kind, format, last_seen);
+
+CREATE TABLE IF NOT EXISTS run_items (
+    run_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (run_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS run_items_item ON run_items (item_id);
+
+CREATE TABLE IF NOT EXISTS run_messages (
+    run_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+KINDS = {"trends": "trend", "audience_insights": "insight", "content_ideas": "idea"}
+
+
+def normalize_text(value: str) -> str:
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+def content_id(*parts: str, length: int = 16) -> str:
+    """Stable id from normalized text; unlike hash() it is the same in every process"""
+    digest = hashlib.sha256("\x1f".join(normalize_text(p) for p in parts).encode("utf-8"))
+    return digest.hexdigest()[:length]
+
+
+def idea_id(format: str, title: str) -> str:
+    return f"{format}-{content_id(format, title, length=12)}"
+
+
+def item_id(kind: str, item: Dict[str, Any], industry_key: str) -> str:
+    if kind == "idea":
+        return item.get("id") or idea_id(item.get("format", ""), item.get("title", ""))
+    if kind == "trend":
+        return f"trend-{content_id(industry_key, item.get('topic', ''), length=12)}"
+    return f"insight-{content_id(item.get('topic', ''), item.get('angle', ''), length=12)}"
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Accepts ISO dates/datetimes ('2025-06-01', '2025-06-01T12:00:00')"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+class ResultStore:
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        self._pending: List[Tuple] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.saved_runs = 0
+
+    # Writes
+
+    def save_run(self, input_data: Dict[str, Any], result: Dict[str, Any], execution_time: float) -> str:
+        """Queue a finished run for the next batch; returns its run id"""
+        run_id = str(uuid.uuid4())
+        self._pending.append((run_id, time.time(), input_data, result, execution_time))
+        if self._flusher is None or self._flusher.get_loop() is not asyncio.get_running_loop():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return run_id
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(batch)} run(s): {e}")
+
+    def _write_batch(self, batch: List[Tuple]) -> None:
+        with self._lock, self._conn:
+            for run_id, created_at, input_data, result, execution_time in batch:
+                industry_key = normalize_text(input_data["industry"])
+                audience_key = normalize_text(input_data["target_audience"])
+                self._conn.execute(
+                    "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id, created_at,
+                        input_data["industry"], industry_key,
+                        input_data["target_audience"], audience_key,
+                        ",".join(input_data.get("content_types", [])),
+                        input_data.get("graph_mode", "sequential"),
+                        input_data.get("additional_context") or "",
+                        execution_time,
+                    ),
+                )
+                position = 0
+                for key, kind in KINDS.items():
+                    for item in result.get(key) or []:
+                        item_key = item_id(kind, item, industry_key)
+                        self._conn.execute(
+                            "INSERT INTO items (id, kind, format, industry_key, audience_key, data, first_seen, last_seen)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                            " ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen,"
+                            " data = excluded.data, times_generated = times_generated + 1",
+                            (
+                                item_key, kind, item.get("format") if kind == "idea" else None,
+                                industry_key, audience_key, json.dumps(item), created_at, created_at,
+                            ),
+                        )
+                        self._conn.execute(
+                            "INSERT OR IGNORE INTO run_items VALUES (?, ?, ?)", (run_id, item_key, position)
+                        )
+                        position += 1
+                if result.get("messages"):
+                    # The run's agent handoffs, encoded once as they leave the process
+                    self._conn.execute(
+                        "INSERT INTO run_messages VALUES (?, ?)", (run_id, a2a_protocol.encode(list(result["messages"])))
+                    )
+        self.saved_runs += len(batch)
+
+    # Reads (blocking; call through asyncio.to_thread)
+
+    def list_runs(
+        self,
+        industry: Optional[str] = None,
+        audience: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        clauses, params = self._filters(industry, audience, since, until, "created_at")
+        sql = (
+            "SELECT r.*, (SELECT COUNT(*) FROM run_items ri JOIN items i ON i.id = ri.item_id"
+            "  WHERE ri.run_id = r.id AND i.kind = 'idea') AS idea_count"
+            " FROM runs r"
+            f"{' WHERE ' + ' AND '.join(clauses) if clauses else ''}"
+            " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [self._run_row(row) for row in rows]
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT *, 0 AS idea_count FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT i.kind, i.data FROM run_items ri JOIN items i ON i.id = ri.item_id"
+                " WHERE ri.run_id = ? ORDER BY ri.position",
+                (run_id,),
+            ).fetchall()
+            messages = self._conn.execute("SELECT data FROM run_messages WHERE run_id = ?", (run_id,)).fetchone()
+        run = self._run_row(row)
+        run.pop("idea_count")
+        for key, kind in KINDS.items():
+            run[key] = [json.loads(item["data"]) for item in items if item["kind"] == kind]
+        run["a2a_messages"] = [m.to_dict() for m in a2a_protocol.decode(messages["data"])] if messages else []
+        return run
+
+    def list_items(
+        self,
+        kind: str = "idea",
+        industry: Optional[str] = None,
+        audience: Optional[str] = None,
+        format: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        clauses, params = self._filters(industry, audience, since, until, "last_seen")
+        clauses.insert(0, "kind = ?")
+        params.insert(0, kind)
+        if format:
+            clauses.append("format = ?")
+            params.append(format)
+        sql = (
+            "SELECT id, data, first_seen, last_seen, times_generated FROM items"
+            f" WHERE {' AND '.join(clauses)} ORDER BY last_seen DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [self._item_row(row) for row in rows]
+
+    def item_fields(self, kind: str, *fields: str) -> List[Tuple]:
+        """(id, *fields) of every stored item of `kind`, for rebuilding in-memory indexes"""
+        columns = "".join(f", json_extract(data, '$.{field}')" for field in fields)
+        with self._lock:
+            return self._conn.execute(f"SELECT id{columns} FROM items WHERE kind = ?", (kind,)).fetchall()
+
+    def get_items(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored items by id, with their first/last seen times"""
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, data, first_seen, last_seen, times_generated FROM items"
+                f" WHERE id IN ({', '.join('?' * len(ids))})",
+                list(ids),
+            ).fetchall()
+        return {row["id"]: self._item_row(row) for row in rows}
+
+    @staticmethod
+    def _filters(industry, audience, since, until, time_column) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if industry:
+            clauses.append("industry_key = ?")
+            params.append(normalize_text(industry))
+        if audience:
+            clauses.append("audience_key = ?")
+            params.append(normalize_text(audience))
+        if since:
+            clauses.append(f"{time_column} >= ?")
+            params.append(_timestamp(since))
+        if until:
+            clauses.append(f"{time_column} < ?")
+            params.append(_timestamp(until))
+        return clauses, params
+
+    @staticmethod
+    def _item_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            **json.loads(row["data"]),
+            "id": row["id"],
+            "first_seen": datetime.fromtimestamp(row["first_seen"]).isoformat(),
+            "last_seen": datetime.fromtimestamp(row["last_seen"]).isoformat(),
+            "times_generated": row["times_generated"],
+        }
+
+    @staticmethod
+    def _run_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "run_id": row["id"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "industry": row["industry"],
+            "target_audience": row["target_audience"],
+            "content_types": row["content_types"].split(",") if row["content_types"] else [],
+            "graph_mode": row["graph_mode"],
+            "additional_context": row["additional_context"],
+            "execution_time": row["execution_time"],
+            "idea_count": row["idea_count"],
+        }
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"path": self.path, "pending": len(self._pending), "saved_runs": self.saved_runs}
+
+
+def build_result_store(settings) -> Optional[ResultStore]:
+    if not settings.result_store_path:
+        return None
+    return ResultStore(
+        settings.result_store_path,
+        batch_size=settings.result_store_batch_size,
+        flush_interval=settings.result_store_flush_seconds,
+    )
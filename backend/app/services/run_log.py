@@ -0,0 +1,128 @@
+"""
+Per-request agent logs, kept out of the graph state.
+
+Agents used to append ISO-timestamped dicts to `state["execution_logs"]`,
+which LangGraph then copied along with the rest of the state at every
+step. Each log line is now a small `LogRecord` (monotonic-ns timestamp,
+interned agent name, enum type) appended to a bounded ring buffer held in
+a context variable for the duration of one workflow run, and handed to
+the registered sinks as it is written. Wall-clock timestamps are only
+formatted at the API edge (`LogRecord.to_dict`).
+"""
+import logging
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Anchor for turning monotonic readings into wall-clock time at the edge
+_WALL_NS = time.time_ns()
+_MONOTONIC_NS = time.monotonic_ns()
+
+
+class LogType(IntEnum):
+    LOG = 0
+    STATUS = 1
+    DATA = 2
+    ERROR = 3
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, value: "str | LogType") -> "LogType":
+        if isinstance(value, LogType):
+            return value
+        return cls.__members__.get(str(value).upper(), cls.LOG)
+
+
+@dataclass(slots=True)
+class LogRecord:
+    agent: str
+    message: str
+    type: LogType = LogType.LOG
+    ns: int = field(default_factory=time.monotonic_ns)
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp((_WALL_NS + self.ns - _MONOTONIC_NS) / 1e9, UTC)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "agent": self.agent,
+            "message": self.message,
+            "type": self.type.label,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+class RunLog:
+    """Ring buffer of one run's log records; the oldest are dropped past `max_records`"""
+
+    def __init__(self, max_records: int = 500):
+        self._records: Deque[LogRecord] = deque(maxlen=max_records or None)
+        self.dropped = 0
+
+    def append(self, record: LogRecord) -> None:
+        if len(self._records) == self._records.maxlen:
+            self.dropped += 1
+        self._records.append(record)
+
+    def extend(self, records: Iterable[LogRecord]) -> None:
+        for record in records:
+            self.append(record)
+
+    def records(self) -> List[LogRecord]:
+        return list(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+current_run_log: ContextVar[Optional[RunLog]] = ContextVar("current_run_log", default=None)
+
+Sink = Callable[[LogRecord], None]
+
+
+def logging_sink(record: LogRecord) -> None:
+    # %-style arguments: only formatted if a handler accepts the level
+    logger.info("[%s] %s", record.agent, record.message)
+
+
+def stream_sink(record: LogRecord) -> None:
+    """Forward the record on the graph's custom stream, when written from inside a node"""
+    # Imported here so the API can start without loading langgraph
+    from langgraph.config import get_stream_writer
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"agent": record.agent, "type": "log", "log": record})
+
+
+SINKS: List[Sink] = [logging_sink, stream_sink]
+
+
+def add_sink(sink: Sink) -> None:
+    SINKS.append(sink)
+
+
+def log_event(agent: str, message: str, message_type: "str | LogType" = LogType.LOG) -> LogRecord:
+    """Record a log line for the current run (if any) and hand it to every sink"""
+    record = LogRecord(sys.intern(agent), message, LogType.parse(message_type))
+    run_log = current_run_log.get()
+    if run_log is not None:
+        run_log.append(record)
+    for sink in SINKS:
+        try:
+            sink(record)
+        except Exception as e:
+            logger.debug(f"Log sink {sink!r} failed: {e}")
+    return record
@@ -0,0 +1,231 @@
+"""
+Request-scoped tracing with spans exported to a rotating JSONL file.
+
+Each line is one span in OTLP/JSON field names (traceId, spanId,
+parentSpanId, startTimeUnixNano, ...). Sampling is decided once per trace
+at the root, and unsampled requests carry no span at all, so
+instrumentation is a context-variable lookup at full load. Spans are
+written through a logging QueueHandler, so file I/O stays off the event
+loop.
+
+Convert a span file into a Chrome/Perfetto timeline (one row per request):
+    python -m app.services.tracing traces/spans.jsonl -o timeline.json
+"""
+import argparse
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from app.config import settings
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "links", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = "", attributes: Optional[Dict] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes or {})
+        self.links: List[Dict[str, str]] = []
+        self.error = ""
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def context(self) -> Dict[str, str]:
+        """What child work needs to attach to this span (stored in AgentState and A2A envelopes)"""
+        return {"trace_id": self.trace_id, "span_id": self.span_id}
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        record = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.links:
+            record["links"] = [{"traceId": l["trace_id"], "spanId": l["span_id"]} for l in self.links]
+        return record
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+Parent = Union[Span, Dict[str, str], None]
+
+
+class Tracer:
+    def __init__(self, path: str = "", sample_rate: float = 0.0, max_bytes: int = 50 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.sample_rate = sample_rate if path else 0.0
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.exported = 0
+        self._logger: Optional[logging.Logger] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start(self, name: str, parent: Parent = None, *, root: bool = False, **attributes: Any) -> Optional[Span]:
+        """
+        Open a span under `parent` (default: the current span). With no
+        parent, `root=True` starts a new trace if it is sampled; otherwise
+        nothing is traced and None is returned.
+        """
+        if parent is None:
+            parent = current_span.get()
+        if isinstance(parent, Span):
+            return Span(name, parent.trace_id, parent.span_id, attributes)
+        if parent:
+            return Span(name, parent["trace_id"], parent["span_id"], attributes)
+        if root and self.enabled and random.random() < self.sample_rate:
+            return Span(name, os.urandom(16).hex(), "", attributes)
+        return None
+
+    def end(self, span: Optional[Span], error: str = "") -> None:
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        span.error = span.error or error
+        self._export(span)
+
+    @contextmanager
+    def span(self, name: str, parent: Parent = None, *, root: bool = False, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Make a span current for the enclosed block; yields None when the trace is unsampled"""
+        span = self.start(name, parent, root=root, **attributes)
+        if span is None:
+            yield None
+            return
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            try:
+                current_span.reset(token)
+            except ValueError:
+                # Closed from another context (e.g. an abandoned generator)
+                pass
+            self.end(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, parent: Parent = None, **attributes: Any) -> Optional[Span]:
+        """Export an already-finished span, e.g. one measured by other code"""
+        span = self.start(name, parent, **attributes)
+        if span is not None:
+            span.start_ns = start_ns
+            span.end_ns = end_ns
+            self._export(span)
+        return span
+
+    def _export(self, span: Span) -> None:
+        if self._logger is None:
+            self._open()
+        self.exported += 1
+        self._logger.info(json.dumps(span.to_otlp()))
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.Queue = queue.Queue()
+        self._listener = logging.handlers.QueueListener(records, handler)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
+        exporter = logging.getLogger(f"{__name__}.export")
+        exporter.setLevel(logging.INFO)
+        exporter.propagate = False
+        exporter.handlers = [logging.handlers.QueueHandler(records)]
+        self._logger = exporter
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "sample_rate": self.sample_rate, "path": self.path, "exported": self.exported}
+
+
+tracer = Tracer(
+    path=settings.trace_path,
+    sample_rate=settings.trace_sample_rate,
+    max_bytes=settings.trace_max_bytes,
+    backups=settings.trace_backups,
+)
+
+
+def to_chrome_trace(lines: Iterator[str]) -> Dict[str, Any]:
+    """Convert OTLP/JSON span lines into Chrome trace events (chrome://tracing, Perfetto, speedscope)"""
+    events = []
+    rows: Dict[str, int] = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        span = json.loads(line)
+        tid = rows.setdefault(span["traceId"], len(rows) + 1)
+        args = {a["key"]: next(iter(a["value"].values())) for a in span.get("attributes", [])}
+        if span.get("status", {}).get("code") == 2:
+            args["error"] = span["status"].get("message", "")
+        events.append({
+            "name": span["name"],
+            "ph": "X",
+            "pid": 1,
+            "tid": tid,
+            "ts": span["startTimeUnixNano"] / 1000,
+            "dur": (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1000,
+            "args": args,
+        })
+    for trace_id, tid in rows.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"trace {trace_id[:8]}"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a span file into a Chrome/Perfetto timeline")
+    parser.add_argument("spans", nargs="+", help="JSONL span file(s), e.g. traces/spans.jsonl*")
+    parser.add_argument("-o", "--output", default="timeline.json")
+    args = parser.parse_args()
+
+    lines: List[str] = []
+    for path in args.spans:
+        with open(path) as f:
+            lines.extend(f)
+    with open(args.output, "w") as f:
+        json.dump(to_chrome_trace(iter(lines)), f)
+    print(f"Wrote {args.output}; open it in https://ui.perfetto.dev or chrome://tracing")
+
+
+if __name__ == "__main__":
+    main()
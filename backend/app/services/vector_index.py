@@ -0,0 +1,223 @@
+"""
+Vector index over stored ideas and trends.
+
+Embeddings live in a float32 matrix memory-mapped from `vectors.f32`, so
+the index opens instantly and only the pages a search touches are read.
+Searching is one matrix-vector product. Row order is recorded in
+`keys.tsv` (kind and item id per line), appended only after the row's
+vector has been flushed, so a crash never leaves a key without a vector.
+
+Several worker processes can share one index directory: appends hold
+the file lock exclusively and readers hold it shared while they pick up
+the rows (new lines in `keys.tsv`) and embedder statistics others wrote,
+so nobody reads a half-written `embedder.npz`.
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("idea", "trend")
+
+
+def item_text(kind: str, item: Dict) -> str:
+    title = item.get("title") if kind == "idea" else item.get("topic")
+    return f"{title or ''}. {item.get('description') or ''}"
+
+
+class VectorIndex:
+    def __init__(self, path: str, embedder, initial_capacity: int = 1024):
+        self.path = path
+        self.embedder = embedder
+        self.dim = embedder.dim
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.tsv")
+        self._state_path = os.path.join(path, "embedder.npz")
+        self._lock_path = os.path.join(path, "index.lock")
+        self._lock = threading.Lock()
+        self._backfill_lock = threading.Lock()
+        self._backfilled = False
+
+        self.keys: List[Tuple[str, str]] = []
+        self._positions: Dict[str, int] = {}
+        self._kinds = np.zeros(0, dtype=np.int8)
+        self._keys_offset = 0  # bytes of keys.tsv loaded so far
+        self._state_mtime = 0.0
+        with self._exclusive():
+            self._reset_if_embedder_changed()
+            self._vectors = self._map(max(initial_capacity, self._file_rows()))
+            self._refresh()
+
+    @contextmanager
+    def _file_lock(self, operation: int):
+        """This thread, then the index files (exclusively to write, shared to read)"""
+        with self._lock, open(self._lock_path, "a") as handle:
+            fcntl.flock(handle, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _exclusive(self):
+        return self._file_lock(fcntl.LOCK_EX)
+
+    def _shared(self):
+        return self._file_lock(fcntl.LOCK_SH)
+
+    def _file_rows(self) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+
+    def _refresh(self) -> None:
+        """Load rows and embedder statistics written since we last looked (by us or another
+        process); callers hold the file lock"""
+        size = os.path.getsize(self._keys_path) if os.path.exists(self._keys_path) else 0
+        if size > self._keys_offset:
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                data = f.read(size - self._keys_offset)
+            # Whole lines only; the rest is picked up next time
+            data = data[:data.rfind(b"\n") + 1]
+            self._keys_offset += len(data)
+            added = [tuple(line.split("\t", 1)) for line in data.decode("utf-8").splitlines() if "\t" in line]
+            for kind, item_id in added:
+                self._positions[item_id] = len(self.keys)
+                self.keys.append((kind, item_id))
+            self._kinds = np.concatenate([self._kinds, np.array([KINDS.index(kind) for kind, _ in added], dtype=np.int8)])
+            if len(self.keys) > len(self._vectors):
+                self._vectors = self._map(max(len(self.keys), self._file_rows()))
+        mtime = os.path.getmtime(self._state_path) if os.path.exists(self._state_path) else 0.0
+        if mtime != self._state_mtime:
+            self.embedder.load_state(dict(np.load(self._state_path)))
+            self._state_mtime = mtime
+
+    def _reset_if_embedder_changed(self) -> None:
+        meta_path = os.path.join(self.path, "meta.json")
+        meta = {"embedder": self.embedder.name, "dim": self.dim}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) == meta:
+                    return
+            logger.warning(f"Embedder changed to {meta}; rebuilding the vector index")
+        for stale in (self._vectors_path, self._keys_path, self._state_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+    def _map(self, capacity: int) -> np.memmap:
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < capacity * 4 * self.dim:
+                f.truncate(capacity * 4 * self.dim)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def add(self, kind: str, items: Iterable[Dict]) -> int:
+        """Embed and append items not yet indexed (by `id`); returns how many were added"""
+        items = list(items)
+        with self._exclusive():
+            self._refresh()
+            items = [item for item in items if item.get("id") and item["id"] not in self._positions]
+            if not items:
+                return 0
+            texts = [item_text(kind, item) for item in items]
+            self.embedder.observe(texts)
+            vectors = self.embedder.embed(texts)
+
+            start = len(self.keys)
+            if start + len(items) > len(self._vectors):
+                self._vectors.flush()
+                self._vectors = self._map(max(start + len(items), 2 * len(self._vectors)))
+            self._vectors[start:start + len(items)] = vectors
+            self._vectors.flush()
+
+            np.savez(self._state_path, **self.embedder.state())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{kind}\t{item['id']}\n" for item in items)
+            # Our own rows and statistics come back through the same path as other processes'
+            self._refresh()
+            return len(items)
+
+    def backfill(self, store) -> int:
+        """Index the result store's ideas and trends when starting from an empty index (once; blocking)"""
+        with self._backfill_lock:
+            if self._backfilled:
+                return 0
+            self._backfilled = True
+            if self.keys:
+                return 0
+            added = 0
+            for kind, title in (("idea", "title"), ("trend", "topic")):
+                rows = store.item_fields(kind, title, "description")
+                for start in range(0, len(rows), 4096):
+                    chunk = rows[start:start + 4096]
+                    added += self.add(kind, [{"id": id, title: text, "description": description} for id, text, description in chunk])
+            if added:
+                logger.info(f"Indexed {added} stored ideas and trends for search")
+            return added
+
+    def _view(self, texts: Iterable[str]) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray, np.ndarray]:
+        """Refresh, then embed `texts` and take the rows to score, consistently with each other.
+
+        Returns (keys, kinds, vectors, queries). Rows below the count taken here are
+        never rewritten, and the vectors view keeps its mapping alive if a concurrent
+        add remaps the file, so scoring needs no lock.
+        """
+        with self._shared():
+            self._refresh()
+            rows = len(self.keys)
+            keys = self.keys[:rows]
+            kinds = self._kinds[:rows].copy()
+            vectors = self._vectors[:rows]
+            queries = self.embedder.embed(texts)
+        return keys, kinds, vectors, queries
+
+    @staticmethod
+    def _scores(kinds: np.ndarray, vectors: np.ndarray, queries: np.ndarray, kind: Optional[str]) -> np.ndarray:
+        """Cosine similarity of every row (of `kind`) with each query: (rows, queries)"""
+        scores = vectors @ queries.T
+        if kind is not None:
+            scores[kinds != KINDS.index(kind)] = -np.inf
+        return scores
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[Tuple[str, str, float]]:
+        """Top `limit` (kind, id, score) matches for `query`, best first"""
+        keys, kinds, vectors, queries = self._view([query])
+        if not keys:
+            return []
+        scores = self._scores(kinds, vectors, queries, kind)[:, 0]
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(*keys[row], round(float(scores[row]), 4)) for row in top if scores[row] > 0]
+
+    def nearest(self, kind: str, items: List[Dict]) -> np.ndarray:
+        """Highest similarity of each item to any indexed item of `kind` (0 when there are none)"""
+        if not items:
+            return np.zeros(0, dtype=np.float32)
+        keys, kinds, vectors, queries = self._view(item_text(kind, item) for item in items)
+        if not keys:
+            return np.zeros(len(items), dtype=np.float32)
+        scores = self._scores(kinds, vectors, queries, kind)
+        return np.clip(scores.max(axis=0), 0, 1)
+
+    def snapshot(self) -> Dict:
+        return {
+            "path": self.path,
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "rows": len(self.keys),
+            "bytes": len(self.keys) * self.dim * 4,
+        }
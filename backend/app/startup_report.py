@@ -0,0 +1,133 @@
+"""
+Where API process startup goes: imports, workflow construction, warm-up.
+
+Usage:
+    python -m app.startup_report
+    python -m app.startup_report --module main --top 15 --no-warmup
+
+Imports are timed by a fresh interpreter under `python -X importtime`, so
+nothing this process has already loaded hides their cost. The report
+lists the heaviest top-level packages, and the heaviest imports pulled in
+directly by the app's own modules (the ones worth deferring). It then
+builds the workflow and runs its warm-up steps here, timing each phase.
+"""
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+FIRST_PARTY = ("app", "main")
+
+
+@dataclass
+class Import:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List["Import"] = field(default_factory=list)
+
+
+def parse_importtime(text: str) -> List[Import]:
+    """The import tree from `-X importtime` output (children are printed before their parent)"""
+    pending: Dict[int, List[Import]] = {}
+    for line in text.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        level = (len(indent) - 1) // 2
+        node = Import(name, int(self_us), int(cumulative_us), pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+    return pending.get(0, [])
+
+
+def walk(nodes: List[Import]):
+    for node in nodes:
+        yield node
+        yield from walk(node.children)
+
+
+def is_first_party(name: str) -> bool:
+    return name.split(".")[0] in FIRST_PARTY
+
+
+def by_package(roots: List[Import]) -> List[Tuple[str, int]]:
+    """Self time summed per top-level package"""
+    totals: Dict[str, int] = {}
+    for node in walk(roots):
+        package = node.name.split(".")[0]
+        totals[package] = totals.get(package, 0) + node.self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def pulled_in_by_app(roots: List[Import]) -> List[Tuple[str, str, int]]:
+    """(app module, third-party import, cumulative us) for imports made directly by app code"""
+    found = []
+    for node in walk(roots):
+        if is_first_party(node.name):
+            found.extend(
+                (node.name, child.name, child.cumulative_us)
+                for child in node.children if not is_first_party(child.name)
+            )
+    return sorted(found, key=lambda item: -item[2])
+
+
+def time_imports(module: str) -> Tuple[float, List[Import]]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+    return elapsed, parse_importtime(completed.stderr)
+
+
+async def time_startup(warm: bool) -> Dict[str, Dict]:
+    from app.api import lifecycle
+
+    if warm:
+        await lifecycle.warm_up()
+    else:
+        await lifecycle.load_workflow()
+    phases = dict(lifecycle.startup.phases)
+    await lifecycle.shutdown()
+    return phases
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module the server imports (default: main)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--no-warmup", action="store_true", help="time workflow construction only")
+    args = parser.parse_args(argv)
+
+    wall, roots = time_imports(args.module)
+    total_us = sum(root.cumulative_us for root in roots)
+    print(f"\n========== IMPORT {args.module} ==========")
+    print(f"{total_us / 1e6:.3f}s of imports ({wall:.3f}s including interpreter start)")
+
+    print("\nHeaviest packages (self time):")
+    for package, self_us in by_package(roots)[:args.top]:
+        print(f"  {self_us / 1e3:8.1f} ms  {package}")
+
+    print("\nHeaviest imports made by app code (cumulative):")
+    for module, dependency, cumulative_us in pulled_in_by_app(roots)[:args.top]:
+        print(f"  {cumulative_us / 1e3:8.1f} ms  {dependency:40} <- {module}")
+
+    print("\n========== STARTUP PHASES ==========")
+    for phase, report in asyncio.run(time_startup(not args.no_warmup)).items():
+        note = f"  ({report['error']})" if report.get("error") else ""
+        print(f"  {report['seconds'] * 1e3:8.1f} ms  {phase}{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
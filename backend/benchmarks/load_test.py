@@ -0,0 +1,303 @@
+"""
+End-to-end load/latency benchmark against the mock LLM backend.
+
+Starts the API in-process on a free port with LLM_BACKEND=mock, drives
+/api/ideate or /ws/ideate at fixed concurrency levels and reports latency
+percentiles, throughput, event-loop lag and memory per request. Because the
+LLM is simulated with a known latency, what is left over is the pipeline's
+own overhead.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 64
+    python -m benchmarks.load_test --endpoint ws --save benchmarks/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # Must happen before the app (and its Settings) is imported
+    os.environ["LLM_BACKEND"] = "mock"
+    os.environ["MOCK_LATENCY_MS"] = str(args.mock_latency_ms)
+    os.environ["MOCK_TOKENS_PER_SECOND"] = str(args.mock_tokens_per_second)
+    os.environ["MOCK_ERROR_RATE"] = str(args.mock_error_rate)
+    os.environ["MOCK_THROTTLE_RATE"] = str(args.mock_throttle_rate)
+    # Run history and the vector index in a scratch dir: nothing under data/
+    # is written or read, so earlier runs can't change the numbers
+    scratch = tempfile.mkdtemp(prefix="load_test_")
+    os.environ["RESULT_STORE_PATH"] = os.path.join(scratch, "results.sqlite3")
+    os.environ["VECTOR_INDEX_PATH"] = os.path.join(scratch, "vectors")
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["STAGE_CACHE_PATH"] = ""
+    if not args.caches:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["TREND_CACHE_TTL_SECONDS"] = "0"
+        for stage in ("RESEARCHER", "ANALYST", "WRITER"):
+            os.environ[f"SEMANTIC_CACHE_{stage}_THRESHOLD"] = "0"
+
+
+def effective_settings() -> Dict:
+    """The settings that decide how much work a request does, as the app read them"""
+    from app.config import settings
+
+    return {
+        "llm_cache_enabled": settings.llm_cache_enabled,
+        "trend_cache_ttl_seconds": settings.trend_cache_ttl_seconds,
+        "semantic_cache_thresholds": {
+            "researcher": settings.semantic_cache_researcher_threshold,
+            "analyst": settings.semantic_cache_analyst_threshold,
+            "writer": settings.semantic_cache_writer_threshold,
+        },
+        "result_store_path": settings.result_store_path,
+        "vector_index_path": settings.vector_index_path,
+        "dedup_mode": settings.dedup_mode,
+        "trace_sample_rate": settings.trace_sample_rate,
+        "mock_latency_ms": settings.mock_latency_ms,
+        "mock_tokens_per_second": settings.mock_tokens_per_second,
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is a peak, in KiB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class LoopLagMonitor:
+    """Measures how late a 10ms timer fires, i.e. how blocked the event loop is"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def _request_body(index: int, same_request: bool, graph_mode: str) -> Dict:
+    # Distinct industries by default so single-flight coalescing doesn't hide work
+    suffix = "" if same_request else f" {index}"
+    return {
+        "industry": f"fintech{suffix}",
+        "target_audience": "startup founders",
+        "content_types": ["blog", "video", "social"],
+        "graph_mode": graph_mode,
+    }
+
+
+async def _http_request(client, base_url: str, body: Dict) -> Dict:
+    started = time.perf_counter()
+    response = await client.post(f"{base_url}/api/ideate", json=body)
+    elapsed = time.perf_counter() - started
+    return {"latency": elapsed, "ok": response.status_code == 200, "first_idea": None}
+
+
+async def _ws_request(ws_url: str, body: Dict) -> Dict:
+    import websockets
+
+    started = time.perf_counter()
+    first_idea = None
+    ok = False
+    async with websockets.connect(f"{ws_url}/ws/ideate", max_size=None) as ws:
+        await ws.send(json.dumps(body))
+        async for raw in ws:
+            message = json.loads(raw)
+            if message["type"] == "idea" and first_idea is None:
+                first_idea = time.perf_counter() - started
+            if message["type"] == "final_result":
+                ok = True
+                break
+            if message["type"] == "error":
+                break
+    return {"latency": time.perf_counter() - started, "ok": ok, "first_idea": first_idea}
+
+
+async def run_level(args: argparse.Namespace, base_url: str, concurrency: int) -> Dict:
+    import httpx
+
+    monitor = LoopLagMonitor()
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Dict] = []
+
+    async with httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(index: int) -> None:
+            async with semaphore:
+                body = _request_body(index, args.same_request, args.graph_mode)
+                try:
+                    if args.endpoint == "ws":
+                        result = await _ws_request(base_url.replace("http", "ws", 1), body)
+                    else:
+                        result = await _http_request(client, base_url, body)
+                except Exception as e:
+                    result = {"latency": 0.0, "ok": False, "first_idea": None, "error": str(e)}
+                results.append(result)
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_before = _rss_bytes()
+        monitor.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - started
+        await monitor.stop()
+        rss_after = _rss_bytes()
+        traced_peak = None
+        if args.tracemalloc:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    latencies = [r["latency"] for r in results if r["ok"]]
+    first_ideas = [r["first_idea"] for r in results if r["first_idea"] is not None]
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "errors": sum(not r["ok"] for r in results),
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_mean": statistics.fmean(latencies) if latencies else 0.0,
+        "first_idea_p50": percentile(first_ideas, 50) if first_ideas else None,
+        "loop_lag_p99_ms": percentile(monitor.samples, 99) * 1000,
+        "loop_lag_max_ms": max(monitor.samples, default=0.0) * 1000,
+        "rss_delta_per_request_kb": (rss_after - rss_before) / max(1, args.requests) / 1024,
+        "traced_peak_per_request_kb": traced_peak / max(1, args.requests) / 1024 if traced_peak else None,
+    }
+
+
+async def serve_and_run(args: argparse.Namespace) -> List[Dict]:
+    import uvicorn
+
+    from main import app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        levels = []
+        for concurrency in args.concurrency:
+            level = await run_level(args, base_url, concurrency)
+            levels.append(level)
+            _print_level(level)
+        return levels
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+def _print_level(level: Dict) -> None:
+    first_idea = f"{level['first_idea_p50']:.3f}s" if level["first_idea_p50"] is not None else "-"
+    print(
+        f"c={level['concurrency']:<4} "
+        f"p50={level['latency_p50']:.3f}s p95={level['latency_p95']:.3f}s p99={level['latency_p99']:.3f}s "
+        f"rps={level['throughput_rps']:.2f} first_idea={first_idea} "
+        f"lag_p99={level['loop_lag_p99_ms']:.1f}ms mem/req={level['rss_delta_per_request_kb']:.1f}KiB "
+        f"errors={level['errors']}"
+    )
+
+
+def compare(current: List[Dict], baseline_path: str, threshold: float) -> bool:
+    """Print per-metric changes against a saved baseline; True if nothing regressed"""
+    with open(baseline_path) as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+
+    # Metrics where bigger is worse, plus throughput where bigger is better
+    worse_if_higher = ["latency_p50", "latency_p95", "latency_p99", "loop_lag_p99_ms"]
+    ok = True
+    print(f"\nComparison with {baseline_path} (regression threshold {threshold:.0%}):")
+    for level in current:
+        base = baseline.get(level["concurrency"])
+        if base is None:
+            continue
+        for metric in worse_if_higher + ["throughput_rps"]:
+            old, new = base.get(metric) or 0.0, level.get(metric) or 0.0
+            if not old:
+                continue
+            change = (new - old) / old
+            regressed = change > threshold if metric in worse_if_higher else change < -threshold
+            if metric == "loop_lag_p99_ms" and new < 5.0:
+                # Single-digit millisecond lag is timer noise, not a regression
+                regressed = False
+            ok = ok and not regressed
+            flag = "REGRESSION" if regressed else ""
+            print(f"  c={level['concurrency']:<4} {metric:<18} {old:10.4f} -> {new:10.4f} ({change:+.1%}) {flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load/latency benchmark on the mock LLM backend")
+    parser.add_argument("--endpoint", choices=["http", "ws"], default="http")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level")
+    parser.add_argument("--graph-mode", choices=["sequential", "parallel"], default="sequential")
+    parser.add_argument("--same-request", action="store_true", help="Send identical requests (exercises coalescing)")
+    parser.add_argument("--caches", action="store_true", help="Leave the LLM, trend and semantic caches enabled")
+    parser.add_argument("--mock-latency-ms", type=float, default=200)
+    parser.add_argument("--mock-tokens-per-second", type=float, default=400)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report traced Python allocations")
+    parser.add_argument("--save", help="Write results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="Compare against a saved baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args()
+
+    _configure_env(args)
+    effective = effective_settings()
+    print("Settings:", ", ".join(f"{key}={value}" for key, value in effective.items()))
+    levels = asyncio.run(serve_and_run(args))
+
+    if args.save:
+        config = {k: v for k, v in vars(args).items() if k not in ("save", "compare")}
+        with open(args.save, "w") as f:
+            json.dump({"config": config, "settings": effective, "levels": levels}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare and not compare(levels, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
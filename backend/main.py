@@ -1,8 +1,16 @@
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.api.router import router
+from app.api import lifecycle
+from app.api.router import job_queue, router
+from contextlib import asynccontextmanager
+import asyncio
 import logging
+import os
 
 # Configure logging
 logging.basicConfig(
@@ -10,11 +18,28 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up after uvicorn has bound the port, so liveness answers meanwhile
+    warm_up = None
+    if settings.startup_warmup:
+        warm_up = asyncio.create_task(lifecycle.warm_up())
+    else:
+        lifecycle.startup.ready = True
+    yield
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    # Jobs first: running ones still use the workflow being closed
+    await job_queue.stop()
+    await lifecycle.shutdown()
+
 # Create FastAPI app
 app = FastAPI(
     title="Multi-Agent Content Ideation Engine",
     description="LangGraph + Claude powered content ideation system",
-    version="1.0.0"
+    version="1.0.0",
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -29,6 +54,8 @@ app.add_middleware(
 # Include routes
 app.include_router(router)
 
+lifecycle.startup.record("import", time.perf_counter() - _import_started)
+
 @app.get("/")
 async def root():
     return {
@@ -38,11 +65,43 @@ async def root():
         "agents": ["Trend Researcher", "Audience Analyst", "Creative Writer"]
     }
 
-if __name__ == "__main__":
+def share_across_workers(workers: int) -> None:
+    """
+    Set up the environment the worker processes start with: the same LLM
+    and stage cache files for all of them (unless paths are configured),
+    and per-minute Azure quotas split between them, since each worker
+    enforces its own.
+    """
+    os.makedirs(settings.shared_cache_dir, exist_ok=True)
+    for name, filename in (("LLM_CACHE_PATH", "llm.sqlite3"), ("STAGE_CACHE_PATH", "stages.sqlite3")):
+        if not os.getenv(name):
+            os.environ[name] = os.path.join(settings.shared_cache_dir, filename)
+    for name in ("AZURE_RPM_LIMIT", "AZURE_TPM_LIMIT"):
+        limit = int(os.getenv(name) or 0)
+        if limit:
+            os.environ[name] = str(max(1, limit // workers))
+    logging.getLogger(__name__).info(
+        f"Starting {workers} workers sharing {os.environ['LLM_CACHE_PATH']} and {os.environ['STAGE_CACHE_PATH']}"
+    )
+
+
+def serve() -> None:
+    """Run uvicorn: one process per worker (WEB_CONCURRENCY, 0 = per CPU core), or one reloading process"""
     import uvicorn
+
+    workers = 1 if settings.reload else settings.web_concurrency or os.cpu_count() or 1
+    if workers > 1:
+        share_across_workers(workers)
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.reload
-    )
\ No newline at end of file
+        reload=settings.reload,
+        workers=workers,
+        log_level="debug" if settings.debug else "info",
+        timeout_keep_alive=settings.server_keepalive_seconds,
+    )
+
+
+if __name__ == "__main__":
+    serve()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: one agent handoff under the old dict/JSON envelope versus
+the slotted A2AMessage. A handoff is create + merge into state through the
+reducer + the receiver reading the payload.
+"""
+import json
+import timeit
+import tracemalloc
+import uuid
+from datetime import datetime, UTC
+
+from langgraph.graph import add_messages
+
+from app.graph.a2a_protocol import A2AMessage, add_a2a_messages, create_a2a_message, decode, encode
+
+PAYLOAD = {"trend_count": 5, "top_trend": "Embedded Finance", "cached": False}
+TRACE = {"trace_id": "4bf92f3577b34da6a3ce929d0e0e4736", "span_id": "00f067aa0ba902b7"}
+
+
+def legacy_handoff(messages):
+    envelope = {
+        "role": "function",
+        "name": "Trend Researcher",
+        "content": json.dumps({
+            "from_agent": "Trend Researcher",
+            "to_agent": "Audience Analyst",
+            "type": "handoff",
+            "summary": "Handoff: 5 trends identified for audience analysis.",
+            "payload": PAYLOAD,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "trace": TRACE,
+        }),
+        "id": str(uuid.uuid4()),
+    }
+    messages = add_messages(messages, [envelope])
+    return messages, json.loads(messages[-1].content)["payload"]["trend_count"]
+
+
+def typed_handoff(messages):
+    envelope = create_a2a_message(
+        "Trend Researcher",
+        "Handoff: 5 trends identified for audience analysis.",
+        to_agent="Audience Analyst",
+        payload=PAYLOAD,
+        message_type="handoff",
+        trace=TRACE,
+    )
+    messages = add_a2a_messages(messages, [envelope])
+    return messages, messages[-1].payload["trend_count"]
+
+
+def retained_per_message(handoff, rounds: int = 2000) -> float:
+    tracemalloc.start()
+    messages = []
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(rounds):
+        messages, _ = handoff(messages[-3:])
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    kept = len(messages)
+    return (after - before) / kept
+
+
+def main():
+    print("\n========== PER HANDOFF ==========")
+    results = {}
+    for name, handoff in (("dict + json", legacy_handoff), ("A2AMessage", typed_handoff)):
+        seconds = min(timeit.repeat(lambda: handoff([]), number=5000, repeat=5)) / 5000
+        results[name] = (seconds, retained_per_message(handoff))
+        print(f"{name:12} {seconds * 1e6:7.2f} us   {results[name][1]:7.0f} bytes retained per message")
+
+    legacy, typed = results["dict + json"], results["A2AMessage"]
+    print(f"CPU: {legacy[0] / typed[0]:.1f}x faster | memory: {legacy[1] / typed[1]:.1f}x smaller")
+
+    print("\n========== EDGE CODEC ==========")
+    message = typed_handoff([])[0][0]
+    wire = encode([message])
+    print(f"{len(wire)} bytes on the wire; round trip equal: {decode(wire) == [message]}")
+    print("From to_dict output:", decode(message.to_dict()) == message)
+    print("Slotted (no __dict__):", not hasattr(A2AMessage("a", "b"), "__dict__"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+
+from app.batch import _main, parse_stream, run_batch
+from app.config import settings
+
+ROWS = [
+    {"industry": "FinTech", "target_audience": "CFOs", "content_types": ["blog"]},
+    {"industry": "Healthcare", "target_audience": "Clinic managers", "content_types": ["video"]},
+]
+
+
+class CountingWorkflow:
+    """Instant runs that count how many finished results are waiting to be read"""
+
+    def __init__(self):
+        self.started = 0
+        self.unread = 0
+        self.peak_unread = 0
+
+    async def run(self, input_data):
+        self.started += 1
+        await asyncio.sleep(0)
+        self.unread += 1
+        self.peak_unread = max(self.peak_unread, self.unread)
+        return {"trends": [], "audience_insights": [], "content_ideas": [], "metadata": {}}
+
+
+async def slow_reader(rows: int, concurrency: int):
+    workflow = CountingWorkflow()
+    source = ({"industry": f"Industry {n}", "target_audience": "Founders"} for n in range(rows))
+    ok = 0
+    async for record in run_batch(workflow, source, concurrency):
+        workflow.unread -= 1
+        ok += record["status"] == "ok"
+        await asyncio.sleep(0.001)
+    return ok, workflow
+
+
+async def upload(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    settings.result_store_path = os.path.join(workdir, "results.sqlite3")
+    input_path = os.path.join(workdir, "rows.jsonl")
+    output_path = os.path.join(workdir, "results.ndjson")
+    with open(input_path, "w") as f:
+        f.write("\n".join(json.dumps(row) for row in ROWS))
+
+    args = argparse.Namespace(input=input_path, output=output_path, format=None, concurrency=4)
+    exit_code = asyncio.run(_main(args))
+
+    with open(output_path) as f:
+        records = [json.loads(line) for line in f]
+    run_ids = {r["result"]["metadata"]["run_id"] for r in records if r["status"] == "ok"}
+
+    print("\n========== BATCH ==========")
+    print("Exit code:", exit_code, "| ok rows:", len(run_ids))
+
+    print("\n========== SAVED RUNS ==========")
+    with sqlite3.connect(settings.result_store_path) as conn:
+        saved = {row[0] for row in conn.execute("SELECT id FROM runs")}
+    print("Every reported run_id was saved:", bool(run_ids) and run_ids <= saved)
+
+    print("\n========== SLOW READER ==========")
+    ok, workflow = asyncio.run(slow_reader(500, 4))
+    print(f"{ok} rows ok; at most {workflow.peak_unread} finished results waited to be read:", workflow.peak_unread <= 2 * 4)
+
+    print("\n========== STREAMED UPLOAD ==========")
+    jsonl = "\n".join(json.dumps(row, ensure_ascii=False) for row in ROWS + [{"industry": "Café chains", "target_audience": "Owners"}])
+    rows = asyncio.run(collect(parse_stream(upload(jsonl.encode(), 7), "jsonl")))
+    print("JSONL in 7-byte chunks:", [row["industry"] for row in rows])
+    csv_body = b'industry,target_audience,content_types\nFinTech,CFOs,blog;video\n\n"Retail, online",Shoppers,\n'
+    rows = asyncio.run(collect(parse_stream(upload(csv_body, 5), "csv")))
+    print("CSV in 5-byte chunks:", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+from app.graph.single_flight import SingleFlight
+
+
+async def main():
+    flight = SingleFlight("test")
+    finished = []
+
+    async def slow_work():
+        await asyncio.sleep(0.5)
+        finished.append(True)
+        return "done"
+
+    # Shared work survives one caller leaving, and stops when the last one does
+    first = asyncio.create_task(flight.do("key", slow_work))
+    second = asyncio.create_task(flight.do("key", slow_work))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    print("Result for remaining caller:", await second)
+
+    third = asyncio.create_task(flight.do("other", slow_work))
+    await asyncio.sleep(0.05)
+    third.cancel()
+    await asyncio.sleep(0.6)
+    print("\n========== CALL CANCELLATION ==========")
+    print("Work completed only once:", len(finished) == 1)
+
+    async def events():
+        for i in range(10):
+            await asyncio.sleep(0.05)
+            yield i
+
+    async def follow(limit):
+        seen = []
+        async for item in flight.stream("stream", events):
+            seen.append(item)
+            if len(seen) == limit:
+                break
+        return seen
+
+    # Both stream subscribers leave early, so the pump is cancelled
+    print("\n========== STREAM CANCELLATION ==========")
+    print("Subscribers saw:", await asyncio.gather(follow(2), follow(3)))
+    await asyncio.sleep(0.05)
+    print("Snapshot:", flight.snapshot())
+
+    # A request arriving right after an identical one finished runs again
+    # rather than replaying the finished run
+    print("\n========== BACK-TO-BACK ==========")
+    runs = []
+
+    async def run():
+        runs.append(len(runs) + 1)
+        yield runs[-1]
+
+    first_run = [item async for item in flight.stream("repeat", run)]
+    second_run = [item async for item in flight.stream("repeat", run)]
+    print("Fresh results:", first_run, second_run)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from app.api.connections import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+
+async def main():
+    manager = ConnectionManager(max_queue=4, send_timeout=1.0)
+    slow, fast, dead = FakeWebSocket(delay=0.05), FakeWebSocket(), FakeWebSocket(fail=True)
+    for websocket in (slow, fast, dead):
+        await manager.connect(websocket)
+
+    # A client that can't keep up gets merged tokens and only the latest status
+    connection = manager.connections[slow]
+    for i in range(50):
+        await connection.send({"type": "agent_token", "request_id": "r1", "payload": {"agent_name": "Writer", "delta": "ab"}})
+        await connection.send({"type": "agent_update", "request_id": "r1", "payload": {"agent_name": f"Agent {i}"}})
+    await connection.send({"type": "final_result", "request_id": "r1", "payload": {"ideas": []}})
+    await asyncio.sleep(0.5)
+
+    tokens = "".join(m["payload"]["delta"] for m in slow.sent if m["type"] == "agent_token")
+    print("\n========== SLOW CLIENT ==========")
+    print("Messages delivered:", len(slow.sent), "of", 101)
+    print("No token text lost:", len(tokens) == 100)
+    print("Final result delivered last:", slow.sent[-1]["type"] == "final_result")
+
+    # Broadcast fans out without waiting on each socket and evicts dead ones
+    await manager.broadcast({"type": "status", "payload": "first"})
+    await asyncio.sleep(0.05)
+    await manager.broadcast({"type": "status", "payload": "second"})
+    await asyncio.sleep(0.05)
+    print("\n========== BROADCAST ==========")
+    print("Connections left:", len(manager.connections))
+    print("Fast client got:", [m["payload"] for m in fast.sent])
+
+    for websocket in list(manager.connections):
+        await manager.disconnect(websocket)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -54,6 +54,17 @@ async def main():
         print("Trending:", idea.get("trending"))
         print("ID:", idea.get("id"))
 
+    print("\n========== STREAMED IDEAS ==========")
+    # Only ideas that would survive validation are streamed, marked provisional
+    streamed = []
+    agent._stream_writer = lambda: streamed.append
+    idea = {"title": "Cash flow in 5 charts", "description": "...", "structure": "...", "confidence": 80}
+    agent._emit_idea({**idea, "format": "blog"})
+    agent._emit_idea({**idea, "format": "podcast"})
+    agent._emit_idea({**idea, "format": "video", "confidence": 500})
+    agent._emit_idea(idea, content_type="social")
+    print("Streamed:", [(e["idea"]["format"], e["provisional"]) for e in streamed])
+
 
 if __name__ == "__main__":
     asyncio.run(main())
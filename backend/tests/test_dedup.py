@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from app.graph.dedup import IdeaDeduplicator
+from app.services.minhash import LSHIndex, MinHasher
+from app.services.run_log import RunLog, current_run_log
+
+
+def idea(id: str, title: str, description: str, confidence: float = 80):
+    return {"id": id, "format": "blog", "title": title, "description": description, "confidence": confidence}
+
+
+async def main():
+    dedup = IdeaDeduplicator(threshold=0.6)
+    history = [idea("blog-1", "10 Ways Embedded Finance Is Changing CFO Workflows",
+                    "A practical look at how banking inside apps reshapes finance teams.")]
+    dedup.remember(history)
+
+    state = {"content_ideas": [
+        idea("blog-2", "Ten ways embedded finance is changing the CFO workflow",
+             "A practical look at how banking inside apps reshapes finance teams."),
+        idea("blog-3", "Why Treasury Teams Are Moving to Real-Time Payments",
+             "Instant settlement changes cash forecasting for mid-size companies.", confidence=90),
+        idea("blog-4", "Why treasury teams are moving to real time payments",
+             "Instant settlement changes cash forecasting for mid-size companies!", confidence=70),
+        idea("blog-5", "A Day in the Life of a Fractional CFO", "Video diary of juggling five clients."),
+    ]}
+    run_log = RunLog()
+    current_run_log.set(run_log)
+    state = await dedup.execute(state)
+
+    print("\n========== FLAG ==========")
+    for item in state["content_ideas"]:
+        print(f"{item['id']}: duplicate_of={item.get('duplicate_of')} similarity={item.get('similarity')}")
+    print("Log:", run_log.records()[-1].message)
+
+    print("\n========== DROP ==========")
+    dropper = IdeaDeduplicator(threshold=0.6, mode="drop")
+    dropper.remember(history)
+    state = await dropper.execute({**state, "content_ideas": [dict(i) for i in state["content_ideas"]]})
+    print("Kept:", [item["id"] for item in state["content_ideas"]])
+
+    print("\n========== REPEATED REQUEST ==========")
+    # Same ideas with the same ids (e.g. served from the LLM cache): not duplicates of themselves
+    repeat = IdeaDeduplicator(threshold=0.6, mode="drop")
+    first_run = [idea("blog-6", "How Embedded Finance Cuts Month-End Close", "Fewer exports, faster books."),
+                 idea("blog-7", "A Day in the Life of a Fractional CFO", "Video diary of juggling five clients.")]
+    for run in (1, 2):
+        state = await repeat.execute({"content_ideas": [dict(i) for i in first_run]})
+        repeat.remember(state["content_ideas"])
+        print(f"Run {run} kept:", [item["id"] for item in state["content_ideas"]])
+
+    print("\n========== LOOKUP LATENCY ==========")
+    hasher = MinHasher()
+    index = LSHIndex(0.6)
+    texts = [f"idea {n} about topic {n % 997} for audience {n % 13}" for n in range(50_000)]
+    index.add_many([str(n) for n in range(len(texts))], hasher.signatures(texts))
+    probe = hasher.signature("idea 123 about topic 123 for audience 6")
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.query(probe)
+    print(f"Bands x rows: {index.bands}x{index.rows}")
+    print(f"Query over {len(index)} ideas: {(time.perf_counter() - started):.3f} ms average")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -41,6 +41,13 @@ async def main():
     else:
         print("No content ideas generated")
 
+    print("\n========== REFRESH ==========")
+    # A repeat is served from the caches; refresh=True regenerates every stage
+    for label, data in (("repeat", input_data), ("refresh", {**input_data, "refresh": True})):
+        llm = (await workflow.run(data)).get("request_metrics", {}).get("llm", {})
+        print(f"{label}: {llm.get('calls')} LLM calls, {llm.get('cached_calls')} from cache")
+    print("Cache bypasses:", workflow.llm_service.cache_stats().get("bypasses"))
+
 
 if __name__ == "__main__":
     asyncio.run(main())
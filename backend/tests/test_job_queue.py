@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.api.router as api
+from app.services.job_queue import JobQueue
+
+ROW = {"industry": "FinTech", "target_audience": "CFOs"}
+
+
+async def slow_runner(job):
+    await asyncio.sleep(10)
+    return {"ideas": []}
+
+
+async def priority_order():
+    order = []
+    gate = asyncio.Event()
+
+    async def runner(job):
+        await gate.wait()
+        order.append(job.payload["name"])
+        return {}
+
+    queue = JobQueue(runner, workers=1)
+    # The first job occupies the only worker while the rest queue up behind it
+    queue.submit({"name": "first"})
+    await asyncio.sleep(0.01)
+    for name, priority in (("low", "low"), ("normal-1", "normal"), ("high", "high"), ("normal-2", "normal")):
+        queue.submit({"name": name}, priority=priority)
+    print("Depth by priority:", queue.metrics()["queue_depth_by_priority"])
+    gate.set()
+    await asyncio.sleep(0.05)
+    await queue.stop()
+    return order
+
+
+async def shutdown():
+    queue = JobQueue(slow_runner, workers=1)
+    running = queue.submit({"industry": "FinTech"})
+    queued = queue.submit({"industry": "Healthcare"}, priority="low")
+    await asyncio.sleep(0.01)
+
+    # Someone streaming the queued job's events, as /api/jobs/{job_id}/stream does
+    follower = asyncio.create_task(asyncio.wait_for(_drain(queued), timeout=1))
+
+    await queue.stop()
+    print("Running job:", running.status, running.error)
+    print("Queued job:", queued.status, queued.error)
+    print("Follower finished:", await follower == [])
+
+
+async def _drain(job):
+    return [event async for event in job.follow()]
+
+
+async def quick_runner(job):
+    await asyncio.sleep(0.2)
+    return {"ideas": [job.payload["industry"]]}
+
+
+def api_checks():
+    # One worker and one waiting slot: the third submission is turned away
+    api.job_queue = JobQueue(quick_runner, workers=1, max_queue_size=1)
+    app = FastAPI()
+    app.include_router(api.router)
+    with TestClient(app) as client:
+        first = client.post("/api/jobs", json=ROW)
+        time.sleep(0.05)
+        second = client.post("/api/jobs", json={**ROW, "priority": "high"})
+        third = client.post("/api/jobs", json=ROW)
+        print("Submissions:", first.status_code, second.status_code, third.status_code)
+        print("Rejected with Retry-After:", third.headers.get("retry-after"), "|", third.json()["detail"])
+        print("Metrics:", client.get("/api/jobs/metrics").json()["rejected"], "rejected")
+
+        print("\n========== POLLING ==========")
+        job_id = second.json()["job_id"]
+        statuses = []
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if not statuses or statuses[-1] != job["status"]:
+                statuses.append(job["status"])
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.02)
+        print("Statuses seen:", statuses)
+        print("Finished job:", job["status"], job["result"], "| queue_wait set:", job["queue_wait"] is not None)
+        print("Stream of a finished job:", client.get(f"/api/jobs/{job_id}/stream").text.strip())
+        print("Unknown job:", client.get("/api/jobs/nope").status_code)
+
+
+def main():
+    print("\n========== PRIORITY ORDER ==========")
+    print("Run order:", asyncio.run(priority_order()))
+
+    print("\n========== FULL QUEUE ==========")
+    api_checks()
+
+    print("\n========== SHUTDOWN ==========")
+    asyncio.run(shutdown())
+
+
+if __name__ == "__main__":
+    main()
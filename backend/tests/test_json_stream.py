@@ -0,0 +1,43 @@
+from app.services.json_stream import JSONArrayStream, parse_json_array
+
+
+RESPONSE = """Sure! Here are the trends [as requested]:
+
+```json
+[
+  {"topic": "Embedded Finance", "relevance_score": 0.9, "description": "Payments inside [any] app"},
+  {"topic": "Broken", "relevance_score": },
+  {"topic": "AI Underwriting", "relevance_score": 0.8, "description": "Models \\"decide\\" credit"},
+]
+```
+
+Let me know if you need more detail."""
+
+
+def main():
+    print("\n========== CHUNKED FEED ==========")
+    parser = JSONArrayStream()
+    for i in range(0, len(RESPONSE), 5):
+        for item in parser.feed(RESPONSE[i:i + 5]):
+            print("Element closed:", item["topic"])
+    parser.close()
+    print("Summary:", parser.summary())
+
+    print("\n========== TRUNCATED RESPONSE ==========")
+    truncated = parse_json_array('[{"topic": "A"}, {"topic": "B", "descr')
+    print("Items:", truncated.items)
+    print("Truncated:", truncated.truncated, "Summary:", truncated.summary())
+
+    print("\n========== BRACKETED PROSE ==========")
+    # Years, citations and notes in brackets come before the real payload
+    for prose in ("Trends for [2024]:\n", "As noted in [1], ", "[\"draft\"] "):
+        parsed = parse_json_array(prose + '```json\n[{"topic": "A"}, {"topic": "B"}]\n```')
+        print(repr(prose.strip()), "->", [item["topic"] for item in parsed.items], parsed.summary())
+    print("Only prose:", parse_json_array("See [1] and [2024].").summary())
+
+    print("\n========== NO ARRAY ==========")
+    print("Summary:", parse_json_array("I could not find any trends.").summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import asyncio
+import os
+import tempfile
+from app.services.llm_cache import (
+    LLMResponseCache,
+    MemoryLRUCache,
+    SQLiteCache,
+    make_cache_key,
+)
+
+
+async def main():
+    key_a = make_cache_key("gpt-4o", "system", "Trends in fintech", 0.5, 2000)
+    key_b = make_cache_key("gpt-4o", "system", "Trends in fintech", 0.7, 2000)
+    print("Keys differ by temperature:", key_a != key_b)
+
+    # Byte-budget eviction keeps the most recently used entries
+    memory = MemoryLRUCache(max_entries=10, max_bytes=12, ttl_seconds=60)
+    memory.set("a", "aaaa")
+    memory.set("b", "bbbb")
+    memory.get("a")
+    memory.set("c", "cccc")
+    memory.set("d", "dddd")
+    print("\n========== MEMORY TIER ==========")
+    print("Entries:", len(memory), "Bytes:", memory.size_bytes)
+    print("Evicted 'b':", memory.get("b") is None, "Kept 'a':", memory.get("a") == "aaaa")
+
+    # TTL expiry
+    memory.set("ttl", "x", ttl_seconds=0)
+    print("Expired entry dropped:", memory.get("ttl") is None)
+
+    # Disk tier survives a fresh process-level cache
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.sqlite3")
+        cache = LLMResponseCache(disk=SQLiteCache(path))
+        await cache.set(key_a, '[{"topic": "Embedded Finance"}]')
+        cache.disk.close()
+
+        restarted = LLMResponseCache(disk=SQLiteCache(path))
+        value = await restarted.get(key_a)
+        missing = await restarted.get(key_b)
+        again = await restarted.get(key_a)
+        restarted.disk.close()
+
+        print("\n========== DISK TIER ==========")
+        print("Value after restart:", value)
+        print("Miss for other key:", missing is None)
+        print("Promoted to memory:", again == value)
+        print("Stats:", restarted.snapshot())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import asyncio
+from app.services.azure_openai_service import AzureOpenAIService
+from app.services.metrics import (
+    RequestMetrics,
+    current_agent,
+    current_request,
+    record_llm_call,
+    record_node,
+    record_parse,
+    render_prometheus,
+)
+
+
+async def main():
+    recorder = RequestMetrics()
+    current_request.set(recorder)
+    current_agent.set("Trend Researcher")
+
+    record_node("researcher", 0.42)
+    record_llm_call(
+        cached=False,
+        queue_wait=0.05,
+        latency=0.4,
+        ttft=0.12,
+        prompt_tokens=150,
+        completion_tokens=300,
+        prompt_cost_per_1k=0.01,
+        completion_cost_per_1k=0.03,
+    )
+    record_llm_call(cached=True)
+    record_parse("Trend Researcher", 0.0004, failed=1)
+
+    breakdown = recorder.breakdown()
+    print("\n========== REQUEST BREAKDOWN ==========")
+    print("Nodes:", breakdown["nodes"])
+    print("LLM calls:", breakdown["llm"]["calls"], "cached:", breakdown["llm"]["cached_calls"])
+    print("Tokens:", breakdown["llm"]["prompt_tokens"], "/", breakdown["llm"]["completion_tokens"])
+    print("Cost:", breakdown["llm"]["cost"])
+    print("Parse failures:", breakdown["parse"]["failures"])
+
+    text = render_prometheus()
+    print("\n========== PROMETHEUS ==========")
+    for line in text.splitlines():
+        if line.startswith(("ideation_node_seconds_count", "llm_tokens_total", "agent_parse_failures_total")):
+            print(line)
+    print("Histogram has +Inf bucket:", 'ideation_node_seconds_bucket{node="researcher",le="+Inf"} 1' in text)
+
+    print("\n========== STREAMED USAGE ==========")
+    # Run with LLM_BACKEND=mock; the stream asks for usage, so nothing is estimated
+    streamed = RequestMetrics()
+    current_request.set(streamed)
+    service = AzureOpenAIService(cache=None)
+    async for _ in service.generate_stream("List three fintech trends", 0.7, 200):
+        pass
+    call = streamed.breakdown()["llm"]["per_call"][0]
+    print("Tokens from the usage chunk:", call["completion_tokens"], "| estimated:", call["estimated"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
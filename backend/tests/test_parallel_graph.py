@@ -0,0 +1,41 @@
+import asyncio
+from app.graph.workflow import IdeationWorkflow
+
+FILLED = ("trends", "trend_sources", "audience_insights", "personas", "content_ideas", "messages")
+
+
+async def main():
+    workflow = IdeationWorkflow()
+    input_data = {
+        "industry": "fintech",
+        "target_audience": "startup founders",
+        "content_types": ["blog", "video", "social"],
+        # Every stage runs in both modes rather than one mode reusing the other's output
+        "refresh": True,
+    }
+
+    results = {}
+    for mode in ("sequential", "parallel"):
+        results[mode] = await workflow.run({**input_data, "graph_mode": mode})
+
+    sequential, parallel = results["sequential"], results["parallel"]
+    print("\n========== STATE KEYS ==========")
+    print("Missing in parallel mode:", sorted(set(sequential) - set(parallel)))
+    print("Only in parallel mode:", sorted(set(parallel) - set(sequential)))
+    print("Same keys as sequential mode:", set(sequential) <= set(parallel))
+
+    print("\n========== OUTPUT ==========")
+    for key in FILLED:
+        print(f"{key}: sequential={len(sequential.get(key) or [])} parallel={len(parallel.get(key) or [])}")
+    print("Nothing left empty:", all(parallel.get(key) for key in FILLED), "| error:", parallel.get("error"))
+
+    print("\n========== NODES ==========")
+    for mode, result in results.items():
+        print(f"{mode}: {result['request_metrics'].get('nodes')}")
+    metrics = parallel["request_metrics"]
+    # Researcher and profiler overlap, so the run is shorter than its nodes added up
+    print("Branches ran concurrently:", metrics["total"] < sum(metrics["nodes"].values()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.services.rate_limiter import AzureRateLimiter
+
+
+async def main():
+    limiter = AzureRateLimiter(max_concurrency=8)
+    limiter.limit = 2
+
+    print("\n========== FAILURES ==========")
+    for _ in range(10):
+        try:
+            async with limiter.slot(100):
+                raise RuntimeError("Azure OpenAI returned empty content")
+        except RuntimeError:
+            pass
+    print("Limit unchanged after failed calls:", limiter.limit == 2, "| in flight:", limiter.in_flight)
+
+    print("\n========== CANCELLED ==========")
+    async def slow_call():
+        async with limiter.slot(100):
+            await asyncio.sleep(10)
+    calls = [asyncio.create_task(slow_call()) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for call in calls:
+        call.cancel()
+    await asyncio.gather(*calls, return_exceptions=True)
+    print("Limit unchanged after cancelled calls:", limiter.limit == 2, "| in flight:", limiter.in_flight)
+
+    print("\n========== SUCCESSES ==========")
+    for _ in range(2):
+        async with limiter.slot(100):
+            pass
+    print("Limit raised after a full window of successes:", limiter.limit)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import lifecycle
+from app.config import settings
+from main import app
+
+original_warm_up = lifecycle.warm_up
+
+
+async def slow_warm_up():
+    # Hold warm-up back long enough to probe the server before it finishes
+    await asyncio.sleep(0.5)
+    await original_warm_up()
+
+
+def main():
+    settings.startup_warmup = True
+    lifecycle.warm_up = slow_warm_up
+    with TestClient(app) as client:
+        print("\n========== BEFORE WARM-UP ==========")
+        ready = client.get("/api/ready")
+        print("Ready:", ready.status_code, ready.json()["status"], "| health:", client.get("/api/health").status_code)
+        print("Workflow not built yet:", lifecycle.peek_workflow() is None)
+
+        print("\n========== AFTER WARM-UP ==========")
+        deadline = time.monotonic() + 30
+        while ready.status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            ready = client.get("/api/ready")
+        body = ready.json()
+        print("Ready:", ready.status_code, body["status"])
+        print("Phases:", sorted(body["phases"]))
+
+
+if __name__ == "__main__":
+    main()
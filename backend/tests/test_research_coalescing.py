@@ -0,0 +1,37 @@
+import asyncio
+from app.graph.workflow import IdeationWorkflow
+
+
+def researcher_calls(result):
+    llm = result.get("request_metrics", {}).get("llm", {})
+    return [call for call in llm.get("per_call", []) if call["agent"] == "Trend Researcher"], llm
+
+
+async def main():
+    workflow = IdeationWorkflow()
+
+    # Same industry, different audiences: the graphs run separately but share
+    # one researcher call (refresh keeps the caches out of the way)
+    requests = [
+        {"industry": "fintech", "target_audience": audience, "content_types": ["blog"], "refresh": True}
+        for audience in ("startup founders", "CFOs", "bank IT leads")
+    ]
+    results = await asyncio.gather(*(workflow.run(data) for data in requests))
+
+    print("\n========== COALESCED RESEARCH ==========")
+    print("Research flight:", workflow.research_flight.snapshot())
+    for data, result in zip(requests, results):
+        calls, llm = researcher_calls(result)
+        print(
+            f"{data['target_audience']}: {len(calls)} researcher call(s), "
+            f"coalesced={[call['coalesced'] for call in calls]}, "
+            f"tokens={sum(call['completion_tokens'] for call in calls)}, "
+            f"coalesced_calls={llm.get('coalesced_calls')}"
+        )
+    owners = sum(1 for result in results for call in researcher_calls(result)[0] if not call["coalesced"])
+    print("Every request carries the researcher call, one as its owner:",
+          all(researcher_calls(result)[0] for result in results) and owners == 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark: one large ideation response through the old path (every idea and
+log rebuilt as a model, then validated and serialized again by FastAPI
+through `response_model`) versus the new one (ideas validated once at the
+writer's parse boundary, returned as-is through orjson).
+"""
+import time
+import timeit
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.formatting import FastJSONResponse, format_response
+from app.models.schemas import AgentMessage, ContentIdea, IdeationRequest, IdeationResponse
+from app.services.run_log import LogRecord
+
+IDEAS = 2000
+REQUEST = IdeationRequest(industry="Fintech", target_audience="CFOs")
+
+
+def make_result() -> dict:
+    ideas = [
+        ContentIdea.model_validate({
+            "id": f"blog-{n:012x}",
+            "format": ("blog", "video", "social")[n % 3],
+            "icon": "📝",
+            "title": f"Idea {n}: embedded finance for finance teams",
+            "description": "How banking inside apps reshapes cash forecasting for mid-size companies.",
+            "structure": "Intro, three case studies, checklist",
+            "confidence": 80 + n % 20,
+            "keywords": ["embedded finance", "treasury", "cfo", "payments", "fintech"],
+            "estimated_engagement": "High",
+        }).model_dump()
+        for n in range(IDEAS)
+    ]
+    logs = [LogRecord("Creative Writer", f"step {n}") for n in range(50)]
+    return {"content_ideas": ideas, "execution_logs": logs, "trends": [], "personas": []}
+
+
+def legacy_response(result: dict) -> IdeationResponse:
+    return IdeationResponse(
+        request_id="bench",
+        ideas=[ContentIdea(**idea) for idea in result["content_ideas"]],
+        execution_time=0.0,
+        agent_logs=[
+            AgentMessage(agent_name=log.agent, message_type=log.type.label, content=log.message, timestamp=log.timestamp)
+            for log in result["execution_logs"]
+        ],
+        metadata={"trends_count": 0, "personas": [], "graph_mode": "sequential"},
+    )
+
+
+def main():
+    result = make_result()
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=IdeationResponse)
+    async def legacy():
+        return legacy_response(result)
+
+    @app.get("/fast", response_model=IdeationResponse)
+    async def fast():
+        return FastJSONResponse(format_response("bench", REQUEST, result, time.time()))
+
+    client = TestClient(app)
+    print(f"\n========== {IDEAS} IDEAS PER RESPONSE ==========")
+    timings = {}
+    for path in ("/legacy", "/fast"):
+        assert client.get(path).status_code == 200
+        timings[path] = min(timeit.repeat(lambda: client.get(path), number=10, repeat=3)) / 10
+        print(f"{path:8} {timings[path] * 1e3:7.1f} ms per request")
+    print(f"New path: {timings['/legacy'] / timings['/fast']:.1f}x faster")
+
+    legacy_body, fast_body = client.get("/legacy").json(), client.get("/fast").json()
+    print("Same ideas:", legacy_body["ideas"] == fast_body["ideas"])
+    print("Body still matches the schema:", IdeationResponse.model_validate(fast_body).request_id == "bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import tempfile
+
+from app.graph.a2a_protocol import create_a2a_message, decode
+from app.services.result_store import ResultStore, idea_id
+
+
+def sample_result(title: str):
+    return {
+        "trends": [{"topic": "Embedded Finance", "description": "Banking inside apps"}],
+        "audience_insights": [{"topic": "Embedded Finance", "angle": "Fewer tools to juggle"}],
+        "content_ideas": [
+            {"id": idea_id("blog", title), "format": "blog", "title": title, "description": "..."},
+            {"id": idea_id("video", "Demo day"), "format": "video", "title": "Demo day", "description": "..."},
+        ],
+        "messages": [create_a2a_message("Trend Researcher", "Handoff: 1 trend", payload={"trend_count": 1}, message_type="handoff")],
+    }
+
+
+async def main():
+    path = os.path.join(tempfile.mkdtemp(), "results.sqlite3")
+    store = ResultStore(path, batch_size=10, flush_interval=0.1)
+    input_data = {"industry": "FinTech", "target_audience": "CFOs", "content_types": ["blog", "video"]}
+
+    print("\n========== IDS ==========")
+    print("Stable across calls:", idea_id("blog", "Why CFOs care") == idea_id("blog", "  why cfos  CARE "))
+
+    first = store.save_run(input_data, sample_result("Why CFOs care"), 1.5)
+    second = store.save_run({**input_data, "industry": "fintech "}, sample_result("Why CFOs care"), 1.2)
+    store.save_run({**input_data, "industry": "Healthcare"}, sample_result("Clinic workflows"), 0.9)
+    print("Pending before flush:", store.snapshot()["pending"])
+    await asyncio.sleep(0.3)
+    print("Flushed in background:", store.snapshot())
+
+    print("\n========== HISTORY ==========")
+    runs = await asyncio.to_thread(store.list_runs, industry="FINTECH")
+    print("FinTech runs:", [r["run_id"] for r in runs] == [second, first])
+    ideas = await asyncio.to_thread(store.list_items, industry="fintech", format="blog")
+    print("Deduplicated blog ideas:", [(i["title"], i["times_generated"]) for i in ideas])
+    print("Since tomorrow:", await asyncio.to_thread(store.list_runs, since="2999-01-01"))
+    run = await asyncio.to_thread(store.get_run, first)
+    print("Run detail:", run["industry"], len(run["trends"]), len(run["audience_insights"]), len(run["content_ideas"]))
+    print("Handoffs stored:", [m.payload for m in decode(run["a2a_messages"])])
+
+    await store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import asyncio
+import timeit
+from datetime import datetime, UTC
+
+from app.services import run_log
+from app.services.run_log import LogRecord, LogType, RunLog, current_run_log, log_event
+
+
+def legacy_log(state: dict, agent: str, message: str) -> dict:
+    state.setdefault("execution_logs", []).append({
+        "agent": agent,
+        "message": message,
+        "type": "log",
+        "timestamp": datetime.now(UTC).isoformat(),
+    })
+    return state
+
+
+async def main():
+    buffer = RunLog(max_records=3)
+    current_run_log.set(buffer)
+    for n in range(5):
+        log_event("Trend Researcher", f"step {n}", "error" if n == 4 else "log")
+
+    print("\n========== RING BUFFER ==========")
+    print("Kept:", [record.message for record in buffer.records()], "| dropped:", buffer.dropped)
+    last = buffer.records()[-1]
+    print("Type:", last.type.name, "| interned agent:", last.agent is buffer.records()[0].agent)
+    print("At the edge:", last.to_dict())
+
+    print("\n========== SINKS ==========")
+    seen = []
+    run_log.add_sink(seen.append)
+    log_event("Audience Analyst", "profiling", LogType.STATUS)
+    print("Sink received:", [(record.agent, record.type.label) for record in seen])
+    run_log.SINKS.remove(seen.append)
+
+    print("\n========== COST PER LINE ==========")
+    run_log.SINKS[:] = []
+    legacy = min(timeit.repeat(lambda: legacy_log({}, "Trend Researcher", "Analyzing industry trends..."), number=20000, repeat=3))
+    compact = min(timeit.repeat(lambda: log_event("Trend Researcher", "Analyzing industry trends..."), number=20000, repeat=3))
+    print(f"dict + ISO: {legacy / 20000 * 1e6:.2f} us | LogRecord: {compact / 20000 * 1e6:.2f} us")
+    print("Slotted (no __dict__):", not hasattr(LogRecord("a", "b"), "__dict__"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+from app.config import settings
+from app.graph.semantic_cache import SemanticCache, normalize_input
+from app.services.embeddings import HashedCharEmbedder
+
+
+def main():
+    cache = SemanticCache(HashedCharEmbedder(), {"researcher": settings.semantic_cache_researcher_threshold, "writer": 0.85})
+    cache.store("researcher", {"industry": "Fintech"}, {"trends": [{"topic": "Embedded Finance"}]})
+
+    print("\n========== NORMALIZE ==========")
+    for value in ("FinTech startups", "fintech industry", "The Market"):
+        print(f"{value!r} -> {normalize_input(value)!r}")
+
+    print("\n========== RESEARCHER ==========")
+    for industry in ("FinTech startups", "fintech industry", "Fin-Tech", "EdTech", "Insurtech"):
+        found = cache.lookup("researcher", {"industry": industry})
+        if found is None:
+            print(f"{industry}: miss")
+        else:
+            print(f"{industry}: hit via {found[1]['cached_key']} ({found[1]['similarity']})")
+
+    print("\n========== NEAR MISSES (different industries) ==========")
+    cache.store("researcher", {"industry": "Healthcare"}, {"trends": [{"topic": "Telehealth"}]})
+    for industry in ("Healthcare IT", "Healthcare AI", "Health insurance"):
+        found = cache.lookup("researcher", {"industry": industry})
+        print(f"{industry}: {'HIT via ' + str(found[1]['cached_key']) if found else 'miss'}")
+
+    print("\n========== WRITER (content types must match exactly) ==========")
+    fields = {"industry": "Fintech", "target_audience": "CFOs", "additional_context": ""}
+    cache.store("writer", fields, {"content_ideas": [{"title": "Idea"}]}, exact="blog,video")
+    print("Same types:", cache.lookup("writer", {**fields, "industry": "fintech sector"}, exact="blog,video") is not None)
+    print("Other types:", cache.lookup("writer", fields, exact="blog") is not None)
+    print("Other audience:", cache.lookup("writer", {**fields, "target_audience": "Gen Z gamers"}, exact="blog,video") is not None)
+
+    print("\n========== AUDIT ==========")
+    for hit in cache.audit:
+        print(hit["stage"], hit["query"], "<-", hit["cached_key"], hit["similarity"])
+    print("Disabled stage:", cache.enabled("analyst"))
+    print("Invalidated:", cache.invalidate("researcher", {"industry": "FINTECH"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from multiprocessing import Process
+
+from app.graph.stage_cache import StageCache
+from app.services.llm_cache import SQLiteCache
+
+TRENDS = {"trends": [{"topic": "Embedded Finance"}], "trend_sources": ["mock"]}
+
+
+def research_in_worker(path: str) -> None:
+    # Another worker process fills the shared cache
+    asyncio.run(StageCache("researcher", 1800, path).set("Fintech", TRENDS))
+
+
+async def run_checks(path: str):
+    print("\n========== ACROSS PROCESSES ==========")
+    worker = Process(target=research_in_worker, args=(path,))
+    worker.start()
+    worker.join()
+    cache = StageCache("researcher", 1800, path)
+    print("Served from the other worker:", await cache.get("  FINTECH ") == TRENDS, cache.snapshot())
+
+    print("\n========== INVALIDATION ==========")
+    # Both workers have served the entry before one of them invalidates it
+    other = StageCache("researcher", 1800, path)
+    print("Other worker serves it:", await other.get("fintech") == TRENDS)
+    print("Removed here:", await cache.invalidate("fintech"))
+    print("Other worker now misses:", await other.get("fintech") is None)
+    await other.set("edtech", TRENDS)
+    print("Cleared here:", await cache.invalidate(), "| other worker misses:", await other.get("edtech") is None)
+
+    print("\n========== FRESHNESS ==========")
+    # Written by a worker with a short window: a reader with a 60s window must not extend it
+    SQLiteCache(path, ttl_seconds=0.2, table="stage_researcher").set("healthcare", '{"trends": []}')
+    short = StageCache("researcher", 60, path)
+    print("Fresh at first:", await short.get("healthcare") is not None)
+    await asyncio.sleep(0.3)
+    print("Expired on the writer's schedule:", await short.get("healthcare") is None)
+
+    print("\n========== LOCKED DATABASE ==========")
+    # Another process holds the write lock: the loop keeps running and the errors are logged
+    blocker = sqlite3.connect(path, timeout=0)
+    blocker.execute("BEGIN EXCLUSIVE")
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    locked = StageCache("researcher", 1800, "")
+    locked.shared = SQLiteCache(path, ttl_seconds=1800, table="stage_researcher")
+    locked.shared._conn.execute("PRAGMA busy_timeout = 300")
+    started = time.perf_counter()
+    await locked.set("retail", TRENDS)
+    removed = await locked.invalidate()
+    elapsed = time.perf_counter() - started
+    ticker.cancel()
+    blocker.rollback()
+    blocker.close()
+    print(f"Invalidate returned {removed} after {elapsed:.2f}s; loop ticked {ticks} times meanwhile:", ticks > 10)
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "stages.sqlite3")
+    asyncio.run(run_checks(path))
+
+
+if __name__ == "__main__":
+    main()
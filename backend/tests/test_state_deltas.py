@@ -0,0 +1,33 @@
+from app.graph.a2a_protocol import create_a2a_message
+from app.graph.deltas import StateTracker
+from app.models.state import AgentState, ParallelAgentState
+
+
+def main():
+    # Sequential nodes hand back the whole state; only additions are reported
+    tracker = StateTracker(AgentState, {"trends": [], "messages": [], "stage_timings": {}})
+    trends = [{"topic": "Embedded Finance"}]
+    delta = tracker.apply({
+        "trends": trends,
+        "current_agent": "Trend Researcher",
+        "stage_timings": {"researcher": 1.2},
+    })
+    print("\n========== SEQUENTIAL ==========")
+    print("First delta:", delta)
+
+    trends.append({"topic": "Real-Time Treasury"})  # agents append in place
+    delta = tracker.apply({"trends": trends, "current_agent": "Trend Researcher", "stage_timings": {"analyst": 0.8}})
+    print("Second delta only has the new trend:", delta["trends"] == [trends[-1]])
+    print("Timings merged in state:", tracker.state["stage_timings"])
+
+    # Parallel branches return only their additions; reducers accumulate them
+    tracker = StateTracker(ParallelAgentState, {"messages": [], "stage_timings": {}})
+    tracker.apply({"messages": [create_a2a_message("Trend Researcher", "a")], "stage_timings": {"researcher": 1.0}})
+    delta = tracker.apply({"messages": [create_a2a_message("Audience Analyst", "b")], "stage_timings": {"profiler": 0.5}})
+    print("\n========== PARALLEL ==========")
+    print("Delta:", delta)
+    print("Accumulated messages:", len(tracker.state["messages"]))
+
+
+if __name__ == "__main__":
+    main()
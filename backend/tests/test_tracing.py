@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import time
+from app.graph.a2a_protocol import create_a2a_message, latest_handoff_trace
+from app.services.tracing import Tracer, to_chrome_trace
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "spans.jsonl")
+
+        # Unsampled: no spans, no file
+        off = Tracer(path, sample_rate=0.0)
+        with off.span("request", root=True) as span:
+            print("Unsampled span:", span)
+        print("File written when off:", os.path.exists(path))
+
+        tracer = Tracer(path, sample_rate=1.0)
+        with tracer.span("request", root=True, industry="fintech") as root:
+            with tracer.span("node:researcher") as node:
+                handoff = tracer.start("handoff", from_agent="Trend Researcher")
+                tracer.end(handoff)
+            envelope = create_a2a_message("Trend Researcher", "done", message_type="handoff", trace=handoff.context())
+            with tracer.span("node:analyst", root.context()) as analyst:
+                analyst.links.append(latest_handoff_trace([envelope]))
+        time.sleep(0.2)  # spans are written by a background thread
+
+        with open(path) as f:
+            spans = [json.loads(line) for line in f]
+        print("\n========== SPANS ==========")
+        for s in spans:
+            print(s["name"], "trace:", s["traceId"] == root.trace_id, "parent:", s["parentSpanId"][:8] or "-")
+        print("Node parent is root:", node.parent_id == root.span_id)
+        print("Analyst linked to handoff:", analyst.links[0]["span_id"] == handoff.span_id)
+
+        with open(path) as f:
+            timeline = to_chrome_trace(f)
+        print("Timeline events:", len(timeline["traceEvents"]))
+
+
+if __name__ == "__main__":
+    main()
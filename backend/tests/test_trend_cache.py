@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from app.graph.stage_cache import StageCache, normalize_key
+from app.graph.workflow import IdeationWorkflow
+
+TRENDS = {"trends": [{"topic": "Embedded Finance"}], "trend_sources": ["mock"]}
+
+
+def researcher_calls(result):
+    per_call = result.get("request_metrics", {}).get("llm", {}).get("per_call", [])
+    return sum(1 for call in per_call if call["agent"] == "Trend Researcher")
+
+
+async def main():
+    print("\n========== NORMALIZATION ==========")
+    print([normalize_key(k) for k in ("FinTech", "  fintech ", "Fin\tTech", "fin  tech")])
+
+    print("\n========== HIT / MISS ==========")
+    cache = StageCache("researcher", 0.2)
+    print("Empty:", await cache.get("fintech"))
+    await cache.set("FinTech ", TRENDS)
+    print("Other spelling hits:", await cache.get("  FINTECH") == TRENDS)
+    print("Other industry misses:", await cache.get("healthcare") is None)
+    time.sleep(0.3)
+    print("Expired:", await cache.get("fintech") is None, cache.snapshot())
+    disabled = StageCache("researcher", 0)
+    await disabled.set("fintech", TRENDS)
+    print("TTL 0 disables:", await disabled.get("fintech") is None)
+
+    print("\n========== WORKFLOW ==========")
+    # A second request for the same industry, spelled differently, skips the researcher
+    workflow = IdeationWorkflow()
+    base = {"target_audience": "startup founders", "content_types": ["blog"]}
+    first = await workflow.run({**base, "industry": "FinTech"})
+    second = await workflow.run({**base, "industry": " fintech ", "target_audience": "CFOs"})
+    print("Researcher calls:", researcher_calls(first), researcher_calls(second))
+    print("Same trends:", first["trends"] == second["trends"], workflow.trend_cache.snapshot())
+    # As DELETE /api/admin/cache/trends does: the semantic cache would serve it otherwise
+    print("Invalidated:", await workflow.trend_cache.invalidate("FINTECH"))
+    workflow.semantic_cache.invalidate("researcher", {"industry": "fintech"})
+    third = await workflow.run({**base, "industry": "fintech", "target_audience": "Analysts"})
+    print("After invalidation the researcher runs again:", researcher_calls(third) == 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+import tempfile
+import threading
+import time
+from multiprocessing import Process
+
+from app.graph.novelty import NoveltyScorer
+from app.services.embeddings import HashedTfidfEmbedder
+from app.services.vector_index import VectorIndex
+
+
+IDEAS = [
+    {"id": "blog-1", "title": "Embedded Finance for Seed-Stage Founders", "description": "How founders add payments and lending to their product."},
+    {"id": "video-1", "title": "Why CFOs Are Betting on Real-Time Treasury", "description": "Cash visibility for finance leaders."},
+    {"id": "social-1", "title": "5 Signs Your Clinic Needs Telehealth", "description": "A carousel for practice managers."},
+]
+TRENDS = [{"id": "trend-1", "topic": "Embedded Finance", "description": "Non-banks offering financial products inside apps."}]
+
+
+def add_in_process(path: str, worker: int) -> None:
+    index = VectorIndex(path, HashedTfidfEmbedder(256))
+    for batch in range(20):
+        index.add("idea", [{"id": f"w{worker}-{batch}-{n}", "title": f"idea {n} from worker {worker}", "description": "..."} for n in range(50)])
+
+
+class BrokenIndex:
+    def nearest(self, kind, items):
+        raise OSError("index files unavailable")
+
+
+async def main():
+    path = tempfile.mkdtemp()
+    index = VectorIndex(path, HashedTfidfEmbedder(256))
+    index.add("idea", IDEAS)
+    index.add("trend", TRENDS)
+
+    print("\n========== SEARCH ==========")
+    for kind, item_id, score in index.search("what have we generated about embedded finance for founders?"):
+        print(f"{kind:6} {item_id:10} {score}")
+    print("Ideas only:", [item_id for _, item_id, _ in index.search("embedded finance", kind="idea", limit=2)])
+
+    print("\n========== REOPEN ==========")
+    reopened = VectorIndex(path, HashedTfidfEmbedder(256))
+    print("Rows after reopen:", len(reopened), "| same top hit:",
+          reopened.search("telehealth clinic")[0][1] == index.search("telehealth clinic")[0][1])
+
+    print("\n========== NOVELTY ==========")
+    state = await NoveltyScorer(reopened).execute({"content_ideas": [
+        {"id": "blog-2", "title": "Embedded finance for seed stage founders", "description": "How founders add payments to their product."},
+        {"id": "blog-3", "title": "Gardening Tips for Small Balconies", "description": "Herbs that thrive in pots."},
+    ]})
+    for idea in state["content_ideas"]:
+        print(f"{idea['title']}: novelty={idea['novelty']}")
+
+    print("\n========== CONCURRENT WRITERS ==========")
+    # Other processes (workers) and another thread add while this one searches
+    shared = tempfile.mkdtemp()
+    reader = VectorIndex(shared, HashedTfidfEmbedder(256))
+    writers = [Process(target=add_in_process, args=(shared, worker)) for worker in range(2)]
+    for writer in writers:
+        writer.start()
+    local = threading.Thread(target=add_in_process, args=(shared, 9))
+    local.start()
+    errors = 0
+    while local.is_alive() or any(writer.is_alive() for writer in writers):
+        try:
+            reader.search("idea from worker")
+            reader.nearest("idea", IDEAS)
+        except Exception as e:
+            errors += 1
+            print("Search failed:", e)
+    local.join()
+    for writer in writers:
+        writer.join()
+    reader.search("idea")
+    print("Rows:", len(reader), "of", 3 * 20 * 50, "| unique:", len(set(reader.keys)) == len(reader), "| search errors:", errors)
+
+    print("\n========== NOVELTY FAILURE ==========")
+    ideas = [dict(IDEAS[0])]
+    state = await NoveltyScorer(BrokenIndex()).execute({"content_ideas": ideas})
+    print("Ideas kept without novelty:", state["content_ideas"] == ideas)
+
+    print("\n========== SCALE ==========")
+    big = VectorIndex(tempfile.mkdtemp(), HashedTfidfEmbedder(256))
+    big.add("idea", [{"id": f"i{n}", "title": f"idea {n} about topic {n % 997}", "description": f"audience {n % 13}"} for n in range(20_000)])
+    started = time.perf_counter()
+    for _ in range(100):
+        big.search("topic 42 for audience 7")
+    print(f"Search over {len(big)} rows: {(time.perf_counter() - started) * 10:.2f} ms average")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
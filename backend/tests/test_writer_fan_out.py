@@ -0,0 +1,49 @@
+import asyncio
+import json
+import re
+
+from app.agents.creative_writer import CreativeWriterAgent
+
+
+class FormatLLM:
+    """Answers each format's prompt on its own; one format's call fails"""
+
+    def __init__(self, *failing: str):
+        self.failing = set(failing)
+        self.calls = []
+
+    async def generate(self, prompt, temperature, max_tokens, use_cache=True):
+        content_type = re.search(r"Content formats needed: (.+)", prompt).group(1)
+        self.calls.append((content_type, max_tokens))
+        await asyncio.sleep(0.01)
+        if content_type in self.failing:
+            raise RuntimeError("deployment timed out")
+        # No "format" field: the writer fills it in from the request
+        return json.dumps([
+            {"title": f"{content_type.title()} idea {n}", "description": "...", "structure": "...", "confidence": 80}
+            for n in range(2)
+        ])
+
+
+async def main():
+    state = {
+        "target_audience": "startup founders",
+        "content_types": ["blog", "video", "social"],
+        "audience_insights": [{"topic": "AI Automation", "angle": "Lean teams", "hook": "Scale without hiring"}],
+        "messages": [],
+    }
+
+    print("\n========== ONE FORMAT FAILS ==========")
+    llm = FormatLLM("video")
+    result = await CreativeWriterAgent(llm, fan_out=True).execute(dict(state))
+    print("Calls (format, max_tokens):", sorted(llm.calls))
+    print("Ideas:", [(idea["format"], idea["title"]) for idea in result["content_ideas"]])
+    print("Error:", result.get("error"))
+
+    print("\n========== EVERY FORMAT FAILS ==========")
+    result = await CreativeWriterAgent(FormatLLM("blog", "video", "social"), fan_out=True).execute(dict(state))
+    print("Ideas:", result.get("content_ideas"), "| Error:", result.get("error"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
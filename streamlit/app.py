@@ -32,6 +32,8 @@ if 'agent_states' not in st.session_state:
     st.session_state.agent_states = {agent: "pending" for agent in agent_names.keys()}
 if 'final_result' not in st.session_state:
     st.session_state.final_result = None
+if 'partial_ideas' not in st.session_state:
+    st.session_state.partial_ideas = []
 if 'error' not in st.session_state:
     st.session_state.error = None
 if 'message_queue' not in st.session_state:
@@ -133,6 +135,11 @@ def update_ui():
                         trending_status = "🔥 Yes" if idea.get('trending') else "No"
                         st.metric("Trending Topic", trending_status)
 
+        elif st.session_state.partial_ideas:
+            st.write(f"Received **{len(st.session_state.partial_ideas)}** ideas so far...")
+            for idea in st.session_state.partial_ideas:
+                st.markdown(f"{idea.get('icon', '')} **{idea.get('title', 'Untitled Idea')}** - {idea.get('format', 'N/A')}")
+
         elif not st.session_state.running:
              st.info("Configure your parameters and click 'Generate Ideas' to start.")
 
@@ -182,6 +189,10 @@ def websocket_worker(request_data, message_queue: queue.Queue):
 
                         if msg_type == "agent_update":
                             message_queue.put({'type': 'agent_update', 'payload': payload})
+
+                        elif msg_type == "idea":
+                            # Ideas stream in as soon as each one is complete
+                            message_queue.put({'type': 'idea', 'payload': payload})
                         
                         elif msg_type == "final_result":
                             message_queue.put({'type': 'final_result', 'payload': payload})
@@ -241,6 +252,7 @@ if submit_button and not st.session_state.get('running'):
     else:
         # Reset state for a new run
         st.session_state.final_result = None
+        st.session_state.partial_ideas = []
         st.session_state.error = None
         st.session_state.agent_states = {agent: "pending" for agent in agent_names.keys()}
         
@@ -280,6 +292,8 @@ if st.session_state.get('running'):
                     if v == "running":
                         st.session_state.agent_states[k] = "complete"
                 st.session_state.agent_states[agent_id] = "running"
+        elif msg_type == 'idea':
+            st.session_state.partial_ideas.append(message.get('payload'))
         elif msg_type == 'final_result':
             st.session_state.final_result = message.get('payload')
             # Also mark the last running agent as completed